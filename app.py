@@ -3,6 +3,8 @@ import pandas as pd
 from pathlib import Path
 import sys
 from translations import get_text, get_lang, set_lang
+from data_loader import VNPTDataLoader, load_column_schema
+from column_profile import get_column_profile
 
 # Page config
 st.set_page_config(
@@ -397,8 +399,7 @@ with st.sidebar:
         data_summary = {
             'rows': len(st.session_state.df_raw),
             'columns': len(st.session_state.df_raw.columns),
-            'missing_pct': round((st.session_state.df_raw.isnull().sum().sum() / 
-                                 (len(st.session_state.df_raw) * len(st.session_state.df_raw.columns)) * 100), 2),
+            'missing_pct': round(get_column_profile(st.session_state.df_raw).missing_cell_pct, 2),
             'has_cleaned_data': st.session_state.df_cleaned is not None
         }
         
@@ -464,8 +465,10 @@ if uploaded_file is not None:
     try:
         # Load data
         with st.spinner("Đang tải dữ liệu..." if lang == 'vi' else "Loading data..."):
-            df = pd.read_excel(uploaded_file)
+            loader = VNPTDataLoader(schema=load_column_schema())
+            df = loader.load(uploaded_file)
             st.session_state.df_raw = df
+            st.session_state.memory_report = loader.last_memory_report
             st.session_state.current_step = 0  # Start at Column Dictionary
         
         st.success(f"✓ Đã tải {len(df):,} dòng dữ liệu" if lang == 'vi' else f"✓ Loaded {len(df):,} rows")
@@ -574,8 +577,10 @@ else:
     if st.button("🎲 Tải dữ liệu mẫu" if lang == 'vi' else "🎲 Load sample data", use_container_width=False):
         sample_file = Path("data/raw_data.xlsx")
         if sample_file.exists():
-            df = pd.read_excel(sample_file)
+            loader = VNPTDataLoader(schema=load_column_schema())
+            df = loader.load(sample_file)
             st.session_state.df_raw = df
+            st.session_state.memory_report = loader.last_memory_report
             st.session_state.current_step = 1
             st.rerun()
         else:
@@ -0,0 +1,121 @@
+"""
+Cleaning Result Cache for VNPT Telecom Dataset
+Persists cleaned frames and cleaning reports keyed by data, config and snapshot date
+"""
+
+import pandas as pd
+import hashlib
+import json
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump when cleaning logic changes in a way the config hash cannot see
+CACHE_VERSION = 2
+
+
+def fingerprint_frame(df):
+    """Fast content hash of a DataFrame (values, column names and dtypes)"""
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    hasher.update(json.dumps([str(t) for t in df.dtypes]).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _dtype_name(dtype):
+    """dtype string that keeps the storage of string dtypes (str() drops it)"""
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def fingerprint_config(config):
+    """Stable hash of the effective cleaning configuration"""
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+class VNPTCleaningCache:
+    """On-disk cache of VNPTDataCleaner results shared across sessions and processes"""
+
+    def __init__(self, cache_dir='data/cache/cleaned'):
+        """Initialize cache directory"""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, df, config, snapshot_date):
+        """Cache key from raw data fingerprint, config hash and snapshot date"""
+        parts = [
+            f"v{CACHE_VERSION}",
+            fingerprint_frame(df),
+            fingerprint_config(config),
+            str(snapshot_date)
+        ]
+        return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=20).hexdigest()
+
+    def _paths(self, key):
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        """Return (df_cleaned, report) for a key, or None on a miss"""
+        data_path, report_path = self._paths(key)
+        if not (data_path.exists() and report_path.exists()):
+            return None
+
+        try:
+            df_cleaned = pd.read_parquet(data_path)
+            with open(report_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            report = entry['report']
+            df_cleaned = self._restore_dtypes(df_cleaned, entry.get('dtypes', {}))
+        except Exception as e:
+            logger.warning(f"Could not read cleaning cache entry {key}: {e}")
+            return None
+
+        logger.info(f"Cleaning cache hit: {key}")
+        return df_cleaned, report
+
+    def put(self, key, df_cleaned, report):
+        """Store a cleaned frame and its report"""
+        data_path, report_path = self._paths(key)
+        tmp_path = data_path.with_suffix('.parquet.tmp')
+        try:
+            df_cleaned.to_parquet(tmp_path, index=False)
+            tmp_path.replace(data_path)
+            entry = {
+                'report': report,
+                'dtypes': {str(col): _dtype_name(dtype) for col, dtype in df_cleaned.dtypes.items()}
+            }
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, indent=2, default=str)
+            logger.info(f"Cleaning result cached: {key}")
+        except ImportError:
+            logger.warning("pyarrow is not installed, cleaning cache disabled")
+        except Exception as e:
+            logger.warning(f"Could not cache cleaning result: {e}")
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _restore_dtypes(self, df, dtypes):
+        """Parquet does not round-trip every pandas dtype (e.g. string[pyarrow] storage)"""
+        for col, dtype in dtypes.items():
+            if col in df.columns and _dtype_name(df[col].dtype) != dtype and dtype != 'category':
+                try:
+                    df[col] = df[col].astype(dtype)
+                except (ValueError, TypeError):
+                    pass
+        return df
+
+    def clear(self):
+        """Remove all cached cleaning results"""
+        removed = 0
+        for path in self.cache_dir.glob('*'):
+            if path.suffix in ('.parquet', '.json'):
+                path.unlink()
+                removed += 1
+        logger.info(f"Removed {removed} cached files from {self.cache_dir}")
+        return removed
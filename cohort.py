@@ -0,0 +1,77 @@
+"""
+Cohort Module for VNPT Telecom Dataset
+Activation-month cohort retention matrix built from integer month codes with a
+single bincount; lifetimes are additive partials merged across partitions
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cohorts reported and months since activation tracked by the retention matrix
+COHORT_MONTHS = 24
+
+
+def cohort_lifetimes(activation, expiry, max_age=COHORT_MONTHS):
+    """Customers per activation-month cohort and months until expiry (additive partial)
+
+    Rows are cohorts (month ordinals, i.e. months since 1970-01) and columns the
+    number of whole calendar months from activation to expiry, capped at
+    max_age + 1; missing expiry dates count as still active. Built from integer
+    month codes with a single bincount; rows without an activation date are skipped.
+    """
+    activation = pd.to_datetime(activation).to_numpy().astype('datetime64[M]')
+    expiry = pd.to_datetime(expiry).to_numpy().astype('datetime64[M]')
+    valid = ~np.isnat(activation)
+    start = activation[valid].view('int64')
+    end = expiry[valid]
+
+    width = max_age + 2
+    lifetime = np.full(len(start), width - 1, dtype=np.int64)
+    expires = ~np.isnat(end)
+    lifetime[expires] = np.clip(end[expires].view('int64') - start[expires], 0, width - 1)
+
+    # Month codes span a dense range, so they index the histogram directly
+    first = int(start.min()) if len(start) else 0
+    months = int(start.max()) - first + 1 if len(start) else 0
+    counts = np.bincount((start - first) * width + lifetime, minlength=months * width).reshape(months, width)
+    present = counts.any(axis=1)
+    return pd.DataFrame(counts[present], index=pd.Index(np.flatnonzero(present) + first, name='cohort'),
+                        columns=range(width))
+
+
+def cohort_retention(lifetimes, max_cohorts=COHORT_MONTHS):
+    """Retention matrix of the latest cohorts from cohort_lifetimes counts
+
+    retention[i][k] is the share of cohort i whose account has not expired k months
+    after its activation month. Cells after the latest activation month (not yet
+    observable) are None.
+    """
+    if lifetimes is None or lifetimes.empty:
+        return {'cohorts': [], 'months_since_activation': [], 'cohort_sizes': [], 'retention': []}
+
+    lifetimes = lifetimes.sort_index()
+    reference = int(lifetimes.index[-1])
+    lifetimes = lifetimes.tail(max_cohorts)
+    cohorts = lifetimes.index.to_numpy(dtype=np.int64)
+    counts = lifetimes.to_numpy(dtype=np.float64)
+    ages = np.arange(counts.shape[1] - 1)
+
+    # Still active at age k <=> expiry more than k months after activation
+    active = counts[:, ::-1].cumsum(axis=1)[:, ::-1][:, 1:]
+    sizes = counts.sum(axis=1)
+    rates = np.round(active / sizes[:, None], 4)
+    observed = ages[None, :] <= (reference - cohorts)[:, None]
+
+    return {
+        'cohorts': [str(p) for p in pd.PeriodIndex.from_ordinals(cohorts, freq='M')],
+        'months_since_activation': ages.tolist(),
+        'cohort_sizes': sizes.astype(np.int64).tolist(),
+        'retention': [
+            [float(rate) if seen else None for rate, seen in zip(row, mask)]
+            for row, mask in zip(rates, observed)
+        ]
+    }
@@ -8,6 +8,21 @@ import google.generativeai as genai
 from typing import Dict, Any, Optional
 import json
 import streamlit as st
+from column_profile import get_column_profile
+
+
+def _is_numeric(series):
+    """Numeric columns of any width (int32, Int32, float32...), excluding booleans"""
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def _numeric_stats(col_profile):
+    """min/max/mean of a column profile as floats (None for an all-missing column)"""
+    return {
+        key: float(col_profile[key]) if not pd.isna(col_profile[key]) else None
+        for key in ('min', 'max', 'mean')
+    }
+
 
 class ColumnDictionary:
     """
@@ -54,28 +69,26 @@ class ColumnDictionary:
         Returns:
             Dict[column_name, column_info]
         """
-        # Prepare summary for all columns
+        # Prepare summary for all columns (counts and stats from the shared column profile)
         columns_data = []
+        profile = get_column_profile(self.df)
         
         for col in self.df.columns:
             col_data = self.df[col]
+            col_profile = profile.column(col)
             sample_values = col_data.dropna().head(3).tolist()
             
             col_summary = {
                 'name': col,
-                'dtype': str(col_data.dtype),
-                'unique': int(col_data.nunique()),
-                'missing': int(col_data.isnull().sum()),
+                'dtype': col_profile['dtype'],
+                'unique': col_profile['unique'],
+                'missing': col_profile['missing'],
                 'sample': sample_values
             }
             
             # Add stats for numeric
-            if col_data.dtype in ['int64', 'float64']:
-                col_summary['stats'] = {
-                    'min': float(col_data.min()) if not pd.isna(col_data.min()) else None,
-                    'max': float(col_data.max()) if not pd.isna(col_data.max()) else None,
-                    'mean': float(col_data.mean()) if not pd.isna(col_data.mean()) else None
-                }
+            if _is_numeric(col_data):
+                col_summary['stats'] = _numeric_stats(col_profile)
             
             columns_data.append(col_summary)
         
@@ -270,19 +283,16 @@ Giải thích TẠI SAO bạn đoán như vậy:
         """
         # Prepare column analysis data
         col_data = self.df[column]
-        dtype = str(col_data.dtype)
+        col_profile = get_column_profile(self.df).column(column)
+        dtype = col_profile['dtype']
         sample_values = col_data.dropna().head(5).tolist()
-        unique_count = col_data.nunique()
-        missing_count = col_data.isnull().sum()
+        unique_count = col_profile['unique']
+        missing_count = col_profile['missing']
         
         # Statistics for numeric columns
         stats = {}
-        if col_data.dtype in ['int64', 'float64']:
-            stats = {
-                'min': float(col_data.min()) if not pd.isna(col_data.min()) else None,
-                'max': float(col_data.max()) if not pd.isna(col_data.max()) else None,
-                'mean': float(col_data.mean()) if not pd.isna(col_data.mean()) else None
-            }
+        if _is_numeric(col_data):
+            stats = _numeric_stats(col_profile)
         
         # Build prompt for Gemini
         prompt = f"""
@@ -0,0 +1,149 @@
+"""
+Column Profile Module for VNPT Telecom Dataset
+Single-pass per-column profile (nulls, uniques, dtype, min/max/mean, top values)
+memoized per DataFrame version and shared by the report, pages and AI prompts
+"""
+
+import pandas as pd
+import numpy as np
+import weakref
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+
+# id(df) -> (weakref to df, frame signature, ColumnProfile)
+_PROFILES = {}
+
+
+class ColumnProfile:
+    """Profile of every column of a DataFrame
+
+    Each column is scanned once with value_counts(dropna=False); null counts,
+    unique counts, top-k values and min/max/mean are all derived from those
+    counts instead of separate isnull/nunique/describe scans.
+    """
+
+    def __init__(self, df, top_k=DEFAULT_TOP_K):
+        """Profile df keeping the top_k most frequent values per column"""
+        self.rows = len(df)
+        self.top_k = top_k
+        self.columns = list(df.columns)
+        self.dtypes = df.dtypes.astype(str)
+
+        null_counts, unique_counts, stats = {}, {}, {}
+        self.top_values = {}
+        for col in self.columns:
+            series = df[col]
+            counts = series.value_counts(dropna=False)
+            is_null = counts.index.isna()
+
+            valid = counts[~is_null]
+            valid = valid[valid > 0]
+            null_counts[col] = int(counts[is_null].sum())
+            unique_counts[col] = len(valid)
+            self.top_values[col] = valid.head(top_k)
+            stats[col] = self._value_stats(series, valid)
+
+        self.null_counts = pd.Series(null_counts, index=self.columns, dtype='int64')
+        self.unique_counts = pd.Series(unique_counts, index=self.columns, dtype='int64')
+        self.stats = pd.DataFrame.from_dict(stats, orient='index', columns=['min', 'max', 'mean'])
+
+    @staticmethod
+    def _value_stats(series, valid):
+        """min/max/mean from the distinct values and their counts"""
+        if len(valid) == 0:
+            return {'min': None, 'max': None, 'mean': None}
+        dtype = series.dtype
+        if pd.api.types.is_numeric_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+            values = valid.index.to_numpy(dtype=np.float64)
+            weights = valid.to_numpy(dtype=np.float64)
+            return {
+                'min': float(values.min()),
+                'max': float(values.max()),
+                'mean': float(np.dot(values, weights) / weights.sum())
+            }
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return {'min': valid.index.min(), 'max': valid.index.max(), 'mean': None}
+        return {'min': None, 'max': None, 'mean': None}
+
+    @property
+    def missing_pct(self):
+        """Missing percentage per column"""
+        if self.rows == 0:
+            return self.null_counts.astype(float)
+        return self.null_counts / self.rows * 100
+
+    @property
+    def missing_total(self):
+        """Total missing cells"""
+        return int(self.null_counts.sum())
+
+    @property
+    def missing_cell_pct(self):
+        """Missing cells as a percentage of all cells"""
+        cells = self.rows * len(self.columns)
+        return self.missing_total / cells * 100 if cells else 0.0
+
+    def columns_with_missing(self):
+        """Columns that have at least one missing value"""
+        return self.null_counts[self.null_counts > 0].index.tolist()
+
+    def summary_frame(self):
+        """One row per column: dtype, missing, missing %, unique, min, max, mean"""
+        return pd.DataFrame({
+            'dtype': self.dtypes,
+            'missing': self.null_counts,
+            'missing_pct': self.missing_pct.round(2),
+            'unique': self.unique_counts,
+            'min': self.stats['min'],
+            'max': self.stats['max'],
+            'mean': self.stats['mean']
+        })
+
+    def column(self, col):
+        """Profile of a single column as a dict"""
+        return {
+            'dtype': self.dtypes[col],
+            'missing': int(self.null_counts[col]),
+            'missing_pct': float(self.missing_pct[col]),
+            'unique': int(self.unique_counts[col]),
+            'min': self.stats.at[col, 'min'],
+            'max': self.stats.at[col, 'max'],
+            'mean': self.stats.at[col, 'mean'],
+            'top_values': self.top_values[col]
+        }
+
+
+def _signature(df):
+    """Cheap frame version check: shape, column names and dtypes"""
+    return df.shape, tuple(df.columns), tuple(str(t) for t in df.dtypes)
+
+
+def get_column_profile(df, top_k=DEFAULT_TOP_K):
+    """Column profile of df, computed once per frame version
+
+    Profiles are memoized per DataFrame object and dropped when the frame is
+    garbage collected. A frame whose shape, columns or dtypes changed is
+    re-profiled; in-place edits of values that keep all three are not detected.
+    """
+    key = id(df)
+    signature = _signature(df)
+    entry = _PROFILES.get(key)
+    if entry is not None:
+        ref, cached_signature, profile = entry
+        if ref() is df and cached_signature == signature and profile.top_k >= top_k:
+            return profile
+
+    profile = ColumnProfile(df, top_k=top_k)
+    _PROFILES[key] = (weakref.ref(df, lambda ref, key=key: _forget(key, ref)), signature, profile)
+    return profile
+
+
+def _forget(key, ref):
+    """Drop the memoized profile of a collected frame (unless the id was reused)"""
+    entry = _PROFILES.get(key)
+    if entry is not None and entry[0] is ref:
+        del _PROFILES[key]
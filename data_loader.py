@@ -0,0 +1,268 @@
+"""
+Data Loading Module for VNPT Telecom Dataset
+Caches parsed Excel workbooks as columnar Parquet files keyed by content fingerprint
+and applies the declarative column schema from config.yaml at load time
+"""
+
+import pandas as pd
+import hashlib
+import io
+from pathlib import Path
+from openpyxl import load_workbook
+import yaml
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk cache layout changes so stale entries are ignored
+CACHE_VERSION = 1
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class VNPTDataLoader:
+    """Load Excel workbooks through a fingerprinted Parquet cache"""
+
+    def __init__(self, cache_dir='data/cache', schema=None):
+        """Initialize loader with cache directory and optional column schema"""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.schema = schema
+        self.last_cache_hit = False
+        self.last_memory_report = None
+
+    def fingerprint(self, source, sheet_name=0):
+        """Content hash of a workbook (path, bytes or file-like object)"""
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(f"v{CACHE_VERSION}|sheet={sheet_name}|".encode('utf-8'))
+
+        if isinstance(source, (bytes, bytearray)):
+            hasher.update(source)
+        elif hasattr(source, 'read'):
+            position = source.tell() if hasattr(source, 'tell') else None
+            for block in iter(lambda: source.read(READ_BLOCK_SIZE), b''):
+                hasher.update(block)
+            if position is not None:
+                source.seek(position)
+        else:
+            with open(source, 'rb') as f:
+                for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+                    hasher.update(block)
+
+        return hasher.hexdigest()
+
+    def cache_path(self, key):
+        """Parquet file backing a cache key"""
+        return self.cache_dir / f"{key}.parquet"
+
+    def load(self, source, sheet_name=0):
+        """Load a workbook and apply the column schema"""
+        df = self._load_raw(source, sheet_name)
+
+        if self.schema:
+            before = df.memory_usage(deep=True)
+            df = apply_schema(df, self.schema)
+            self.last_memory_report = memory_report(before, df)
+            logger.info(
+                f"Applied column schema: {self.last_memory_report['before_mb']:.2f} MB -> "
+                f"{self.last_memory_report['after_mb']:.2f} MB"
+            )
+        return df
+
+    def _load_raw(self, source, sheet_name):
+        """Load a workbook, reading the columnar copy when the content is unchanged"""
+        key = self.fingerprint(source, sheet_name)
+        cache_file = self.cache_path(key)
+        self.last_cache_hit = False
+
+        if cache_file.exists():
+            try:
+                df = pd.read_parquet(cache_file)
+                self.last_cache_hit = True
+                logger.info(f"Loaded {len(df)} records from Parquet cache: {cache_file.name}")
+                return df
+            except Exception as e:
+                logger.warning(f"Could not read cache file {cache_file}: {e}, re-parsing workbook")
+
+        logger.info("Parsing Excel workbook (cache miss)...")
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        df = pd.read_excel(source, sheet_name=sheet_name)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+
+        df = normalize_mixed_columns(df)
+        self._write_cache(df, cache_file)
+        return df
+
+    def _write_cache(self, df, cache_file):
+        """Persist parsed frame as Parquet, skipping the cache if it cannot be written"""
+        tmp_file = cache_file.with_suffix('.parquet.tmp')
+        try:
+            df.to_parquet(tmp_file, index=False)
+            tmp_file.replace(cache_file)
+            logger.info(f"Cached parsed workbook: {cache_file}")
+        except ImportError:
+            logger.warning("pyarrow is not installed, Parquet cache disabled")
+        except Exception as e:
+            logger.warning(f"Could not cache workbook as Parquet: {e}")
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+
+    def clear_cache(self):
+        """Remove all cached Parquet files"""
+        removed = 0
+        for cache_file in self.cache_dir.glob('*.parquet'):
+            cache_file.unlink()
+            removed += 1
+        logger.info(f"Removed {removed} cached files from {self.cache_dir}")
+        return removed
+
+
+def normalize_mixed_columns(df):
+    """Convert text columns holding stray numbers to strings so Arrow can store them"""
+    for col in df.select_dtypes(include=['object']).columns:
+        inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+        if inferred in ('mixed', 'mixed-integer', 'mixed-integer-float'):
+            mask = df[col].notna()
+            df[col] = df[col].where(~mask, df[col].astype(str))
+            logger.info(f"Normalized mixed-type column {col} to strings")
+    return df
+
+
+def iter_excel_chunks(path, chunksize=50000, sheet_name=0):
+    """Yield a workbook as DataFrame blocks using openpyxl read-only mode"""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+
+        block = []
+        for row in rows:
+            if row is None or all(v is None for v in row):
+                continue
+            block.append(row)
+            if len(block) >= chunksize:
+                yield normalize_mixed_columns(pd.DataFrame.from_records(block, columns=columns))
+                block = []
+
+        if block:
+            yield normalize_mixed_columns(pd.DataFrame.from_records(block, columns=columns))
+    finally:
+        wb.close()
+
+
+def iter_table_chunks(path, chunksize=50000, sheet_name=0):
+    """Yield an Excel, CSV or Parquet file as DataFrame blocks (format from the suffix)"""
+    suffix = Path(path).suffix.lower()
+
+    if suffix == '.csv':
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield normalize_mixed_columns(chunk)
+    elif suffix == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield normalize_mixed_columns(batch.to_pandas())
+    else:
+        yield from iter_excel_chunks(path, chunksize=chunksize, sheet_name=sheet_name)
+
+
+def load_column_schema(config_path='config.yaml'):
+    """Read the column_schema section of config.yaml"""
+    if not Path(config_path).exists():
+        logger.warning(f"Config file not found: {config_path}, loading without column schema")
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    return config.get('column_schema', {})
+
+
+def _normalize_spec(spec):
+    """Schema entries are either a dtype string or a dict with dtype/format keys"""
+    if isinstance(spec, dict):
+        return spec['dtype'], spec.get('format')
+    return spec, None
+
+
+def apply_schema(df, schema):
+    """Cast columns to the compact dtypes declared in the schema
+    
+    Supported dtypes: category, string[pyarrow], int16/int32/int64, float32/float64,
+    bool and datetime64[ns] (with an optional strptime format for text dates).
+    Integer columns that contain missing values use the nullable variant (Int32...).
+    Columns absent from the frame are skipped.
+    """
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        dtype, date_format = _normalize_spec(spec)
+        series = df[col]
+
+        try:
+            if dtype.startswith('datetime64'):
+                if not pd.api.types.is_datetime64_any_dtype(series):
+                    df[col] = pd.to_datetime(series, format=date_format, errors='coerce')
+            elif dtype.lower().startswith('int'):
+                target = dtype.capitalize() if series.isnull().any() else dtype.lower()
+                if str(series.dtype) != target:
+                    df[col] = series.astype(target)
+            elif str(series.dtype) != dtype:
+                df[col] = series.astype(dtype)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not cast {col} to {dtype}: {e}")
+
+    return df
+
+
+def _text_value(value):
+    """A stray number as the string it would be in a text column ('-1', not '-1.0')"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def apply_chunk_schema(df, schema):
+    """apply_schema for one block of a chunked read, so every block gets the same dtypes
+    
+    A text column (category/string in the schema) whose values in this block happen
+    to be all numbers, e.g. LIFE_CYCLE_STAT_CD holding only -1, is read as int or float;
+    its values are turned into strings first, as normalize_mixed_columns does for
+    blocks that mix numbers and codes.
+    """
+    for col, spec in schema.items():
+        dtype, _ = _normalize_spec(spec)
+        if col in df.columns and (dtype == 'category' or dtype.startswith('string')):
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                df[col] = series.astype(object).where(series.isnull(), series.map(_text_value))
+    return apply_schema(df, schema)
+
+
+def memory_report(before, df_after):
+    """Per-column memory usage before and after applying the schema
+    
+    `before` is the result of DataFrame.memory_usage(deep=True) taken prior to casting.
+    """
+    after = df_after.memory_usage(deep=True)
+    columns = {}
+    for col in df_after.columns:
+        columns[col] = {
+            'dtype': str(df_after[col].dtype),
+            'before_mb': round(float(before.get(col, 0)) / 1024 / 1024, 3),
+            'after_mb': round(float(after[col]) / 1024 / 1024, 3)
+        }
+
+    before_mb = float(before.sum()) / 1024 / 1024
+    after_mb = float(after.sum()) / 1024 / 1024
+    return {
+        'before_mb': round(before_mb, 2),
+        'after_mb': round(after_mb, 2),
+        'saved_pct': round((1 - after_mb / before_mb) * 100, 1) if before_mb else 0.0,
+        'columns': columns
+    }
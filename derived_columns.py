@@ -0,0 +1,248 @@
+"""
+Derived Column Engine for VNPT Telecom Dataset
+Compiles declarative derived-column definitions from config.yaml into whole-column NumPy operations
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NS_PER_DAY = 24 * 60 * 60 * 10**9
+
+COMPARISONS = {
+    'lt': np.less,
+    'le': np.less_equal,
+    'gt': np.greater,
+    'ge': np.greater_equal,
+    'eq': np.equal,
+    'ne': np.not_equal
+}
+
+# Operations whose result depends on the snapshot date
+SNAPSHOT_OPS = {'days_since', 'days_until'}
+
+
+class DerivedColumnError(ValueError):
+    """Invalid derived column declaration"""
+
+
+def _datetime_ns(values):
+    """Datetime values as int64 nanoseconds plus a NaT mask"""
+    values = pd.to_datetime(pd.Series(values), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    return values.astype(np.int64), np.isnat(values)
+
+
+def _floor_days(delta_ns, missing):
+    """Whole days from a nanosecond difference, floored like Timedelta.days (NaN where missing)"""
+    days = np.floor_divide(delta_ns, NS_PER_DAY)
+    if missing.any():
+        days = days.astype(np.float64)
+        days[missing] = np.nan
+    return days
+
+
+def _column_values(series):
+    """Column as a NumPy array suitable for vectorized comparison"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).to_numpy()
+    if pd.api.types.is_extension_array_dtype(series.dtype):
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return series.to_numpy(dtype=object, na_value=None)
+    return series.to_numpy()
+
+
+class DerivedColumnEngine:
+    """Evaluate derived columns declared as expression trees
+
+    Each declaration is a dict with a `name`, an `op` and op-specific keys:
+
+    - notnull / isnull: `column`
+    - days_since / days_until: `column` (date), relative to the snapshot date
+    - date_diff: `start`, `end` (dates), whole days end - start
+    - lt / le / gt / ge / eq / ne: `column` and either `value` or `other` (a column)
+    - and / or: `conditions` (list of expressions); not: `condition`
+    - where: `condition`, `then`, `else`
+    - bin: `column`, `bins`, `labels` (right-closed, lowest edge included)
+
+    Nested expressions (conditions) use the same dict form without `name`.
+    An optional `default` is used when a referenced column is unavailable.
+    Declarations are evaluated in dependency order, so a column may reference
+    another derived column regardless of where it appears in the list.
+    """
+
+    def __init__(self, declarations, today=None):
+        """Validate declarations and compute evaluation order"""
+        self.today = today or datetime.now()
+        self.declarations = {}
+        for decl in declarations:
+            if 'name' not in decl or 'op' not in decl:
+                raise DerivedColumnError(f"Derived column needs 'name' and 'op': {decl}")
+            self._validate(decl)
+            self.declarations[decl['name']] = decl
+        self.order = self._topological_order()
+
+    def _validate(self, expr):
+        """Check that an expression tree only uses known operations"""
+        op = expr.get('op')
+        known = {'notnull', 'isnull', 'date_diff', 'and', 'or', 'not', 'where', 'bin'} | SNAPSHOT_OPS | set(COMPARISONS)
+        if op not in known:
+            raise DerivedColumnError(f"Unknown derived column op '{op}' in {expr}")
+        for child in self._children(expr):
+            self._validate(child)
+
+    def _children(self, expr):
+        """Nested expressions of a node"""
+        op = expr['op']
+        if op in ('and', 'or'):
+            return list(expr['conditions'])
+        if op in ('not', 'where'):
+            return [expr['condition']]
+        return []
+
+    def _references(self, expr):
+        """All column names referenced by an expression tree"""
+        refs = set()
+        for key in ('column', 'other', 'start', 'end'):
+            if key in expr:
+                refs.add(expr[key])
+        for child in self._children(expr):
+            refs |= self._references(child)
+        return refs
+
+    def _topological_order(self):
+        """Order declarations so each is evaluated after the derived columns it uses"""
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise DerivedColumnError(f"Circular derived column dependency at '{name}'")
+            visiting.add(name)
+            for ref in self._references(self.declarations[name]):
+                if ref in self.declarations and ref != name:
+                    visit(ref)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.declarations:
+            visit(name)
+        return order
+
+    def date_columns(self):
+        """Source columns used as dates by any declaration"""
+        columns = set()
+
+        def collect(expr):
+            if expr['op'] in SNAPSHOT_OPS:
+                columns.add(expr['column'])
+            elif expr['op'] == 'date_diff':
+                columns.update([expr['start'], expr['end']])
+            for child in self._children(expr):
+                collect(child)
+
+        for decl in self.declarations.values():
+            collect(decl)
+        return columns - set(self.declarations)
+
+    def snapshot_columns(self):
+        """Derived columns that change with the snapshot date, directly or via dependencies"""
+        dependent = set()
+
+        def uses_snapshot(expr):
+            if expr['op'] in SNAPSHOT_OPS:
+                return True
+            if self._references(expr) & dependent:
+                return True
+            return any(uses_snapshot(child) for child in self._children(expr))
+
+        for name in self.order:
+            if uses_snapshot(self.declarations[name]):
+                dependent.add(name)
+        return [name for name in self.order if name in dependent]
+
+    def evaluate(self, df, columns=None):
+        """Add derived columns to df (all declarations, or only `columns`)"""
+        targets = self.order if columns is None else [n for n in self.order if n in set(columns)]
+
+        for name in targets:
+            decl = self.declarations[name]
+            missing = [ref for ref in self._references(decl) if ref not in df.columns]
+
+            if missing:
+                if 'default' in decl:
+                    df[name] = decl['default']
+                    logger.warning(f"{', '.join(missing)} not found, {name} set to default {decl['default']!r}")
+                else:
+                    logger.warning(f"{', '.join(missing)} not found, skipping {name} creation")
+                continue
+
+            df[name] = self._eval(decl, df)
+            self._log_summary(name, df[name])
+
+        return df
+
+    def _eval(self, expr, df):
+        """Evaluate one expression node to a whole-column array"""
+        op = expr['op']
+
+        if op == 'notnull':
+            return df[expr['column']].notna().to_numpy()
+        if op == 'isnull':
+            return df[expr['column']].isna().to_numpy()
+
+        if op in SNAPSHOT_OPS:
+            today_ns = np.datetime64(self.today, 'ns').astype(np.int64)
+            values_ns, missing = _datetime_ns(df[expr['column']])
+            delta = today_ns - values_ns if op == 'days_since' else values_ns - today_ns
+            return _floor_days(delta, missing)
+
+        if op == 'date_diff':
+            start_ns, start_missing = _datetime_ns(df[expr['start']])
+            end_ns, end_missing = _datetime_ns(df[expr['end']])
+            return _floor_days(end_ns - start_ns, start_missing | end_missing)
+
+        if op in COMPARISONS:
+            left = _column_values(df[expr['column']])
+            right = _column_values(df[expr['other']]) if 'other' in expr else expr['value']
+            with np.errstate(invalid='ignore'):
+                result = COMPARISONS[op](left, right)
+            # Missing values never satisfy a comparison
+            return np.asarray(result, dtype=bool) & pd.notna(left)
+
+        if op == 'and':
+            return np.logical_and.reduce([self._eval(c, df) for c in expr['conditions']])
+        if op == 'or':
+            return np.logical_or.reduce([self._eval(c, df) for c in expr['conditions']])
+        if op == 'not':
+            return ~self._eval(expr['condition'], df)
+
+        if op == 'where':
+            return np.where(self._eval(expr['condition'], df), expr['then'], expr['else']).astype(object)
+
+        if op == 'bin':
+            values = _column_values(df[expr['column']]).astype(np.float64)
+            bins = np.asarray(expr['bins'], dtype=np.float64)
+            # Right-closed intervals (b[i-1], b[i]] with the lowest edge included, like pd.cut
+            codes = np.searchsorted(bins, values, side='left')
+            codes[values == bins[0]] = 1
+            codes = codes - 1
+            codes[(codes < 0) | (codes >= len(bins) - 1) | np.isnan(values)] = -1
+            return pd.Categorical.from_codes(codes, categories=expr['labels'], ordered=True)
+
+        raise DerivedColumnError(f"Unknown derived column op '{op}'")
+
+    def _log_summary(self, name, series):
+        """Log a one-line summary of a derived column"""
+        if pd.api.types.is_bool_dtype(series):
+            logger.info(f"{name}: {int(series.sum())} True ({series.mean()*100:.1f}%)")
+        elif pd.api.types.is_numeric_dtype(series):
+            logger.info(f"{name}: Mean = {series.mean():.0f}")
+        else:
+            logger.info(f"{name} distribution: {series.value_counts().to_dict()}")
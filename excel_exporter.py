@@ -4,12 +4,13 @@ Creates professional Excel output with multiple sheets and formatting
 """
 
 import pandas as pd
-import json
 from pathlib import Path
 import logging
 from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
+from stats_io import load_stats
+from ranking import RANKING_METRICS, rank_groups
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -50,6 +51,9 @@ class VNPTExcelExporter:
             # Sheet 5: Staff Performance
             self._write_staff_sheet(writer)
             
+            # Sheet 6: Staff Rankings
+            self._write_rankings_sheet(writer)
+            
         # Apply formatting
         self._apply_formatting()
         
@@ -160,6 +164,31 @@ class VNPTExcelExporter:
         df_staff = pd.DataFrame(staff_data)
         df_staff.to_excel(writer, sheet_name='Staff Performance', index=False)
     
+    def _write_rankings_sheet(self, writer):
+        """Write top 10 staff for each ranking metric side by side"""
+        logger.info("Writing Staff Rankings sheet...")
+        
+        # Stats files from sketch count mode (or older runs) have no rankings
+        rankings = self.stats['staff_performance'].get('rankings')
+        if rankings is None:
+            if 'STAFF_CODE' not in self.df_cleaned.columns:
+                return
+            rankings = {
+                metric: rank_groups(self.df_cleaned, 'STAFF_CODE', k=10, metric=metric)[metric].round(2).to_dict()
+                for metric in RANKING_METRICS
+            }
+        
+        columns = {}
+        for metric in RANKING_METRICS:
+            title = metric.replace('_', ' ').title().replace('Tkc', 'TKC')
+            top = rankings.get(metric, {})
+            columns[f'{title} - Staff Code'] = pd.Series(list(top.keys()), dtype=object)
+            columns[title] = pd.Series(list(top.values()), dtype=float)
+        
+        df_rankings = pd.DataFrame(columns)
+        df_rankings.insert(0, 'Rank', range(1, len(df_rankings) + 1))
+        df_rankings.to_excel(writer, sheet_name='Staff Rankings', index=False)
+    
     def _apply_formatting(self):
         """Apply professional formatting to Excel file"""
         logger.info("Applying formatting...")
@@ -205,8 +234,7 @@ def main():
     # Load data
     df_cleaned = pd.read_excel(r"c:\Users\Admin\.gemini\antigravity\playground\zonal-star\data\cleaned_data.xlsx")
     
-    with open(r"c:\Users\Admin\.gemini\antigravity\playground\zonal-star\data\statistical_analysis.json", 'r', encoding='utf-8') as f:
-        stats = json.load(f)
+    stats = load_stats(r"c:\Users\Admin\.gemini\antigravity\playground\zonal-star\data\statistical_analysis.json")
     
     # Export
     exporter = VNPTExcelExporter(df_cleaned, stats)
@@ -9,6 +9,8 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 from typing import Dict, Any
 
+from column_profile import get_column_profile
+
 # Load environment variables
 load_dotenv()
 
@@ -47,8 +49,9 @@ def analyze_data_quality(df: pd.DataFrame, lang='vi', column_dict=None) -> str:
     # Prepare data summary
     total_rows = len(df)
     total_cols = len(df.columns)
-    missing_summary = df.isnull().sum()
-    missing_pct = (missing_summary / total_rows * 100).round(2)
+    profile = get_column_profile(df)
+    missing_summary = profile.null_counts
+    missing_pct = profile.missing_pct.round(2)
     duplicates = df.duplicated().sum()
     
     # Add column meanings if available
@@ -113,10 +116,11 @@ def suggest_cleaning_strategies(df: pd.DataFrame, column: str, lang='vi') -> str
     
     # Analyze column
     col_data = df[column]
-    missing_count = col_data.isnull().sum()
-    missing_pct = (missing_count / len(df) * 100).round(2)
+    col_profile = get_column_profile(df).column(column)
+    missing_count = col_profile['missing']
+    missing_pct = round(col_profile['missing_pct'], 2)
     dtype = col_data.dtype
-    unique_count = col_data.nunique()
+    unique_count = col_profile['unique']
     
     # Sample values
     sample_values = col_data.dropna().head(10).tolist()
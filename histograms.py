@@ -0,0 +1,196 @@
+"""
+Histogram Module for VNPT Telecom Dataset
+Bins numeric columns server-side with NumPy so Plotly charts receive only bin
+edges and counts (bar traces, 2D heatmaps) or a bounded sample of points instead
+of every row
+"""
+
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+VNPT_BLUE = '#0066B2'
+DEFAULT_BINS = 50
+SCATTER_MODES = ('points', 'density')
+# Points drawn by a scatter before it is sampled
+SCATTER_POINT_BUDGET = 20000
+# Every group keeps at least this many sampled points (or all of its rows)
+SCATTER_MIN_GROUP_POINTS = 200
+DENSITY_BINS = 120
+
+
+def finite_values(values):
+    """Values as a float array without NaN/inf (nullable and compact dtypes included)"""
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def histogram_bins(values, bins=DEFAULT_BINS, range=None):
+    """Counts and edges of equal-width bins over the finite values (np.histogram)"""
+    return np.histogram(finite_values(values), bins=bins, range=range)
+
+
+def grouped_histogram_bins(values, groups, bins=DEFAULT_BINS):
+    """Counts per group on shared edges as ({group: counts}, edges)
+
+    All groups are counted in one bincount over (group, bin) cells; rows with a
+    missing value or group are skipped.
+    """
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, labels = pd.factorize(pd.Series(groups).to_numpy(), sort=True)
+    keep = np.isfinite(values) & (codes >= 0)
+    values, codes = values[keep], codes[keep]
+
+    edges = np.histogram_bin_edges(values, bins=bins)
+    n_bins = len(edges) - 1
+    # Bins are left-closed except the last one, as in np.histogram
+    positions = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, n_bins - 1)
+    counts = np.bincount(codes * n_bins + positions, minlength=len(labels) * n_bins).reshape(len(labels), n_bins)
+    return dict(zip(labels, counts)), edges
+
+
+def histogram_figure(values, bins=DEFAULT_BINS, groups=None, color=VNPT_BLUE, color_map=None, title=None,
+                     x_title=None, y_title='Số lượng', group_title=None):
+    """Plotly histogram of pre-binned counts (one bar trace per group, stacked)
+
+    The figure holds len(edges) numbers per trace whatever the number of rows.
+    """
+    if groups is None:
+        counts, edges = histogram_bins(values, bins)
+        series = [(None, counts, color)]
+    else:
+        grouped, edges = grouped_histogram_bins(values, groups, bins)
+        color_map = color_map or {}
+        series = [(label, counts, color_map.get(label)) for label, counts in grouped.items()]
+
+    centers = (edges[:-1] + edges[1:]) / 2
+    ranges = np.column_stack([edges[:-1], edges[1:]])
+
+    fig = go.Figure()
+    for label, counts, trace_color in series:
+        fig.add_trace(go.Bar(
+            x=centers,
+            y=counts,
+            width=np.diff(edges),
+            name=str(label) if label is not None else None,
+            showlegend=label is not None,
+            marker=dict(color=trace_color, line=dict(width=0)),
+            customdata=ranges,
+            hovertemplate='%{customdata[0]:,.4g} – %{customdata[1]:,.4g}<br>%{y:,}<extra></extra>'
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        legend_title_text=group_title,
+        barmode='stack',
+        bargap=0
+    )
+    return fig
+
+
+def stratified_sample(groups, budget=SCATTER_POINT_BUDGET, min_per_group=SCATTER_MIN_GROUP_POINTS, seed=42):
+    """Sorted positions of a random sample of about budget rows, stratified by group
+
+    Each group gets a share of the budget proportional to its size, but at least
+    min_per_group rows (or all of them), so small groups stay visible. Rows are
+    kept with their group's sampling rate in a single vectorized draw.
+    """
+    codes, _ = pd.factorize(pd.Series(groups).to_numpy(), use_na_sentinel=False)
+    n = len(codes)
+    if n <= budget:
+        return np.arange(n)
+
+    sizes = np.bincount(codes)
+    quota = np.minimum(sizes, np.maximum(budget * sizes / n, min_per_group))
+    rate = quota / sizes
+    return np.flatnonzero(np.random.default_rng(seed).random(n) < rate[codes])
+
+
+def _bin_positions(values, bins):
+    """Equal-width edges over the value range and each value's bin (last bin closed)"""
+    edges = np.histogram_bin_edges(values, bins=bins)
+    span = edges[-1] - edges[0]
+    positions = ((values - edges[0]) * (bins / span)).astype(np.int64) if span > 0 else np.zeros(len(values), np.int64)
+    return np.clip(positions, 0, bins - 1), edges
+
+
+def histogram2d_bins(x, y, bins=DENSITY_BINS):
+    """Counts (x bins by y bins) and edges of a 2D histogram over the rows where both
+    x and y are finite, binned arithmetically with one bincount"""
+    x = pd.Series(x).to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.Series(y).to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = np.isfinite(x) & np.isfinite(y)
+    x_bins, x_edges = _bin_positions(x[keep], bins)
+    y_bins, y_edges = _bin_positions(y[keep], bins)
+    counts = np.bincount(x_bins * bins + y_bins, minlength=bins * bins).reshape(bins, bins)
+    return counts, x_edges, y_edges
+
+
+def scatter_figure(x, y, groups=None, mode='points', budget=SCATTER_POINT_BUDGET, bins=DENSITY_BINS,
+                   colors=None, title=None, x_title=None, y_title=None, group_title=None):
+    """Scatter that stays light at any row count; returns (figure, points drawn)
+
+    'points' draws WebGL markers (scattergl): every row up to budget rows, a
+    stratified sample of about budget rows above that. 'density' draws a
+    2D-binned heatmap of all rows with one centroid marker per group (points
+    drawn is then 0).
+    """
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"Unknown scatter mode '{mode}', expected one of {SCATTER_MODES}")
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    groups = pd.Series(0 if groups is None else pd.Series(groups).to_numpy(), index=x.index)
+    colors = colors or [VNPT_BLUE]
+    labels = sorted(groups.dropna().unique())
+    fig = go.Figure()
+
+    if mode == 'density':
+        counts, x_edges, y_edges = histogram2d_bins(x, y, bins)
+        fig.add_trace(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.round(np.log10(np.where(counts.T > 0, counts.T, np.nan)), 3),
+            colorscale='Blues',
+            colorbar=dict(title='log10(số điểm)'),
+            customdata=counts.T,
+            hovertemplate='%{x:.2f}, %{y:.2f}<br>%{customdata:,}<extra></extra>'
+        ))
+        centroids = pd.DataFrame({'x': x, 'y': y, 'group': groups}).groupby('group', sort=False).mean()
+        for i, label in enumerate(labels):
+            fig.add_trace(go.Scatter(
+                x=[centroids.loc[label, 'x']],
+                y=[centroids.loc[label, 'y']],
+                mode='markers+text',
+                text=[str(label)],
+                textposition='top center',
+                marker=dict(size=14, color=colors[i % len(colors)], line=dict(width=2, color='white')),
+                name=str(label)
+            ))
+        shown = 0
+    else:
+        positions = stratified_sample(groups, budget)
+        sample_groups = groups.to_numpy()[positions]
+        for i, label in enumerate(labels):
+            rows = positions[sample_groups == label]
+            fig.add_trace(go.Scattergl(
+                x=x.to_numpy()[rows],
+                y=y.to_numpy()[rows],
+                mode='markers',
+                marker=dict(size=4, opacity=0.6, color=colors[i % len(colors)]),
+                name=str(label)
+            ))
+        shown = len(positions)
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        legend_title_text=group_title,
+        showlegend=len(labels) > 1
+    )
+    return fig, shown
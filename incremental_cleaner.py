@@ -0,0 +1,141 @@
+"""
+Incremental Cleaning Module for VNPT Telecom Dataset
+Cleans only inserted or changed subscriber records and merges them into the stored dataset
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import logging
+
+from cleaning_cache import VNPTCleaningCache, CACHE_VERSION, fingerprint_config
+from data_loader import apply_schema
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ROW_HASH_COLUMN = '_ROW_HASH'
+STATE_KEY = 'incremental_state'
+
+
+class VNPTIncrementalCleaner:
+    """Delta cleaning keyed on Phone number against the previously cleaned snapshot"""
+
+    def __init__(self, cleaner, state_dir='data/incremental', key='Phone number'):
+        """Initialize with a VNPTDataCleaner and a directory holding the last cleaned snapshot"""
+        self.cleaner = cleaner
+        self.key = key
+        self.store = VNPTCleaningCache(Path(state_dir))
+
+    def clean(self, df_raw):
+        """Clean a new raw snapshot, reusing unchanged rows from the stored cleaned dataset
+
+        Rows are matched on the key column and compared by a hash of their raw values,
+        with Donvi forward-filled first so a row whose filled value moves is re-cleaned.
+        Inserted and changed rows go through VNPTDataCleaner.clean_data; unchanged rows
+        are copied from the stored snapshot; rows missing from the new snapshot are dropped.
+        Snapshot-dependent columns are then recomputed for every row.
+        Returns (df_cleaned, summary).
+        """
+        row_hashes = self._row_hashes(df_raw)
+        previous = self.store.get(STATE_KEY)
+
+        if previous is None or self.key not in df_raw.columns:
+            logger.info("No previous cleaned snapshot, running full cleaning...")
+            return self._full_clean(df_raw, row_hashes)
+
+        if df_raw[self.key].duplicated().any():
+            logger.warning(f"Duplicate {self.key} values in new snapshot, running full cleaning...")
+            return self._full_clean(df_raw, row_hashes)
+
+        df_prev, state_info = previous
+        if state_info.get('logic') != self._logic_fingerprint():
+            logger.info("Cleaning config or logic changed since the stored snapshot, running full cleaning...")
+            return self._full_clean(df_raw, row_hashes)
+
+        prev_positions = pd.Index(df_prev[self.key]).get_indexer(df_raw[self.key])
+        prev_hashes = df_prev[ROW_HASH_COLUMN].to_numpy()
+
+        is_new = prev_positions < 0
+        is_changed = ~is_new & (prev_hashes[np.where(is_new, 0, prev_positions)] != row_hashes)
+        needs_cleaning = is_new | is_changed
+
+        summary = {
+            'mode': 'incremental',
+            'inserted': int(is_new.sum()),
+            'changed': int(is_changed.sum()),
+            'deleted': int(len(df_prev) - (~is_new).sum()),
+            'unchanged': int((~needs_cleaning).sum())
+        }
+        logger.info(
+            f"Delta vs previous snapshot: {summary['inserted']} inserted, {summary['changed']} changed, "
+            f"{summary['deleted']} deleted, {summary['unchanged']} unchanged"
+        )
+
+        kept = df_prev.iloc[prev_positions[~needs_cleaning]].drop(columns=[ROW_HASH_COLUMN])
+        kept.index = np.flatnonzero(~needs_cleaning)
+
+        if needs_cleaning.any():
+            delta = df_raw[needs_cleaning].copy()
+            if 'Donvi' in delta.columns:
+                # Forward fill must see the preceding rows of the full snapshot, not just the delta
+                delta['Donvi'] = df_raw['Donvi'].ffill()[needs_cleaning]
+            cleaned_delta = self.cleaner.clean_data(delta)
+            cleaned_delta.index = np.flatnonzero(needs_cleaning)
+            df_cleaned = self._concat(kept, cleaned_delta)
+        else:
+            df_cleaned = kept
+
+        df_cleaned = df_cleaned.reset_index(drop=True)
+        df_cleaned = self.cleaner.refresh_snapshot_columns(df_cleaned)
+        df_cleaned = apply_schema(df_cleaned, self.cleaner.config.get('column_schema', {}))
+        # Raw columns take their categories from the data: drop those only held by deleted or changed rows
+        for col in df_raw.columns.intersection(df_cleaned.columns):
+            if isinstance(df_cleaned[col].dtype, pd.CategoricalDtype):
+                df_cleaned[col] = df_cleaned[col].cat.remove_unused_categories()
+
+        self._save_state(df_cleaned, row_hashes, summary)
+        return df_cleaned, summary
+
+    def _concat(self, kept, cleaned_delta):
+        """Merge reused and re-cleaned rows back into snapshot order
+        
+        A column that is all missing on one side (e.g. TIME_START in a small delta without
+        services) is cast to the other side's dtype first, so concat keeps the stored dtype.
+        """
+        if len(kept) == 0:
+            return cleaned_delta
+        for part, other in ((kept, cleaned_delta), (cleaned_delta, kept)):
+            for col in part.columns.intersection(other.columns):
+                if part[col].dtype != other[col].dtype and part[col].isna().all():
+                    part[col] = part[col].astype(other[col].dtype)
+        return pd.concat([kept, cleaned_delta]).sort_index()
+
+    def _row_hashes(self, df_raw):
+        """Per-row hash of the raw values as clean_data sees them after the Donvi forward fill"""
+        if 'Donvi' in df_raw.columns:
+            df_raw = df_raw.assign(Donvi=df_raw['Donvi'].ffill())
+        return pd.util.hash_pandas_object(df_raw, index=False).to_numpy()
+
+    def _full_clean(self, df_raw, row_hashes):
+        """Clean the whole snapshot and store it as the new baseline"""
+        df_cleaned = self.cleaner.clean_data(df_raw)
+        summary = {
+            'mode': 'full',
+            'inserted': len(df_cleaned),
+            'changed': 0,
+            'deleted': 0,
+            'unchanged': 0
+        }
+        self._save_state(df_cleaned, row_hashes, summary)
+        return df_cleaned, summary
+
+    def _save_state(self, df_cleaned, row_hashes, summary):
+        """Persist cleaned snapshot with raw row hashes for the next delta"""
+        state = df_cleaned.copy(deep=False)
+        state[ROW_HASH_COLUMN] = row_hashes
+        self.store.put(STATE_KEY, state, dict(summary, logic=self._logic_fingerprint()))
+
+    def _logic_fingerprint(self):
+        """Identifies the cleaning config and logic version the stored rows were cleaned with"""
+        return f"v{CACHE_VERSION}-{fingerprint_config(self.cleaner.config)}"
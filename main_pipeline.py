@@ -12,8 +12,12 @@ import argparse
 # Import all modules
 from data_cleaner import VNPTDataCleaner
 from statistical_analyzer import VNPTStatisticalAnalyzer
-from visualization import VNPTVisualizer
+from visualization import VNPTVisualizer, RENDER_PROFILES, DEFAULT_RENDER_PROFILE
 from excel_exporter import VNPTExcelExporter
+from data_loader import VNPTDataLoader, load_column_schema
+from cleaning_cache import VNPTCleaningCache
+from incremental_cleaner import VNPTIncrementalCleaner
+from out_of_core import VNPTOutOfCoreRunner
 
 import pandas as pd
 import json
@@ -32,9 +36,21 @@ logger = logging.getLogger(__name__)
 class VNPTDataPipeline:
     """Main orchestrator for VNPT data analysis pipeline"""
     
-    def __init__(self, input_file, output_dir='outputs'):
+    def __init__(self, input_file, output_dir='outputs', incremental=False, out_of_core=False, chunksize=200000,
+                 quantile_mode='exact', analysis_workers=None, count_mode='exact', chart_mode='serial',
+                 chart_cache=True, render_profiles=(DEFAULT_RENDER_PROFILE,)):
         """Initialize pipeline"""
         self.input_file = Path(input_file)
+        self.incremental = incremental
+        self.out_of_core = out_of_core
+        self.chunksize = chunksize
+        self.quantile_mode = quantile_mode
+        self.count_mode = count_mode
+        self.chart_mode = chart_mode
+        self.chart_cache = chart_cache
+        self.render_profiles = list(dict.fromkeys(render_profiles))
+        self.chart_timings = None
+        self.analysis_workers = analysis_workers
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -45,6 +61,9 @@ class VNPTDataPipeline:
         
     def run_full_pipeline(self):
         """Run complete pipeline"""
+        if self.out_of_core:
+            return self.run_out_of_core_pipeline()
+        
         logger.info("=" * 100)
         logger.info("VNPT DATA ANALYSIS PIPELINE - FULL EXECUTION")
         logger.info("=" * 100)
@@ -56,21 +75,36 @@ class VNPTDataPipeline:
         try:
             # Step 1: Load raw data
             logger.info("\n[STEP 1/5] Loading raw data...")
-            df_raw = pd.read_excel(self.input_file)
-            logger.info(f"✓ Loaded {len(df_raw)} records with {len(df_raw.columns)} columns")
+            loader = VNPTDataLoader(cache_dir=self.data_dir / 'cache', schema=load_column_schema())
+            df_raw = loader.load(self.input_file)
+            source = "Parquet cache" if loader.last_cache_hit else "Excel workbook"
+            logger.info(f"✓ Loaded {len(df_raw)} records with {len(df_raw.columns)} columns from {source}")
+            if loader.last_memory_report:
+                memory = loader.last_memory_report
+                logger.info(f"✓ Compact dtypes: {memory['before_mb']:.2f} MB -> {memory['after_mb']:.2f} MB (-{memory['saved_pct']:.1f}%)")
             
             # Step 2: Clean data
             logger.info("\n[STEP 2/5] Cleaning data...")
             cleaner = VNPTDataCleaner()
-            df_cleaned = cleaner.clean_data(df_raw)
+            if self.incremental:
+                incremental_cleaner = VNPTIncrementalCleaner(cleaner, state_dir=self.data_dir / 'incremental')
+                df_cleaned, delta_summary = incremental_cleaner.clean(df_raw)
+                cleaning_report = cleaner.generate_cleaning_report(df_raw, df_cleaned)
+                cleaning_report['incremental'] = delta_summary
+            else:
+                cleaning_cache = VNPTCleaningCache(self.data_dir / 'cache' / 'cleaned')
+                df_cleaned, cleaning_report, cache_hit = cleaner.clean_with_report(
+                    df_raw, cache=cleaning_cache, profile_memory=True
+                )
+                if cache_hit:
+                    logger.info("✓ Reused cached cleaning result (input and config unchanged)")
             
             # Save cleaned data
             cleaned_path = self.data_dir / 'cleaned_data.xlsx'
             df_cleaned.to_excel(cleaned_path, index=False)
             logger.info(f"✓ Cleaned data saved: {cleaned_path}")
             
-            # Generate cleaning report
-            cleaning_report = cleaner.generate_cleaning_report(df_raw, df_cleaned)
+            # Save cleaning report
             report_path = self.data_dir / 'cleaning_report.json'
             with open(report_path, 'w', encoding='utf-8') as f:
                 json.dump(cleaning_report, f, ensure_ascii=False, indent=2)
@@ -78,8 +112,9 @@ class VNPTDataPipeline:
             
             # Step 3: Statistical analysis
             logger.info("\n[STEP 3/5] Performing statistical analysis...")
-            analyzer = VNPTStatisticalAnalyzer(df_cleaned)
-            stats = analyzer.analyze_all()
+            analyzer = VNPTStatisticalAnalyzer(df_cleaned, quantile_mode=self.quantile_mode,
+                                               count_mode=self.count_mode)
+            stats = analyzer.analyze_all(max_workers=self.analysis_workers)
             
             # Save analysis results
             stats_path = self.data_dir / 'statistical_analysis.json'
@@ -88,8 +123,19 @@ class VNPTDataPipeline:
             
             # Step 4: Generate visualizations
             logger.info("\n[STEP 4/5] Creating visualizations...")
-            visualizer = VNPTVisualizer(df_cleaned, stats, output_dir=self.output_dir / 'charts')
-            charts = visualizer.create_all_charts()
+            # Chart name -> path; charts of profiles other than publication are keyed
+            # '<profile>/<name>' like their directory under charts/
+            charts = {}
+            self.chart_timings = {}
+            for profile in self.render_profiles:
+                visualizer = VNPTVisualizer(df_cleaned, stats, output_dir=self._charts_dir(profile), profile=profile)
+                prefix = '' if profile == DEFAULT_RENDER_PROFILE else f'{profile}/'
+                for name, path in visualizer.create_all_charts(mode=self.chart_mode, use_cache=self.chart_cache).items():
+                    charts[prefix + name] = path
+                self.chart_timings[profile] = visualizer.chart_timings
+            for profile, timings in self.chart_timings.items():
+                logger.info(f"  {profile} ({timings['format']}): {timings['wall_time_s']:.2f}s, "
+                            f"{timings['total_bytes'] / 1024:.0f} KB")
             logger.info(f"✓ Generated {len(charts)} charts")
             
             # Step 5: Export outputs
@@ -142,27 +188,111 @@ class VNPTDataPipeline:
                 'error': str(e)
             }
     
+    def run_out_of_core_pipeline(self):
+        """Run cleaning and statistical analysis partition by partition for inputs larger than RAM
+        
+        Cleaned data is written as Parquet partitions under data/partitions and statistics
+        are merged from per-partition aggregates. Charts and the Excel workbook need the
+        full frame in memory and are not produced in this mode.
+        """
+        logger.info("=" * 100)
+        logger.info("VNPT DATA ANALYSIS PIPELINE - OUT-OF-CORE EXECUTION")
+        logger.info("=" * 100)
+        logger.info(f"Start Time: {self.start_time}")
+        logger.info(f"Input File: {self.input_file}")
+        logger.info(f"Chunk Size: {self.chunksize:,} rows")
+        logger.info("=" * 100)
+        
+        try:
+            # Step 1: Partition, clean and aggregate
+            logger.info("\n[STEP 1/3] Cleaning data partition by partition...")
+            runner = VNPTOutOfCoreRunner(
+                VNPTDataCleaner(),
+                work_dir=self.data_dir / 'partitions',
+                chunksize=self.chunksize,
+                quantile_mode=self.quantile_mode,
+                count_mode=self.count_mode
+            )
+            cleaning_report, stats = runner.run(self.input_file)
+            logger.info(f"✓ Cleaned {cleaning_report['cleaned_records']:,} records into {cleaning_report['partitions']} partitions: {runner.work_dir}")
+            
+            report_path = self.data_dir / 'cleaning_report.json'
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(cleaning_report, f, ensure_ascii=False, indent=2)
+            logger.info(f"✓ Cleaning report saved: {report_path}")
+            
+            # Step 2: Statistical analysis from merged partition aggregates
+            logger.info("\n[STEP 2/3] Saving statistical analysis...")
+            analyzer = VNPTStatisticalAnalyzer(None)
+            analyzer.stats = stats
+            stats_path = self.data_dir / 'statistical_analysis.json'
+            analyzer.save_results(stats_path)
+            logger.info(f"✓ Statistical analysis saved: {stats_path}")
+            
+            logger.info("\n[STEP 3/3] Writing summary...")
+            logger.info("Charts and Excel export need the full dataset in memory, skipped in out-of-core mode")
+            self._write_summary({
+                'raw_records': cleaning_report['original_records'],
+                'cleaned_records': cleaning_report['cleaned_records'],
+                'columns': stats['overview']['total_columns']
+            }, stats, charts=[])
+            
+            duration = (datetime.now() - self.start_time).total_seconds()
+            logger.info("\n" + "=" * 100)
+            logger.info("OUT-OF-CORE PIPELINE COMPLETED SUCCESSFULLY!")
+            logger.info(f"Execution Time: {duration:.2f} seconds")
+            logger.info("=" * 100)
+            
+            return {
+                'status': 'success',
+                'duration_seconds': duration,
+                'outputs': {
+                    'cleaned_partitions': str(runner.work_dir),
+                    'statistics': str(stats_path),
+                    'cleaning_report': str(report_path)
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"\n❌ PIPELINE FAILED: {str(e)}")
+            logger.exception("Full traceback:")
+            return {
+                'status': 'failed',
+                'error': str(e)
+            }
+    
     def _generate_summary(self, df_raw, df_cleaned, stats, charts):
         """Generate execution summary"""
+        self._write_summary({
+            'raw_records': len(df_raw),
+            'cleaned_records': len(df_cleaned),
+            'columns': len(df_cleaned.columns)
+        }, stats, charts)
+    
+    def _charts_dir(self, profile):
+        """Chart directory of a render profile (publication charts stay in charts/)"""
+        charts_dir = self.output_dir / 'charts'
+        return charts_dir if profile == DEFAULT_RENDER_PROFILE else charts_dir / profile
+    
+    def _write_summary(self, data_summary, stats, charts):
+        """Write pipeline_summary.json"""
         summary = {
             'pipeline_execution': {
                 'timestamp': str(self.start_time),
                 'input_file': str(self.input_file),
                 'output_directory': str(self.output_dir)
             },
-            'data_summary': {
-                'raw_records': len(df_raw),
-                'cleaned_records': len(df_cleaned),
-                'columns': len(df_cleaned.columns)
-            },
+            'data_summary': data_summary,
             'key_metrics': stats['overview'],
             'insights': stats.get('insights', []),
             'outputs_generated': {
-                'excel_sheets': 5,
+                'excel_sheets': 0 if self.out_of_core else 6,
                 'visualizations': len(charts),
                 'json_reports': 2
             }
         }
+        if self.chart_timings:
+            summary['chart_timings'] = self.chart_timings
         
         summary_path = self.output_dir / 'pipeline_summary.json'
         with open(summary_path, 'w', encoding='utf-8') as f:
@@ -181,11 +311,50 @@ def main():
     parser.add_argument('--output', '-o',
                        default='outputs',
                        help='Output directory')
+    parser.add_argument('--incremental',
+                       action='store_true',
+                       help='Clean only rows inserted or changed since the last run (keyed on Phone number)')
+    parser.add_argument('--out-of-core',
+                       action='store_true',
+                       help='Clean and analyze partition by partition for inputs larger than memory (.xlsx, .csv, .parquet)')
+    parser.add_argument('--chunksize',
+                       type=int,
+                       default=200000,
+                       help='Rows per partition in out-of-core mode')
+    parser.add_argument('--quantile-mode',
+                       choices=['exact', 'kll'],
+                       default='exact',
+                       help='TKC quartiles: exact, or a bounded-memory KLL sketch for very large inputs')
+    parser.add_argument('--count-mode',
+                       choices=['exact', 'sketch'],
+                       default='exact',
+                       help='BTS/staff distinct counts and top lists: exact, or HyperLogLog + Space-Saving sketches')
+    parser.add_argument('--chart-mode',
+                       choices=['serial', 'process'],
+                       default='serial',
+                       help='Render the matplotlib charts one after another or in a process pool')
+    parser.add_argument('--no-chart-cache',
+                       action='store_true',
+                       help='Re-render every chart instead of reusing unchanged files from the chart manifest')
+    parser.add_argument('--render-profile',
+                       nargs='+',
+                       choices=list(RENDER_PROFILES),
+                       default=[DEFAULT_RENDER_PROFILE],
+                       help='Chart render profiles: draft (80 dpi PNG), publication (300 dpi PNG), svg, pdf, webp; '
+                            'profiles other than publication are written to charts/<profile>/')
+    parser.add_argument('--analysis-workers',
+                       type=int,
+                       default=None,
+                       help='Threads for the statistical analysis sections (default: one per CPU, 1 = serial)')
     
     args = parser.parse_args()
     
     # Run pipeline
-    pipeline = VNPTDataPipeline(args.input, args.output)
+    pipeline = VNPTDataPipeline(args.input, args.output, incremental=args.incremental,
+                                out_of_core=args.out_of_core, chunksize=args.chunksize,
+                                quantile_mode=args.quantile_mode, analysis_workers=args.analysis_workers,
+                                count_mode=args.count_mode, chart_mode=args.chart_mode,
+                                chart_cache=not args.no_chart_cache, render_profiles=args.render_profile)
     result = pipeline.run_full_pipeline()
     
     # Exit with appropriate code
@@ -0,0 +1,351 @@
+"""
+OLAP Cube Module for VNPT Telecom Dataset
+Aggregate table over province × activation month × TKC segment × service × churn risk
+(plus a separate staff × service roll-up), built once per cleaned dataset and
+queried by roll-up/slice instead of rescanning the frame
+"""
+
+import pandas as pd
+import numpy as np
+import weakref
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ACTIVATION_MONTH = 'ACTIVATION_MONTH'
+CUBE_DIMENSIONS = ['PROVINCE_NAME', ACTIVATION_MONTH, 'TKC_SEGMENT', 'HAS_SERVICE', 'CHURN_RISK']
+# High-cardinality staff codes would make the main cube nearly one cell per row,
+# so staff get their own small roll-up
+STAFF_CUBE_DIMENSIONS = ['STAFF_CODE', 'HAS_SERVICE']
+CUBE_MEASURES = ['TOTAL_TKC', 'ACCOUNT_AGE', 'DAYS_TO_EXPIRE']
+# Rows encoded and aggregated at a time, bounding the per-row temporary arrays
+CUBE_CHUNK_ROWS = 100000
+
+# (id(df), dimensions) -> (weakref to df, frame signature, OLAPCube)
+_CUBES = {}
+
+
+class OLAPCube:
+    """Counts, sums, sums of squares, min and max per occupied dimension cell
+
+    Dimension values are stored as integer codes into labels[dim] (-1 for missing).
+    Categorical columns keep their full category list as labels, so dense roll-ups
+    include unobserved categories the way groupby(observed=False) does. Only
+    occupied cells are stored; queries re-reduce that table and never touch the rows.
+
+    The cell table is stored stat-major (one contiguous row per statistic, one
+    column per cell): `codes` has a row per dimension, `sums` holds rows, then
+    count, sum, sumsq for each measure, and `mins`/`maxs` a row per measure
+    (+inf/-inf where a cell has no value).
+    Query results are memoized per cube, so repeated chart/KPI lookups on page
+    reruns are dictionary hits; callers get copies.
+    """
+
+    def __init__(self, dimensions, labels, codes, measures, sums, mins, maxs):
+        """Build from an already aggregated cell table"""
+        self.dimensions = dimensions
+        self.labels = labels
+        self.codes = codes
+        self.measures = measures
+        self.sums = sums
+        self.mins = mins
+        self.maxs = maxs
+        self._label_strings = {}
+        self._queries = {}
+
+    @classmethod
+    def from_frame(cls, df, dimensions=None, measures=None, chunk_rows=CUBE_CHUNK_ROWS):
+        """Aggregate df over the dimensions and measures it contains
+
+        Rows are encoded and reduced chunk_rows at a time and each chunk's cells
+        merged into the running table, so the per-row temporaries never exceed
+        one chunk whatever the size of df.
+        """
+        dimensions = [d for d in (dimensions or CUBE_DIMENSIONS) if _has_dimension(df, d)]
+        measures = [m for m in (measures or CUBE_MEASURES) if m in df.columns]
+        labels = {dim: _dimension_labels(df, dim, chunk_rows) for dim in dimensions}
+        cardinalities = [len(labels[dim]) for dim in dimensions]
+
+        table = None
+        for start in range(0, len(df), chunk_rows):
+            cells = _aggregate(*_chunk_rows(df.iloc[start:start + chunk_rows], dimensions, labels, measures),
+                               cardinalities=cardinalities)
+            if table is not None:
+                cells = _aggregate(*(np.concatenate(pair, axis=1) for pair in zip(table, cells)),
+                                   cardinalities=cardinalities)
+            table = cells
+        if table is None:
+            table = _aggregate(*_chunk_rows(df, dimensions, labels, measures), cardinalities=cardinalities)
+
+        cube = cls(dimensions, labels, table[0], measures, *table[1:])
+        logger.info(f"Built OLAP cube: {len(df):,} rows -> {cube.codes.shape[1]:,} cells over {len(dimensions)} dimensions")
+        return cube
+
+    def slice(self, **filters):
+        """Sub-cube restricted to dimension values, e.g. slice(CHURN_RISK='High')
+
+        A filter value can be a single label or a list of labels; labels may also be
+        given in their string form ('2024-03' for a month, 'True' for a flag).
+        """
+        mask = self._filter_mask(filters)
+        return OLAPCube(self.dimensions, self.labels, self.codes[:, mask], self.measures,
+                        self.sums[:, mask], self.mins[:, mask], self.maxs[:, mask])
+
+    def rollup(self, by, dense=False, **filters):
+        """Aggregate table grouped by the dimensions in `by`, after applying filters
+
+        Returns one row per group (a MultiIndex for several dimensions) with a row
+        count and, per measure, count/sum/sumsq/min/max/mean/std. Groups with a
+        missing label are dropped like groupby does. dense=True reindexes to the
+        full label product, empty groups having zero counts.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        key = ('rollup', tuple(by), dense, _filters_key(filters))
+        return self._cached(key, lambda: self._rollup(by, dense, filters)).copy()
+
+    def _rollup(self, by, dense, filters):
+        """Uncached rollup"""
+        positions = [self._position(dim) for dim in by]
+        mask = self._filter_mask(filters)
+        for i in positions:
+            mask &= self.codes[i] >= 0
+
+        cardinalities = [len(self.labels[dim]) for dim in by]
+        codes, sums, mins, maxs = _aggregate(
+            self.codes[positions][:, mask],
+            self.sums[:, mask], self.mins[:, mask], self.maxs[:, mask], cardinalities
+        )
+
+        group_labels = [self.labels[dim].take(codes[j]) for j, dim in enumerate(by)]
+        if len(by) == 1:
+            index = group_labels[0]
+        else:
+            index = pd.MultiIndex.from_arrays(group_labels, names=by)
+        table = _stats_frame(self.measures, sums, mins, maxs, index)
+
+        if dense:
+            if len(by) == 1:
+                full = self.labels[by[0]]
+            else:
+                full = pd.MultiIndex.from_product([self.labels[dim] for dim in by], names=by)
+            table = table.reindex(full)
+            count_columns = ['count'] + [f"{m}_{s}" for m in self.measures for s in ('count', 'sum', 'sumsq')]
+            table[count_columns] = table[count_columns].fillna(0)
+            table = table.astype({'count': 'int64'})
+        return table
+
+    def total(self, **filters):
+        """Grand-total statistics (same fields as a rollup row) after applying filters"""
+        return self._cached_total(filters).copy()
+
+    def _total(self, filters):
+        """Uncached total"""
+        mask = self._filter_mask(filters)
+        sums = self.sums[:, mask].sum(axis=1, keepdims=True)
+        mins = self.mins[:, mask].min(axis=1, initial=np.inf, keepdims=True)
+        maxs = self.maxs[:, mask].max(axis=1, initial=-np.inf, keepdims=True)
+        return _stats_frame(self.measures, sums, mins, maxs, pd.RangeIndex(1)).iloc[0]
+
+    def count(self, **filters):
+        """Number of rows matching the filters"""
+        return int(self._cached_total(filters)['count'])
+
+    def mean(self, measure, **filters):
+        """Mean of a measure over the rows matching the filters (NaN when empty)"""
+        return float(self._cached_total(filters)[f"{measure}_mean"])
+
+    def std(self, measure, **filters):
+        """Sample standard deviation of a measure over the rows matching the filters"""
+        return float(self._cached_total(filters)[f"{measure}_std"])
+
+    def _cached(self, key, compute):
+        """Memoized query result"""
+        result = self._queries.get(key)
+        if result is None:
+            result = self._queries[key] = compute()
+        return result
+
+    def _cached_total(self, filters):
+        """Memoized total, shared by total/count/mean/std"""
+        return self._cached(('total', _filters_key(filters)), lambda: self._total(filters))
+
+    def _position(self, dim):
+        """Column of a dimension in the codes table"""
+        if dim not in self.labels:
+            raise KeyError(f"Unknown cube dimension: {dim}")
+        return self.dimensions.index(dim)
+
+    def _filter_mask(self, filters):
+        """Boolean mask of the cells whose labels match every filter"""
+        mask = np.ones(self.codes.shape[1], dtype=bool)
+        for dim, value in filters.items():
+            position = self._position(dim)
+            wanted = _as_list(value)
+            labels = self.labels[dim]
+            if dim not in self._label_strings:
+                self._label_strings[dim] = labels.astype(str)
+            allowed = labels.isin(wanted) | self._label_strings[dim].isin([str(v) for v in wanted])
+            # Trailing False so missing codes (-1) never match
+            lookup = np.append(allowed, False)
+            mask &= lookup[self.codes[position]]
+        return mask
+
+
+def _as_list(value):
+    """Filter value as a list of labels"""
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _filters_key(filters):
+    """Hashable form of query filters (labels compared by their string form)"""
+    return tuple(sorted((dim, tuple(sorted(str(v) for v in _as_list(value)))) for dim, value in filters.items()))
+
+
+def _has_dimension(df, dim):
+    """Whether the source column of a dimension is present"""
+    return 'DATE_ENTER_ACTIVE' in df.columns if dim == ACTIVATION_MONTH else dim in df.columns
+
+
+def _month_ordinals(df):
+    """Activation month of every row as a month ordinal (NaT for a missing date)"""
+    dates = df['DATE_ENTER_ACTIVE']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    return dates.to_numpy().astype('datetime64[M]').view('int64')
+
+
+def _dimension_labels(df, dim, chunk_rows):
+    """Sorted labels of one dimension over the whole frame
+
+    Categorical columns keep their full category list; activation months are
+    collected chunk by chunk so no full-length month array is built.
+    """
+    if dim == ACTIVATION_MONTH:
+        nat = np.datetime64('NaT').view('int64')
+        ordinals = np.unique(np.concatenate([
+            np.unique(_month_ordinals(df.iloc[start:start + chunk_rows]))
+            for start in range(0, len(df), chunk_rows)
+        ] or [np.empty(0, dtype=np.int64)]))
+        return pd.PeriodIndex.from_ordinals(ordinals[ordinals != nat], freq='M')
+
+    series = df[dim]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.Index(series.cat.categories)
+    return pd.Index(pd.unique(series.dropna())).sort_values()
+
+
+def _encode_dimension(df, dim, labels):
+    """Integer codes into labels (-1 = missing) for one dimension of a chunk"""
+    if dim == ACTIVATION_MONTH:
+        ordinals = _month_ordinals(df)
+        return pd.Index(labels.asi8).get_indexer(ordinals).astype(np.int64)
+
+    series = df[dim]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64)
+    return labels.get_indexer(series).astype(np.int64)
+
+
+def _chunk_rows(df, dimensions, labels, measures):
+    """Per-row codes and statistics of a chunk, shaped like a cell table"""
+    codes = np.empty((len(dimensions), len(df)), dtype=np.int64)
+    for i, dim in enumerate(dimensions):
+        codes[i] = _encode_dimension(df, dim, labels[dim])
+
+    sums = np.empty((1 + 3 * len(measures), len(df)), dtype=np.float64)
+    mins = np.empty((len(measures), len(df)), dtype=np.float64)
+    maxs = np.empty_like(mins)
+    sums[0] = 1.0
+    for i, measure in enumerate(measures):
+        values = df[measure].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        sums[1 + 3 * i] = valid
+        sums[2 + 3 * i] = filled
+        sums[3 + 3 * i] = filled * filled
+        mins[i] = np.where(valid, values, np.inf)
+        maxs[i] = np.where(valid, values, -np.inf)
+    return codes, sums, mins, maxs
+
+
+def _aggregate(codes, sums, mins, maxs, cardinalities):
+    """Reduce cells (or rows) with identical codes into one cell each
+
+    Returns (codes, sums, mins, maxs) of the reduced table, ordered by codes.
+    Sums are added with np.bincount and minima/maxima re-reduced with ufunc.at,
+    so the result can be aggregated again.
+    """
+    key = np.zeros(codes.shape[1], dtype=np.int64)
+    for j, cardinality in enumerate(cardinalities):
+        key = key * (cardinality + 1) + (codes[j] + 1)
+    groups, keys = pd.factorize(key, sort=True)
+    n_groups = len(keys)
+
+    reduced_codes = np.empty((len(cardinalities), n_groups), dtype=np.int64)
+    for j in reversed(range(len(cardinalities))):
+        keys, digit = np.divmod(keys, cardinalities[j] + 1)
+        reduced_codes[j] = digit - 1
+
+    reduced_sums = np.empty((len(sums), n_groups), dtype=np.float64)
+    for i, row in enumerate(sums):
+        reduced_sums[i] = np.bincount(groups, weights=row, minlength=n_groups)
+    reduced_mins = np.full((len(mins), n_groups), np.inf)
+    reduced_maxs = np.full((len(maxs), n_groups), -np.inf)
+    for i in range(len(mins)):
+        np.minimum.at(reduced_mins[i], groups, mins[i])
+        np.maximum.at(reduced_maxs[i], groups, maxs[i])
+    return reduced_codes, reduced_sums, reduced_mins, reduced_maxs
+
+
+def _stats_frame(measures, sums, mins, maxs, index):
+    """Rollup table: row count plus count/sum/sumsq/min/max/mean/std per measure"""
+    columns = {'count': sums[0].astype(np.int64)}
+    for i, measure in enumerate(measures):
+        n, total, total_sq = sums[1 + 3 * i], sums[2 + 3 * i], sums[3 + 3 * i]
+        empty = n == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(empty, np.nan, total / n)
+            var = (total_sq - total * mean) / (n - 1)
+            std = np.where(n > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+        columns[f"{measure}_count"] = n.astype(np.int64)
+        columns[f"{measure}_sum"] = total
+        columns[f"{measure}_sumsq"] = total_sq
+        columns[f"{measure}_min"] = np.where(empty, np.nan, mins[i])
+        columns[f"{measure}_max"] = np.where(empty, np.nan, maxs[i])
+        columns[f"{measure}_mean"] = mean
+        columns[f"{measure}_std"] = std
+    return pd.DataFrame(columns, index=index)
+
+
+def _signature(df):
+    """Cheap frame version check: shape, column names and dtypes"""
+    return df.shape, tuple(df.columns), tuple(str(t) for t in df.dtypes)
+
+
+def get_cube(df, dimensions=None):
+    """OLAP cube of df (default dimensions unless given), built once per frame version
+
+    Cubes are memoized per DataFrame object and dimension list like column
+    profiles and dropped when the frame is garbage collected; in-place value
+    edits are not detected.
+    """
+    dimensions = tuple(dimensions or CUBE_DIMENSIONS)
+    key = (id(df), dimensions)
+    signature = _signature(df)
+    entry = _CUBES.get(key)
+    if entry is not None:
+        ref, cached_signature, cube = entry
+        if ref() is df and cached_signature == signature:
+            return cube
+
+    cube = OLAPCube.from_frame(df, dimensions=list(dimensions))
+    _CUBES[key] = (weakref.ref(df, lambda ref, key=key: _forget(key, ref)), signature, cube)
+    return cube
+
+
+def _forget(key, ref):
+    """Drop the memoized cube of a collected frame (unless the id was reused)"""
+    entry = _CUBES.get(key)
+    if entry is not None and entry[0] is ref:
+        del _CUBES[key]
@@ -0,0 +1,417 @@
+"""
+Out-of-Core Execution Module for VNPT Telecom Dataset
+Cleans inputs larger than memory partition by partition on disk and builds the
+statistical analysis by merging per-partition partial aggregates
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import logging
+
+from data_loader import iter_table_chunks, apply_chunk_schema
+from statistical_analyzer import ACCOUNT_AGE_BINS, ACCOUNT_AGE_LABELS
+from ranking import top_k, staff_rankings, sort_by_count
+from streaming_stats import (TKCAccumulator, ServiceAccumulator, ChurnAccumulator, HeavyHitterSketch,
+                             count_values, add_partials, safe_mean,
+                             month_counts, bin_counts, staff_value_columns, staff_table)
+from cohort import cohort_lifetimes, cohort_retention
+from survival import SURVIVAL_STRATA, survival_as_of, survival_lifetimes, survival_counts, survival_section
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = 'part-{:05d}.parquet'
+DATE_COLUMNS = ['DATE_ENTER_ACTIVE', 'ACCT_EXPIRE_DATE']
+
+
+class PartitionAggregate:
+    """Mergeable partial aggregates behind every VNPTStatisticalAnalyzer section
+
+    Partials are additive counters, count Series, per-key sum frames, min/max
+    extremes and the streaming accumulators of the TKC, service and churn
+    sections, so partitions can be aggregated independently and merged in any
+    order. TOTAL_TKC quantiles follow quantile_mode ('exact' or 'kll'); BTS and
+    staff keys are counted exactly or, with count_mode='sketch', in bounded-size
+    HeavyHitterSketch partials.
+    """
+
+    def __init__(self, quantile_mode='exact', count_mode='exact', as_of=None):
+        """Initialize an empty aggregate (as_of: survival observation date, default today)"""
+        self.count_mode = count_mode
+        self.as_of = survival_as_of() if as_of is None else pd.Timestamp(as_of)
+        self.rows = 0
+        self.columns = []
+        self.counters = {}
+        self.counts = {}
+        self.groups = {}
+        self.sketches = {}
+        self.minimum = {}
+        self.maximum = {}
+        self.segment_labels = []
+        self.accumulators = {
+            'tkc_analysis': TKCAccumulator(quantile_mode),
+            'service_analysis': ServiceAccumulator(),
+            'churn_analysis': ChurnAccumulator()
+        }
+
+    @classmethod
+    def from_frame(cls, df, quantile_mode='exact', count_mode='exact', as_of=None):
+        """Partial aggregates of one cleaned partition"""
+        agg = cls(quantile_mode, count_mode, as_of)
+        sketched = count_mode == 'sketch'
+        for accumulator in agg.accumulators.values():
+            accumulator.update(df)
+        agg.rows = len(df)
+        agg.columns = list(df.columns)
+        counters = agg.counters
+
+        # Overview
+        counters['complete_records'] = int((~df.isnull().any(axis=1)).sum())
+        for col in DATE_COLUMNS:
+            agg._extremes(col, df[col])
+
+        tkc = df['TOTAL_TKC']
+        high_churn = (df['CHURN_RISK'] == 'High').to_numpy(dtype=bool)
+        agg.segment_labels = list(df['TKC_SEGMENT'].cat.categories)
+
+        # Geographic
+        agg.counts['provinces'] = count_values(df['PROVINCE_NAME'])
+        if sketched:
+            agg.sketches['bts'] = HeavyHitterSketch().update(df['BTS_NAME'])
+        else:
+            agg.counts['bts'] = count_values(df['BTS_NAME'])
+        agg.groups['province'] = cls._group_sums(df, 'PROVINCE_NAME', {
+            'phone_count': df['Phone number'].notna(),
+            'tkc_sum': tkc.fillna(0),
+            'tkc_count': tkc.notna()
+        })
+
+        # Staff performance
+        if sketched:
+            agg.sketches['staff'] = HeavyHitterSketch().update(df['STAFF_CODE'], staff_value_columns(df))
+        else:
+            agg.groups['staff'] = cls._group_sums(df, 'STAFF_CODE', staff_value_columns(df))
+        counters['unassigned'] = int((df['STAFF_CODE'] == 'UNASSIGNED').sum())
+
+        # Temporal trends (computed on temporaries; the partition is not modified)
+        monthly = month_counts(df['DATE_ENTER_ACTIVE'])
+        monthly.index = monthly.index.astype(object)
+        agg.counts['activation_months'] = monthly
+        account_age = df['ACCOUNT_AGE']
+        counters['account_age_sum'] = float(account_age.sum())
+        counters['account_age_count'] = int(account_age.count())
+        agg.counts['age_category'] = bin_counts(account_age, ACCOUNT_AGE_BINS, ACCOUNT_AGE_LABELS)
+        
+        # Cohort retention
+        agg.groups['cohorts'] = cohort_lifetimes(df['DATE_ENTER_ACTIVE'], df['ACCT_EXPIRE_DATE'])
+        
+        # Survival (event/removal counts per stratum and lifetime month)
+        lifetime, event = survival_lifetimes(df['DATE_ENTER_ACTIVE'], df['ACCT_EXPIRE_DATE'], agg.as_of)
+        agg.groups['survival'] = survival_counts(lifetime, event)
+        for col in SURVIVAL_STRATA:
+            if col in df.columns:
+                agg.groups[f'survival:{col}'] = survival_counts(lifetime, event, df[col])
+
+        # Segmentation
+        agg.groups['segments'] = cls._group_sums(df, ['TKC_SEGMENT', 'HAS_SERVICE'], {
+            'size': pd.Series(1, index=df.index),
+            'phone_count': df['Phone number'].notna(),
+            'tkc_sum': tkc.fillna(0),
+            'tkc_count': tkc.notna(),
+            'churn_high': pd.Series(high_churn, index=df.index)
+        })
+        high_segment = (df['TKC_SEGMENT'] == 'High').to_numpy(dtype=bool)
+        counters['high_value_customers'] = int((high_segment & (df['HAS_SERVICE'] == True).to_numpy()).sum())
+        counters['at_risk_high_value'] = int((high_segment & high_churn).sum())
+
+        return agg
+
+    @staticmethod
+    def _group_sums(df, keys, columns):
+        """Sum of each value column per group key (object index so partitions merge)"""
+        keys = [keys] if isinstance(keys, str) else keys
+        frame = pd.DataFrame({k: df[k].astype(object) for k in keys})
+        for name, values in columns.items():
+            frame[name] = values.to_numpy(dtype=np.float64)
+        return frame.groupby(keys, sort=False).sum()
+
+    def _extremes(self, name, series):
+        """Record min/max of a column, ignoring missing values"""
+        values = series.dropna()
+        if len(values):
+            self.minimum[name] = values.min()
+            self.maximum[name] = values.max()
+
+    def merge(self, other):
+        """Fold another partition's aggregate into this one"""
+        self.rows += other.rows
+        self.columns = self.columns or other.columns
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for name, value in other.counts.items():
+            self.counts[name] = add_partials(self.counts.get(name), value)
+        for name, value in other.groups.items():
+            self.groups[name] = add_partials(self.groups.get(name), value)
+        for name, sketch in other.sketches.items():
+            if name in self.sketches:
+                self.sketches[name].merge(sketch)
+            else:
+                self.sketches[name] = sketch
+        for name, value in other.minimum.items():
+            self.minimum[name] = min(self.minimum.get(name, value), value)
+        for name, value in other.maximum.items():
+            self.maximum[name] = max(self.maximum.get(name, value), value)
+        for name, accumulator in other.accumulators.items():
+            self.accumulators[name].merge(accumulator)
+        for label in other.segment_labels:
+            if label not in self.segment_labels:
+                self.segment_labels.append(label)
+        return self
+
+    def _int_counts(self, name):
+        """Merged count Series as integers"""
+        counts = self.counts.get(name)
+        if counts is None:
+            return pd.Series(dtype='int64')
+        return counts.astype('int64')
+
+    def to_stats(self):
+        """Analyzer sections in the same layout as VNPTStatisticalAnalyzer.analyze_all"""
+        return {
+            'overview': self._overview(),
+            'tkc_analysis': self.accumulators['tkc_analysis'].result(),
+            'service_analysis': self.accumulators['service_analysis'].result(),
+            'churn_analysis': self.accumulators['churn_analysis'].result(),
+            'geographic_analysis': self._geographic(),
+            'staff_performance': self._staff(),
+            'temporal_trends': self._temporal(),
+            'cohort_retention': cohort_retention(self.groups.get('cohorts')),
+            'survival_analysis': self._survival(),
+            'segmentation': self._segmentation()
+        }
+
+    def _overview(self):
+        c = self.counters
+        return {
+            'total_customers': self.rows,
+            'total_columns': len(self.columns),
+            'date_range': {
+                'earliest_activation': str(self.minimum.get('DATE_ENTER_ACTIVE', pd.NaT)),
+                'latest_activation': str(self.maximum.get('DATE_ENTER_ACTIVE', pd.NaT)),
+                'earliest_expiration': str(self.minimum.get('ACCT_EXPIRE_DATE', pd.NaT)),
+                'latest_expiration': str(self.maximum.get('ACCT_EXPIRE_DATE', pd.NaT))
+            },
+            'data_quality': {
+                'complete_records': c['complete_records'],
+                'records_with_missing': self.rows - c['complete_records']
+            }
+        }
+
+    def _geographic(self):
+        province = self.groups['province'].sort_index()
+        analysis = {
+            'provinces': sort_by_count(self._int_counts('provinces')).to_dict(),
+            'customers_per_province': {
+                'Phone number': province['phone_count'].astype('int64').to_dict(),
+                'TOTAL_TKC': (province['tkc_sum'] / province['tkc_count']).to_dict()
+            }
+        }
+        if 'bts' in self.sketches:
+            bts = self.sketches['bts']
+            analysis['top_bts_stations'] = bts.top(10)['count'].astype('int64').to_dict()
+            analysis['distinct_bts_stations'] = bts.count()
+            analysis['approximation'] = bts.error_bounds()
+        else:
+            bts_counts = self._int_counts('bts')
+            analysis['top_bts_stations'] = top_k(bts_counts, 10).to_dict()
+            analysis['distinct_bts_stations'] = int((bts_counts > 0).sum())
+        return analysis
+
+    def _staff(self):
+        if 'staff' in self.sketches:
+            staff = self.sketches['staff']
+            return {
+                'total_staff': staff.count(),
+                'avg_customers_per_staff': safe_mean(staff.keyed_rows(), staff.count()),
+                'top_performers': top_k(staff_table(staff.top(10)), 10, 'customer_count').to_dict(),
+                'unassigned_customers': self.counters['unassigned'],
+                'approximation': staff.error_bounds()
+            }
+
+        staff_stats = staff_table(self.groups['staff'].sort_index())
+        return {
+            'total_staff': len(staff_stats),
+            'avg_customers_per_staff': float(staff_stats['customer_count'].mean()),
+            'top_performers': top_k(staff_stats, 10, 'customer_count').to_dict(),
+            'rankings': staff_rankings(staff_stats),
+            'unassigned_customers': self.counters['unassigned']
+        }
+
+    def _temporal(self):
+        c = self.counters
+        monthly_activations = self._int_counts('activation_months').sort_index()
+        return {
+            'monthly_activations': {str(k): int(v) for k, v in monthly_activations.tail(12).items()},
+            'avg_account_age_days': safe_mean(c['account_age_sum'], c['account_age_count']),
+            'account_age_distribution': sort_by_count(self._int_counts('age_category')).to_dict(),
+            'activation_trend': {
+                'last_6_months': int(monthly_activations.tail(6).sum()),
+                'last_12_months': int(monthly_activations.tail(12).sum())
+            }
+        }
+
+    def _survival(self):
+        strata = {
+            col: self.groups[f'survival:{col}'].sort_index()
+            for col in SURVIVAL_STRATA if f'survival:{col}' in self.groups
+        }
+        return survival_section(self.groups.get('survival'), strata, self.as_of)
+
+    def _segmentation(self):
+        segments = self.groups['segments']
+        service_values = sorted(set(segments.index.get_level_values(1)))
+
+        # Every TKC segment label is reported (observed=False), including empty combinations
+        segment_matrix = {}
+        for tkc_seg in self.segment_labels:
+            for has_service in service_values:
+                key = f"{tkc_seg}_{'with_service' if has_service else 'no_service'}"
+                if (tkc_seg, has_service) in segments.index:
+                    row = segments.loc[(tkc_seg, has_service)]
+                    avg_tkc = safe_mean(row['tkc_sum'], row['tkc_count'])
+                    churn_rate = safe_mean(row['churn_high'], row['size'])
+                    count = int(row['phone_count'])
+                else:
+                    avg_tkc = churn_rate = float('nan')
+                    count = 0
+                segment_matrix[key] = {
+                    'customer_count': count,
+                    'avg_tkc': float(np.round(avg_tkc, 2)),
+                    'churn_risk_rate': float(np.round(churn_rate, 2))
+                }
+
+        return {
+            'segment_matrix': segment_matrix,
+            'high_value_customers': self.counters['high_value_customers'],
+            'at_risk_high_value': self.counters['at_risk_high_value']
+        }
+
+
+class VNPTOutOfCoreRunner:
+    """Clean and analyze an input partition by partition with bounded memory
+
+    The input (.xlsx, .csv or .parquet) is read in blocks of `chunksize` rows.
+    Each block is cleaned with VNPTDataCleaner (Donvi forward fill carried across
+    blocks), written as a Parquet partition and reduced to a PartitionAggregate;
+    only the merged aggregates stay in memory.
+    """
+
+    def __init__(self, cleaner, work_dir='data/partitions', chunksize=200000, quantile_mode='exact',
+                 count_mode='exact'):
+        """Initialize with a VNPTDataCleaner and the partition directory"""
+        self.cleaner = cleaner
+        self.quantile_mode = quantile_mode
+        self.count_mode = count_mode
+        self.work_dir = Path(work_dir)
+        self.chunksize = chunksize
+
+    def partition_paths(self):
+        """Existing cleaned partitions in order"""
+        return sorted(self.work_dir.glob('part-*.parquet'))
+
+    def run(self, input_path, sheet_name=0):
+        """Clean the input into partitions and analyze it; returns (cleaning_report, stats)"""
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.partition_paths():
+            path.unlink()
+
+        schema = self.cleaner.config.get('column_schema', {})
+        carry = {}
+        raw_nulls = cleaned_nulls = None
+        raw_columns = []
+        raw_records = 0
+        step_totals = {}
+        aggregate = PartitionAggregate(self.quantile_mode, self.count_mode)
+
+        logger.info(f"Starting out-of-core run on {input_path} (chunksize={self.chunksize})...")
+        for index, chunk in enumerate(iter_table_chunks(input_path, chunksize=self.chunksize, sheet_name=sheet_name)):
+            chunk = apply_chunk_schema(chunk, schema)
+            raw_records += len(chunk)
+            raw_columns = raw_columns or list(chunk.columns)
+            raw_nulls = add_partials(raw_nulls, chunk.isnull().sum())
+
+            chunk = self.cleaner.carry_forward_fill(chunk, carry)
+            cleaned = self.cleaner.clean_data(chunk, copy=False)
+            cleaned_nulls = add_partials(cleaned_nulls, cleaned.isnull().sum())
+            self._add_step_profile(step_totals, self.cleaner.last_step_profile or [])
+
+            path = self.work_dir / PARTITION_NAME.format(index)
+            cleaned.to_parquet(path, index=False)
+            aggregate.merge(PartitionAggregate.from_frame(cleaned, self.quantile_mode, self.count_mode, aggregate.as_of))
+            logger.info(f"Partition {index}: {len(cleaned)} records -> {path.name}")
+
+        stats = aggregate.to_stats()
+        report = self._cleaning_report(raw_records, raw_columns, raw_nulls, cleaned_nulls, aggregate, stats, step_totals)
+        logger.info(f"Out-of-core run completed: {aggregate.rows} records in {len(self.partition_paths())} partitions")
+        return report, stats
+
+    def analyze_partitions(self, paths=None):
+        """Re-run the analysis over existing cleaned partitions, one partition in memory at a time"""
+        aggregate = PartitionAggregate(self.quantile_mode, self.count_mode)
+        for path in paths or self.partition_paths():
+            aggregate.merge(PartitionAggregate.from_frame(pd.read_parquet(path), self.quantile_mode, self.count_mode,
+                                                          aggregate.as_of))
+        return aggregate.to_stats()
+
+    @staticmethod
+    def _add_step_profile(totals, steps):
+        """Accumulate per-partition step profiles (times and rows add up, peak is the max)"""
+        for entry in steps:
+            total = totals.setdefault(entry['step'], {
+                'step': entry['step'], 'rows': 0, 'wall_time_s': 0.0, 'cpu_time_s': 0.0, 'peak_memory_mb': None
+            })
+            total['rows'] += entry['rows']
+            total['wall_time_s'] += entry['wall_time_s']
+            total['cpu_time_s'] += entry['cpu_time_s']
+            if entry['peak_memory_mb'] is not None:
+                total['peak_memory_mb'] = max(total['peak_memory_mb'] or 0, entry['peak_memory_mb'])
+
+    def _cleaning_report(self, raw_records, raw_columns, raw_nulls, cleaned_nulls, aggregate, stats, step_totals):
+        """Cleaning report with the layout of VNPTDataCleaner.generate_cleaning_report"""
+        step_profile = []
+        for total in step_totals.values():
+            wall = total['wall_time_s']
+            step_profile.append(dict(
+                total,
+                wall_time_s=round(wall, 4),
+                cpu_time_s=round(total['cpu_time_s'], 4),
+                rows_per_sec=round(total['rows'] / wall) if wall > 0 else None
+            ))
+
+        report = {
+            'original_records': raw_records,
+            'cleaned_records': aggregate.rows,
+            'records_removed': raw_records - aggregate.rows,
+            'missing_values_handled': {},
+            'derived_columns_created': self.cleaner.derived_column_names(),
+            'data_quality_metrics': {
+                'service_adoption_rate': f"{stats['service_analysis']['adoption_rate']*100:.1f}%",
+                'avg_account_age_days': f"{stats['temporal_trends']['avg_account_age_days']:.0f}",
+                'high_churn_risk_pct': f"{stats['churn_analysis']['high_risk_percentage']*100:.1f}%",
+                'avg_tkc': f"{stats['tkc_analysis']['descriptive_stats']['mean']:.2f}"
+            },
+            'step_profile': step_profile,
+            'partitions': len(self.partition_paths())
+        }
+
+        for col in raw_columns:
+            orig_missing = int(raw_nulls.get(col, 0)) if raw_nulls is not None else 0
+            clean_missing = int(cleaned_nulls.get(col, 0)) if cleaned_nulls is not None else 0
+            if orig_missing > 0:
+                report['missing_values_handled'][col] = {
+                    'original': orig_missing,
+                    'remaining': clean_missing,
+                    'filled': orig_missing - clean_missing
+                }
+        return report
@@ -7,9 +7,17 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from column_profile import get_column_profile
+from histograms import histogram_figure
 
 st.set_page_config(page_title="Khám Phá Dữ Liệu", page_icon="📊", layout="wide")
 
+
+def is_numeric_column(series):
+    """Numeric (incl. compact int32/float32) but not boolean"""
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
 # Check if data exists
 if st.session_state.df_raw is None:
     st.warning("⚠️ Chưa có dữ liệu! Vui lòng upload file ở trang chủ.")
@@ -18,6 +26,8 @@ if st.session_state.df_raw is None:
     st.stop()
 
 df = st.session_state.df_raw
+# Null/unique/top-value profile, computed once per loaded frame and reused on reruns
+profile = get_column_profile(df)
 
 # Header
 st.markdown("""
@@ -40,12 +50,22 @@ with col3:
     duplicates = df.duplicated().sum()
     st.metric("🔄 Dòng trùng lặp", duplicates)
 with col4:
-    missing_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100)
+    missing_pct = profile.missing_cell_pct
     st.metric("❌ Missing (%)", f"{missing_pct:.1f}%")
 with col5:
     memory_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
     st.metric("💾 Bộ nhớ (MB)", f"{memory_mb:.2f}")
 
+# Memory report from the column schema applied at load time
+memory_report = st.session_state.get('memory_report')
+if memory_report:
+    with st.expander(f"💾 Báo cáo bộ nhớ: {memory_report['before_mb']:.2f} MB → {memory_report['after_mb']:.2f} MB (-{memory_report['saved_pct']:.1f}%)", expanded=False):
+        memory_df = pd.DataFrame([
+            {'Cột': col, 'Kiểu dữ liệu': info['dtype'], 'Trước (MB)': info['before_mb'], 'Sau (MB)': info['after_mb']}
+            for col, info in memory_report['columns'].items()
+        ])
+        st.dataframe(memory_df, use_container_width=True, hide_index=True)
+
 st.markdown("---")
 
 # Data preview
@@ -68,8 +88,8 @@ if show_info:
         info_df = pd.DataFrame({
             'Cột': df.columns,
             'Kiểu dữ liệu': df.dtypes.astype(str),
-            'Missing': df.isnull().sum(),
-            'Missing %': (df.isnull().sum() / len(df) * 100).round(2)
+            'Missing': profile.null_counts,
+            'Missing %': profile.missing_pct.round(2)
         })
         st.dataframe(info_df, use_container_width=True, height=400)
 else:
@@ -81,30 +101,31 @@ st.markdown("---")
 st.markdown("### 📊 Phân Tích Từng Cột")
 
 selected_col = st.selectbox("Chọn cột để phân tích chi tiết", df.columns)
+col_profile = profile.column(selected_col)
 
 col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown(f"**Cột:** `{selected_col}`")
     st.markdown(f"**Kiểu dữ liệu:** {df[selected_col].dtype}")
-    st.markdown(f"**Giá trị duy nhất:** {df[selected_col].nunique():,}")
-    st.markdown(f"**Missing values:** {df[selected_col].isnull().sum():,} ({df[selected_col].isnull().sum()/len(df)*100:.1f}%)")
+    st.markdown(f"**Giá trị duy nhất:** {col_profile['unique']:,}")
+    st.markdown(f"**Missing values:** {col_profile['missing']:,} ({col_profile['missing_pct']:.1f}%)")
 
 with col2:
     st.markdown("**Top 5 giá trị:**")
-    if df[selected_col].dtype in ['int64', 'float64']:
+    if is_numeric_column(df[selected_col]):
         st.write(df[selected_col].describe())
     else:
-        st.write(df[selected_col].value_counts().head())
+        st.write(col_profile['top_values'].head())
 
 with col3:
     # Visualization based on data type
-    if df[selected_col].dtype in ['int64', 'float64']:
-        fig = px.histogram(df, x=selected_col, title=f"Phân phối {selected_col}",
-                          color_discrete_sequence=['#0066B2'])
+    if is_numeric_column(df[selected_col]):
+        fig = histogram_figure(df[selected_col], title=f"Phân phối {selected_col}",
+                               color='#0066B2', x_title=selected_col)
         st.plotly_chart(fig, use_container_width=True)
     else:
-        top_values = df[selected_col].value_counts().head(10)
+        top_values = col_profile['top_values'].head(10)
         fig = px.bar(x=top_values.index, y=top_values.values,
                     title=f"Top 10 giá trị - {selected_col}",
                     labels={'x': selected_col, 'y': 'Số lượng'},
@@ -118,8 +139,8 @@ st.markdown("### ❌ Phân Tích Missing Values")
 
 missing_df = pd.DataFrame({
     'Cột': df.columns,
-    'Missing Count': df.isnull().sum(),
-    'Missing %': (df.isnull().sum() / len(df) * 100).round(2)
+    'Missing Count': profile.null_counts,
+    'Missing %': profile.missing_pct.round(2)
 }).sort_values('Missing Count', ascending=False)
 
 missing_df = missing_df[missing_df['Missing Count'] > 0]
@@ -160,7 +181,7 @@ st.markdown("### 🎯 Bảng Điểm Chất Lượng Dữ Liệu")
 col1, col2, col3, col4 = st.columns(4)
 
 # Calculate scores
-completeness = (1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+completeness = 100 - profile.missing_cell_pct
 uniqueness = (1 - duplicates / len(df)) * 100
 validity = 100  # Simplified - would need business rules
 consistency = 100  # Simplified
@@ -8,6 +8,8 @@ import pandas as pd
 import sys
 sys.path.append('..')
 from data_cleaner import VNPTDataCleaner
+from cleaning_cache import VNPTCleaningCache
+from column_profile import get_column_profile
 
 st.set_page_config(page_title="Làm Sạch Dữ Liệu", page_icon="🧹", layout="wide")
 
@@ -18,7 +20,8 @@ if st.session_state.df_raw is None:
         st.switch_page("app.py")
     st.stop()
 
-df = st.session_state.df_raw.copy()
+# Read-only view of the raw data; cleaning below shares untouched columns with it
+df = st.session_state.df_raw
 
 # Header
 st.markdown("""
@@ -95,7 +98,8 @@ with tab1:
     
     
     # Get columns with missing values
-    missing_cols = df.columns[df.isnull().any()].tolist()
+    profile = get_column_profile(df)
+    missing_cols = profile.columns_with_missing()
     
     if missing_cols:
         strategies = {}
@@ -107,12 +111,12 @@ with tab1:
                 st.markdown(f"**{col}**")
             
             with col2:
-                missing_count = df[col].isnull().sum()
-                missing_pct = missing_count / len(df) * 100
+                missing_count = profile.null_counts[col]
+                missing_pct = profile.missing_pct[col]
                 st.caption(f"{missing_count:,} missing ({missing_pct:.1f}%)")
             
             with col3:
-                if df[col].dtype in ['int64', 'float64']:
+                if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
                     strategy = st.selectbox(
                         f"Strategy_{col}",
                         ["Keep NULL", "Mean", "Median", "Zero", "Custom Value"],
@@ -152,10 +156,10 @@ with tab1:
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**Before (Missing Values)**")
-                st.dataframe(df[missing_cols].isnull().sum(), use_container_width=True)
+                st.dataframe(profile.null_counts[missing_cols], use_container_width=True)
             with col2:
                 st.markdown("**After (Missing Values)**")
-                st.dataframe(df_preview[missing_cols].isnull().sum(), use_container_width=True)
+                st.dataframe(get_column_profile(df_preview).null_counts[missing_cols], use_container_width=True)
     
     else:
         st.success("✅ Không có missing values!")
@@ -203,14 +207,19 @@ with col2:
             # Initialize cleaner
             cleaner = VNPTDataCleaner()
             
-            # Clean data
-            df_cleaned = cleaner.clean_data(df)
+            # Clean data (reuses the cached result when data and config are unchanged)
+            df_cleaned, cleaning_report, cache_hit = cleaner.clean_with_report(df, cache=VNPTCleaningCache(), copy=False)
             
             # Store in session state
             st.session_state.df_cleaned = df_cleaned
+            st.session_state.cleaning_report = cleaning_report
+            st.session_state.cleaning_cache_hit = cache_hit
+            st.session_state.stats = None
             st.session_state.current_step = 3
             
             st.success("✅ Làm sạch dữ liệu thành công!")
+            if cache_hit:
+                st.caption("⚡ Dùng kết quả đã lưu (dữ liệu và cấu hình không đổi)")
             
             # Show summary
             st.markdown("#### 📊 Tóm Tắt Kết Quả")
@@ -243,7 +252,7 @@ if st.session_state.df_cleaned is not None:
         st.markdown("**Thống kê:**")
         st.write(f"- Tổng dòng: {len(df_cleaned):,}")
         st.write(f"- Tổng cột: {len(df_cleaned.columns)}")
-        st.write(f"- Missing values: {df_cleaned.isnull().sum().sum():,}")
+        st.write(f"- Missing values: {get_column_profile(df_cleaned).missing_total:,}")
         st.write(f"- Duplicates: {df_cleaned.duplicated().sum():,}")
         
         # Download button
@@ -256,6 +265,30 @@ if st.session_state.df_cleaned is not None:
             use_container_width=True
         )
 
+    # Per-step timing and memory of the cleaning run
+    cleaning_report = st.session_state.get('cleaning_report') or {}
+    step_profile = cleaning_report.get('step_profile')
+    if step_profile:
+        with st.expander("⏱️ Hiệu Năng Từng Bước Làm Sạch", expanded=False):
+            df_profile = pd.DataFrame(step_profile)
+            # Peak memory is only traced by the pipeline, not in the app
+            if df_profile['peak_memory_mb'].isnull().all():
+                df_profile = df_profile.drop(columns='peak_memory_mb')
+            df_profile = df_profile.rename(columns={
+                'step': 'Bước',
+                'rows': 'Số dòng',
+                'wall_time_s': 'Thời gian (s)',
+                'cpu_time_s': 'CPU (s)',
+                'peak_memory_mb': 'Bộ nhớ đỉnh (MB)',
+                'rows_per_sec': 'Dòng/giây'
+            })
+            st.dataframe(df_profile, use_container_width=True, hide_index=True)
+            st.bar_chart(df_profile.set_index('Bước')['Thời gian (s)'])
+            caption = f"Tổng thời gian: {df_profile['Thời gian (s)'].sum():.3f}s"
+            if st.session_state.get('cleaning_cache_hit'):
+                caption += " • Kết quả lấy từ bộ nhớ đệm giữ số liệu của lần làm sạch gốc"
+            st.caption(caption)
+
 st.markdown("---")
 
 # Navigation
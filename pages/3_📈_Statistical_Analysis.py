@@ -39,6 +39,15 @@ if st.session_state.stats is None:
 
 stats = st.session_state.stats
 
+timings = stats.get('section_timings')
+if timings:
+    with st.expander(f"⏱️ Thời gian phân tích: {timings['wall_time_s']:.2f}s ({timings['max_workers']} luồng)"):
+        timing_df = pd.DataFrame({
+            'Phần': list(timings['sections'].keys()),
+            'Thời gian (s)': list(timings['sections'].values())
+        }).sort_values('Thời gian (s)', ascending=False)
+        st.dataframe(timing_df, use_container_width=True, hide_index=True)
+
 # Key Metrics
 st.markdown("### 📊 Chỉ Số Chính")
 
@@ -83,7 +92,8 @@ with col5:
 st.markdown("---")
 
 # Tabs for different analyses
-tab1, tab2, tab3, tab4 = st.tabs(["💰 TKC Analysis", "📱 Service Analysis", "⚠️ Churn Analysis", "👥 Segmentation"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["💰 TKC Analysis", "📱 Service Analysis", "⚠️ Churn Analysis",
+                                              "👥 Segmentation", "📆 Cohort Retention", "⏳ Survival"])
 
 with tab1:
     st.markdown("### 💰 Phân Tích TKC (Tài Khoản Chính)")
@@ -345,6 +355,94 @@ with tab4:
             ai_strategy = get_ai_response(question, segment_context, 'vi')
             st.markdown(ai_strategy)
 
+with tab5:
+    st.markdown("### 📆 Cohort Retention")
+    st.caption("Tỷ lệ khách hàng chưa hết hạn tài khoản theo tháng kích hoạt (cohort) và số tháng kể từ khi kích hoạt")
+    
+    cohorts = stats.get('cohort_retention', {})
+    if cohorts.get('cohorts'):
+        retention_df = pd.DataFrame(
+            cohorts['retention'],
+            index=cohorts['cohorts'],
+            columns=cohorts['months_since_activation'],
+            dtype=float
+        ) * 100
+        
+        fig = px.imshow(
+            retention_df,
+            labels={'x': 'Số tháng kể từ kích hoạt', 'y': 'Tháng kích hoạt', 'color': 'Retention (%)'},
+            color_continuous_scale='Blues',
+            zmin=0,
+            zmax=100,
+            aspect='auto',
+            title="Ma Trận Retention Theo Cohort"
+        )
+        fig.update_yaxes(type='category')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        sizes_df = pd.DataFrame({
+            'Tháng kích hoạt': cohorts['cohorts'],
+            'Số khách hàng': cohorts['cohort_sizes']
+        })
+        st.dataframe(sizes_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("Không có dữ liệu cohort (DATE_ENTER_ACTIVE / ACCT_EXPIRE_DATE)")
+
+with tab6:
+    st.markdown("### ⏳ Survival Analysis (Kaplan-Meier)")
+    
+    survival = stats.get('survival_analysis')
+    if survival and survival.get('overall'):
+        st.caption(f"Xác suất tài khoản chưa hết hạn theo số tháng kể từ kích hoạt (tính đến {survival['as_of']})")
+        
+        strata_names = {
+            'PROVINCE_NAME': 'Tỉnh/Thành phố',
+            'TKC_SEGMENT': 'TKC Segment',
+            'HAS_SERVICE': 'Có dịch vụ'
+        }
+        options = ['Tổng thể'] + [col for col in survival['strata'] if survival['strata'][col]]
+        stratify = st.selectbox(
+            "Phân nhóm theo",
+            options,
+            format_func=lambda col: strata_names.get(col, col)
+        )
+        
+        curves = {'Tổng thể': survival['overall']} if stratify == 'Tổng thể' else survival['strata'][stratify]
+        if stratify != 'Tổng thể' and len(curves) > 10:
+            largest = sorted(curves, key=lambda label: -curves[label]['customers'])
+            shown = st.multiselect("Nhóm hiển thị", largest, default=largest[:10])
+            curves = {label: curves[label] for label in shown}
+        
+        fig = go.Figure()
+        for label, curve in curves.items():
+            fig.add_trace(go.Scattergl(
+                x=survival['timeline'],
+                y=curve['survival'],
+                mode='lines',
+                line_shape='hv',
+                name=str(label)
+            ))
+        fig.update_layout(
+            title="Đường Cong Survival Của Tài Khoản",
+            xaxis_title="Số tháng kể từ kích hoạt",
+            yaxis_title="Xác suất còn hoạt động",
+            yaxis_range=[0, 1.05]
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        summary_df = pd.DataFrame([
+            {
+                'Nhóm': str(label),
+                'Số khách hàng': curve['customers'],
+                'Đã hết hạn': curve['events'],
+                'Median (tháng)': curve['median_months'] if curve['median_months'] is not None else '—'
+            }
+            for label, curve in curves.items()
+        ])
+        st.dataframe(summary_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("Không có dữ liệu survival (DATE_ENTER_ACTIVE / ACCT_EXPIRE_DATE)")
+
 
 st.markdown("---")
 
@@ -7,6 +7,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import sys
+sys.path.append('..')
+from olap_cube import ACTIVATION_MONTH, STAFF_CUBE_DIMENSIONS, get_cube
+from ranking import top_k, sort_by_count
+from histograms import histogram_figure
 
 st.set_page_config(page_title="Trực Quan Hóa", page_icon="📉", layout="wide")
 
@@ -18,6 +23,7 @@ if st.session_state.df_cleaned is None:
     st.stop()
 
 df = st.session_state.df_cleaned
+cube = get_cube(df)
 
 # Header
 st.markdown("""
@@ -41,22 +47,21 @@ col1, col2 = st.columns(2)
 
 with col1:
     # TKC Distribution Histogram
-    fig = px.histogram(
-        df, 
-        x='TOTAL_TKC',
-        nbins=50,
+    fig = histogram_figure(
+        df['TOTAL_TKC'],
+        bins=50,
         title="Phân Bố TKC (Histogram)",
-        color_discrete_sequence=[VNPT_BLUE],
-        labels={'TOTAL_TKC': 'Tổng TKC (VNĐ)'}
+        color=VNPT_BLUE,
+        x_title='Tổng TKC (VNĐ)'
     )
-    fig.add_vline(x=df['TOTAL_TKC'].mean(), line_dash="dash", line_color="red",
-                 annotation_text=f"TB: {df['TOTAL_TKC'].mean():,.0f}")
+    fig.add_vline(x=cube.mean('TOTAL_TKC'), line_dash="dash", line_color="red",
+                 annotation_text=f"TB: {cube.mean('TOTAL_TKC'):,.0f}")
     st.plotly_chart(fig, use_container_width=True)
 
 with col2:
     # TKC Segments Pie Chart
     if 'TKC_SEGMENT' in df.columns:
-        segment_counts = df['TKC_SEGMENT'].value_counts()
+        segment_counts = sort_by_count(cube.rollup('TKC_SEGMENT', dense=True)['count'])
         fig = px.pie(
             values=segment_counts.values,
             names=segment_counts.index,
@@ -72,10 +77,10 @@ with st.expander("🤖 AI Phân Tích TKC", expanded=False):
             from gemini_assistant import interpret_chart
             
             tkc_data = {
-                'mean': df['TOTAL_TKC'].mean(),
+                'mean': cube.mean('TOTAL_TKC'),
                 'median': df['TOTAL_TKC'].median(),
-                'std': df['TOTAL_TKC'].std(),
-                'segments': df['TKC_SEGMENT'].value_counts().to_dict() if 'TKC_SEGMENT' in df.columns else {}
+                'std': cube.std('TOTAL_TKC'),
+                'segments': sort_by_count(cube.rollup('TKC_SEGMENT', dense=True)['count']).to_dict() if 'TKC_SEGMENT' in df.columns else {}
             }
             
             ai_insights = interpret_chart('TKC Distribution', tkc_data, 'vi')
@@ -94,7 +99,7 @@ col1, col2 = st.columns(2)
 with col1:
     # Service Adoption Bar Chart
     if 'HAS_SERVICE' in df.columns:
-        service_counts = df['HAS_SERVICE'].value_counts()
+        service_counts = cube.rollup('HAS_SERVICE')['count']
         total = len(df)
         
         fig = px.bar(
@@ -156,7 +161,7 @@ col1, col2 = st.columns(2)
 with col1:
     # Churn Risk Distribution
     if 'CHURN_RISK' in df.columns:
-        churn_counts = df['CHURN_RISK'].value_counts()
+        churn_counts = sort_by_count(cube.rollup('CHURN_RISK', dense=True)['count'])
         
         fig = px.bar(
             x=churn_counts.index,
@@ -173,12 +178,12 @@ with col2:
     if 'DAYS_TO_EXPIRE' in df.columns:
         days_filtered = df[df['DAYS_TO_EXPIRE'] < 100]['DAYS_TO_EXPIRE']
         
-        fig = px.histogram(
+        fig = histogram_figure(
             days_filtered,
-            nbins=30,
+            bins=30,
             title="Số Ngày Đến Hết Hạn (<100 ngày)",
-            color_discrete_sequence=[VNPT_BLUE],
-            labels={'value': 'Số Ngày'}
+            color=VNPT_BLUE,
+            x_title='Số Ngày'
         )
         fig.add_vline(x=30, line_dash="dash", line_color="red",
                      annotation_text="Ngưỡng 30 ngày")
@@ -191,7 +196,7 @@ with st.expander("🤖 AI Chiến Lược Giữ Chân Khách Hàng", expanded=Fa
             from gemini_assistant import get_ai_response
             
             churn_data = {
-                'high_risk': len(df[df['CHURN_RISK'] == 'High']) if 'CHURN_RISK' in df.columns else 0,
+                'high_risk': cube.count(CHURN_RISK='High') if 'CHURN_RISK' in df.columns else 0,
                 'expiring_30d': len(df[df['DAYS_TO_EXPIRE'] < 30]) if 'DAYS_TO_EXPIRE' in df.columns else 0,
                 'expiring_7d': len(df[df['DAYS_TO_EXPIRE'] < 7]) if 'DAYS_TO_EXPIRE' in df.columns else 0
             }
@@ -217,7 +222,7 @@ st.markdown("## 🗺️ Phân Bố Địa Lý")
 st.caption("Top tỉnh/thành phố theo số lượng khách hàng")
 
 if 'PROVINCE_NAME' in df.columns:
-    province_counts = df['PROVINCE_NAME'].value_counts().head(10)
+    province_counts = top_k(cube.rollup('PROVINCE_NAME')['count'], 10)
     
     fig = px.bar(
         y=province_counts.index,
@@ -241,8 +246,7 @@ st.markdown("## 📅 Xu Hướng Theo Thời Gian")
 st.caption("Số lượng kích hoạt theo tháng (24 tháng gần nhất)")
 
 if 'DATE_ENTER_ACTIVE' in df.columns:
-    df['activation_month'] = pd.to_datetime(df['DATE_ENTER_ACTIVE']).dt.to_period('M')
-    monthly_data = df.groupby('activation_month').size().tail(24)
+    monthly_data = cube.rollup(ACTIVATION_MONTH)['count'].tail(24)
     
     monthly_df = pd.DataFrame({
         'Tháng': [str(m) for m in monthly_data.index],
@@ -270,7 +274,7 @@ if 'STAFF_CODE' in df.columns:
     st.markdown("## 👥 Hiệu Suất Nhân Viên")
     st.caption("Top 10 nhân viên theo số lượng khách hàng quản lý")
     
-    staff_stats = df[df['STAFF_CODE'] != 'UNASSIGNED'].groupby('STAFF_CODE').size().sort_values(ascending=False).head(10)
+    staff_stats = top_k(get_cube(df, STAFF_CUBE_DIMENSIONS).rollup('STAFF_CODE')['count'].drop('UNASSIGNED', errors='ignore'), 10)
     
     fig = px.bar(
         x=staff_stats.index,
@@ -294,9 +298,9 @@ if st.button("🔮 Tạo Báo Cáo Tổng Hợp Từ AI", use_container_width=Tr
         
         overall_context = {
             'total_customers': len(df),
-            'avg_tkc': df['TOTAL_TKC'].mean(),
-            'service_adoption': df['HAS_SERVICE'].sum() / len(df) * 100 if 'HAS_SERVICE' in df.columns else 0,
-            'high_risk_churn': len(df[df['CHURN_RISK'] == 'High']) if 'CHURN_RISK' in df.columns else 0
+            'avg_tkc': cube.mean('TOTAL_TKC'),
+            'service_adoption': cube.count(HAS_SERVICE=True) / len(df) * 100 if 'HAS_SERVICE' in df.columns else 0,
+            'high_risk_churn': cube.count(CHURN_RISK='High') if 'CHURN_RISK' in df.columns else 0
         }
         
         question = """
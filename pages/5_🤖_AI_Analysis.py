@@ -18,6 +18,7 @@ from sklearn.decomposition import PCA
 import sys
 sys.path.append('..')
 from translations import get_text, get_lang
+from histograms import histogram_figure, scatter_figure, SCATTER_POINT_BUDGET
 
 st.set_page_config(page_title="Phân Tích AI", page_icon="🤖", layout="wide")
 
@@ -134,13 +135,12 @@ with tab1:
         
         with col1:
             # Probability distribution
-            fig = px.histogram(
-                df_pred, 
-                x='CHURN_PROBABILITY',
-                nbins=50,
+            fig = histogram_figure(
+                df_pred['CHURN_PROBABILITY'],
+                bins=50,
                 title="Churn Probability Distribution",
-                color_discrete_sequence=[VNPT_BLUE],
-                labels={'CHURN_PROBABILITY': 'Churn Probability'}
+                color=VNPT_BLUE,
+                x_title='Churn Probability'
             )
             fig.add_vline(x=0.5, line_dash="dash", line_color="red", annotation_text="Threshold: 0.5")
             st.plotly_chart(fig, use_container_width=True)
@@ -239,17 +239,35 @@ with tab2:
         col1, col2 = st.columns(2)
         
         with col1:
-            # 2D scatter plot
-            fig = px.scatter(
-                df_seg,
-                x='PCA1',
-                y='PCA2',
-                color='AI_SEGMENT',
+            # 2D scatter plot (WebGL, sampled per segment above the point budget, or a density heatmap)
+            scatter_col1, scatter_col2 = st.columns(2)
+            with scatter_col1:
+                scatter_mode = st.radio(
+                    "Chế độ hiển thị",
+                    ['points', 'density'],
+                    format_func=lambda mode: {'points': 'Điểm (WebGL)', 'density': 'Mật độ (heatmap)'}[mode],
+                    horizontal=True
+                )
+            with scatter_col2:
+                point_budget = st.number_input("Số điểm tối đa", min_value=1000, max_value=200000,
+                                               value=SCATTER_POINT_BUDGET, step=1000,
+                                               disabled=scatter_mode == 'density')
+            
+            fig, shown = scatter_figure(
+                df_seg['PCA1'],
+                df_seg['PCA2'],
+                groups=df_seg['AI_SEGMENT'],
+                mode=scatter_mode,
+                budget=int(point_budget),
+                colors=VNPT_COLORS + px.colors.qualitative.Set2,
                 title="Customer Segments (PCA Visualization)",
-                color_continuous_scale=VNPT_COLORS,
-                labels={'AI_SEGMENT': 'Segment'}
+                x_title='PCA1',
+                y_title='PCA2',
+                group_title='Segment'
             )
             st.plotly_chart(fig, use_container_width=True)
+            if scatter_mode == 'points' and shown < len(df_seg):
+                st.caption(f"Hiển thị mẫu {shown:,} / {len(df_seg):,} khách hàng (lấy mẫu theo từng segment)")
         
         with col2:
             # Segment sizes
@@ -321,13 +339,13 @@ with tab3:
         
         with col1:
             # Anomaly score distribution
-            fig = px.histogram(
-                df_anom,
-                x='ANOMALY_SCORE',
-                color='ANOMALY',
+            fig = histogram_figure(
+                df_anom['ANOMALY_SCORE'],
+                groups=df_anom['ANOMALY'],
                 title="Anomaly Score Distribution",
-                color_discrete_map={1: '#44FF44', -1: '#FF4444'},
-                labels={'ANOMALY': 'Type', 'ANOMALY_SCORE': 'Anomaly Score'}
+                color_map={1: '#44FF44', -1: '#FF4444'},
+                x_title='Anomaly Score',
+                group_title='Type'
             )
             st.plotly_chart(fig, use_container_width=True)
         
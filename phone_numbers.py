@@ -0,0 +1,77 @@
+"""
+Phone Number Module for VNPT Telecom Dataset
+Vectorized validation of 84XXXXXXXXX subscriber numbers and network prefix decoding
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHONE_PATTERN = r'^84\d{9}$'
+
+# 84XXXXXXXXX as integers: country code 84 followed by exactly 9 digits
+PHONE_MIN = 84_000_000_000
+PHONE_MAX = 84_999_999_999
+# Dividing by this leaves the country code and the 2-digit network prefix (84NN)
+PREFIX_DIVISOR = 10**7
+
+# Mobile network prefixes (the two digits after 84) per carrier
+DEFAULT_PREFIX_GROUPS = {
+    'VinaPhone': [81, 82, 83, 84, 85, 88, 91, 94],
+    'Viettel': [32, 33, 34, 35, 36, 37, 38, 39, 86, 96, 97, 98],
+    'MobiFone': [70, 76, 77, 78, 79, 89, 90, 93],
+    'Vietnamobile': [52, 56, 58, 92],
+    'Gmobile': [59, 99],
+    'Itelecom': [87]
+}
+OTHER_GROUP = 'Other'
+
+
+class PhonePrefixTable:
+    """Sorted network prefix table decoded with searchsorted"""
+
+    def __init__(self, groups=None):
+        """Build the table from {group: [2-digit prefixes]}"""
+        groups = groups or DEFAULT_PREFIX_GROUPS
+        self.categories = list(groups) + [OTHER_GROUP]
+
+        prefixes, codes = [], []
+        for code, group in enumerate(groups):
+            for prefix in groups[group]:
+                prefixes.append(int(prefix))
+                codes.append(code)
+
+        order = np.argsort(prefixes, kind='stable')
+        self.prefixes = np.asarray(prefixes, dtype=np.int64)[order]
+        self.codes = np.asarray(codes, dtype=np.int8)[order]
+        if len(np.unique(self.prefixes)) != len(self.prefixes):
+            raise ValueError("Phone prefix assigned to more than one group")
+
+    def decode(self, values, valid):
+        """Categorical prefix group for int64 phone numbers (NaN where not valid)"""
+        prefix = values // PREFIX_DIVISOR - 8400
+        position = np.searchsorted(self.prefixes, prefix)
+        position = np.minimum(position, len(self.prefixes) - 1)
+        found = self.prefixes[position] == prefix
+
+        codes = np.where(found, self.codes[position], len(self.categories) - 1).astype(np.int8)
+        codes[~valid] = -1
+        return pd.Categorical.from_codes(codes, categories=self.categories)
+
+
+def phone_values(series):
+    """int64 values and a present mask for an integer phone column, or None for other dtypes"""
+    if not pd.api.types.is_integer_dtype(series.dtype):
+        return None
+    if pd.api.types.is_extension_array_dtype(series.dtype):
+        present = series.notna().to_numpy()
+        return series.to_numpy(dtype=np.int64, na_value=0), present
+    return series.to_numpy(dtype=np.int64, copy=False), np.ones(len(series), dtype=bool)
+
+
+def validate_phone_values(values, present):
+    """84XXXXXXXXX check by integer range, equivalent to the default regex"""
+    return present & (values >= PHONE_MIN) & (values <= PHONE_MAX)
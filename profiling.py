@@ -0,0 +1,82 @@
+"""
+Profiling Module for VNPT Telecom Dataset pipelines
+Records wall time, CPU time, peak traced memory and throughput per pipeline step
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class StepProfiler:
+    """Instrumentation hook wrapped around each step of a pipeline
+
+    With trace_memory, peak memory is the tracemalloc peak above the allocation
+    level at the start of the step. When tracemalloc is already running (e.g. an
+    outer measurement), its peak is reset at the start of every step. tracemalloc
+    slows allocation-heavy code down and is process-wide, so tracing is off by
+    default and meant for single runs such as the pipeline, not for shared
+    processes like the Streamlit app.
+    """
+
+    def __init__(self, trace_memory=False):
+        """Initialize with an empty step list"""
+        self.trace_memory = trace_memory
+        self.steps = []
+
+    @contextmanager
+    def step(self, name, rows):
+        """Profile the enclosed block as one step processing `rows` records"""
+        started_tracing = False
+        baseline = 0
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = None
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self.steps.append({
+                'step': name,
+                'rows': int(rows),
+                'wall_time_s': round(wall, 4),
+                'cpu_time_s': round(cpu, 4),
+                'peak_memory_mb': round(peak / 1024 / 1024, 3) if peak is not None else None,
+                'rows_per_sec': round(rows / wall) if wall > 0 else None
+            })
+
+    def run(self, name, func, df):
+        """Call func(df) as a profiled step and return its result"""
+        with self.step(name, len(df)):
+            return func(df)
+
+    def results(self):
+        """Recorded steps in execution order"""
+        return list(self.steps)
+
+    def log_summary(self):
+        """Log one line per step"""
+        for entry in self.steps:
+            memory = f", peak {entry['peak_memory_mb']:.2f} MB" if entry['peak_memory_mb'] is not None else ""
+            logger.info(
+                f"  {entry['step']}: {entry['wall_time_s']:.3f}s wall, "
+                f"{entry['cpu_time_s']:.3f}s CPU{memory}"
+            )
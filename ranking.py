@@ -0,0 +1,83 @@
+"""
+Ranking Module for VNPT Telecom Dataset
+Top-k groups by customer count, total TKC or service rate using partial selection
+(argpartition) instead of sorting every group
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RANKING_METRICS = ('customer_count', 'total_tkc', 'service_rate')
+
+
+def sort_by_count(data, column=None):
+    """Sort counts descending, breaking ties by label so top-N cuts are deterministic"""
+    values = data[column] if column is not None else data
+    order = np.lexsort((data.index.astype(str), -values.to_numpy(dtype=np.float64)))
+    return data.iloc[order]
+
+
+def top_k(data, k=10, column=None):
+    """Largest k entries of a Series (or of a DataFrame column), same result as
+    sort_by_count(data, column).head(k)
+
+    The k-th largest value is found with argpartition and only the entries at or
+    above it (ties included) are sorted. Missing values rank last.
+    """
+    if k <= 0:
+        return data.iloc[:0]
+    values = (data[column] if column is not None else data).to_numpy(dtype=np.float64, na_value=np.nan)
+    keys = np.where(np.isnan(values), -np.inf, values)
+
+    n = len(keys)
+    if k < n:
+        kth = keys[np.argpartition(keys, n - k)[n - k]]
+        data = data.iloc[np.flatnonzero(keys >= kth)]
+    return sort_by_count(data, column).head(k)
+
+
+def group_metrics(keys, tkc=None, has_service=None):
+    """Per-group customer_count, avg_tkc, total_tkc and service_rate (factorize + bincount)
+
+    Rows with a missing key are ignored; avg_tkc and service_rate skip missing values
+    and are NaN for groups without any.
+    """
+    codes, labels = pd.factorize(keys, sort=True)
+    valid = codes >= 0
+    codes = codes[valid]
+    size = len(labels)
+
+    metrics = {'customer_count': np.bincount(codes, minlength=size)}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if tkc is not None:
+            values = tkc.to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+            present = ~np.isnan(values)
+            total = np.bincount(codes[present], weights=values[present], minlength=size)
+            metrics['avg_tkc'] = total / np.bincount(codes[present], minlength=size)
+            metrics['total_tkc'] = total
+        if has_service is not None:
+            flags = has_service.to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+            present = ~np.isnan(flags)
+            metrics['service_rate'] = (np.bincount(codes[present], weights=flags[present], minlength=size)
+                                       / np.bincount(codes[present], minlength=size))
+
+    return pd.DataFrame(metrics, index=pd.Index(np.asarray(labels, dtype=object), name=keys.name))
+
+
+def rank_groups(df, by, k=10, metric='customer_count', exclude=()):
+    """Top k values of column `by` ranked by one of the group_metrics columns"""
+    metrics = group_metrics(df[by], df.get('TOTAL_TKC'), df.get('HAS_SERVICE'))
+    if metric not in metrics.columns:
+        raise ValueError(f"Unknown ranking metric '{metric}', expected one of {list(metrics.columns)}")
+    if exclude:
+        metrics = metrics.drop(list(exclude), errors='ignore')
+    return top_k(metrics, k, metric)
+
+
+def staff_rankings(staff_stats, k=10, metrics=RANKING_METRICS):
+    """Top k staff codes for each ranking metric as {metric: {staff_code: value}}"""
+    return {metric: top_k(staff_stats, k, metric)[metric].to_dict() for metric in metrics}
@@ -6,38 +6,136 @@ Performs comprehensive statistical analysis and trend detection
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import json
+import os
+import time
+import threading
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from streaming_stats import (TKCAccumulator, ServiceAccumulator, ChurnAccumulator, HeavyHitterSketch,
+                             SKETCH_CHUNK_ROWS, COUNT_MODES, bin_counts, safe_mean,
+                             staff_value_columns, staff_table)
+from cohort import cohort_lifetimes, cohort_retention
+from survival import SURVIVAL_STRATA, survival_lifetimes, survival_counts, survival_section, survival_as_of
+from olap_cube import ACTIVATION_MONTH, STAFF_CUBE_DIMENSIONS, get_cube
+from stats_io import save_stats, binary_path
+from ranking import top_k, staff_rankings, sort_by_count
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+ACCOUNT_AGE_BINS = [0, 365, 730, 1095, 1460, 10000]
+ACCOUNT_AGE_LABELS = ['<1 year', '1-2 years', '2-3 years', '3-4 years', '4+ years']
+
+# (stats key, method) in output order
+SECTIONS = [
+    ('overview', '_analyze_overview'),
+    ('tkc_analysis', '_analyze_tkc'),
+    ('service_analysis', '_analyze_service_adoption'),
+    ('churn_analysis', '_analyze_churn_risk'),
+    ('geographic_analysis', '_analyze_geographic'),
+    ('staff_performance', '_analyze_staff_performance'),
+    ('temporal_trends', '_analyze_temporal_trends'),
+    ('cohort_retention', '_analyze_cohort_retention'),
+    ('survival_analysis', '_analyze_survival'),
+    ('segmentation', '_analyze_segmentation')
+]
+
 
 class VNPTStatisticalAnalyzer:
     """Statistical analysis for VNPT telecom customer data"""
     
-    def __init__(self, df):
-        """Initialize analyzer with cleaned dataframe"""
+    def __init__(self, df, quantile_mode='exact', count_mode='exact'):
+        """Initialize analyzer with cleaned dataframe
+        
+        quantile_mode selects how TKC quartiles are computed: 'exact' (identical to
+        Series.quantile) or 'kll' (bounded-memory sketch, approximate).
+        count_mode selects how BTS and staff distinct counts and top lists are
+        computed: 'exact' or 'sketch' (HyperLogLog + Space-Saving, bounded memory;
+        the stated error is reported under 'approximation').
+        """
+        if count_mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode '{count_mode}', expected one of {COUNT_MODES}")
         self.df = df
+        self.quantile_mode = quantile_mode
+        self.count_mode = count_mode
         self.stats = {}
-        
-    def analyze_all(self):
-        """Run all statistical analyses"""
+        self._cubes = {}
+        self._cube_lock = threading.Lock()
+    
+    @property
+    def cube(self):
+        """OLAP cube of the frame, shared by the sections (built once per frame)"""
+        return self._get_cube(None)
+    
+    @property
+    def staff_cube(self):
+        """Staff × service roll-up of the frame (built once per frame)"""
+        return self._get_cube(tuple(STAFF_CUBE_DIMENSIONS))
+    
+    def _get_cube(self, dimensions):
+        """Cube over the given dimensions (None = default), built once even when
+        several section threads ask for it at the same time"""
+        with self._cube_lock:
+            if dimensions not in self._cubes:
+                self._cubes[dimensions] = get_cube(self.df, dimensions)
+        return self._cubes[dimensions]
+    
+    def _sketch_column(self, column, values=None):
+        """HeavyHitterSketch of a column, fed SKETCH_CHUNK_ROWS rows at a time
+        
+        values, if given, maps a chunk to the additive columns tracked per key.
+        """
+        sketch = HeavyHitterSketch()
+        for start in range(0, len(self.df), SKETCH_CHUNK_ROWS):
+            chunk = self.df.iloc[start:start + SKETCH_CHUNK_ROWS]
+            sketch.update(chunk[column], None if values is None else values(chunk))
+        return sketch
+        
+    def analyze_all(self, max_workers=None):
+        """Run all statistical analyses
+        
+        Sections run concurrently in a thread pool against the shared frame, which
+        they only read (the pandas/NumPy scans release the GIL for most of their
+        work). max_workers=1 runs everything serially; None uses one worker
+        per section up to the CPU count. Wall time per section is stored in
+        stats['section_timings'].
+        """
         logger.info("Starting comprehensive statistical analysis...")
+        start = time.perf_counter()
+        
+        workers = max_workers or min(len(SECTIONS), os.cpu_count() or 1)
+        results = {}
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analyze') as pool:
+                futures = {name: pool.submit(self._timed_section, method) for name, method in SECTIONS}
+                for name, future in futures.items():
+                    results[name] = future.result()
+        else:
+            for name, method in SECTIONS:
+                results[name] = self._timed_section(method)
+        
+        timings = {}
+        for name, _ in SECTIONS:
+            self.stats[name], timings[name] = results[name]
+        
+        self.stats['section_timings'] = {
+            'max_workers': workers,
+            'wall_time_s': round(time.perf_counter() - start, 4),
+            'sections': timings
+        }
         
-        self.stats['overview'] = self._analyze_overview()
-        self.stats['tkc_analysis'] = self._analyze_tkc()
-        self.stats['service_analysis'] = self._analyze_service_adoption()
-        self.stats['churn_analysis'] = self._analyze_churn_risk()
-        self.stats['geographic_analysis'] = self._analyze_geographic()
-        self.stats['staff_performance'] = self._analyze_staff_performance()
-        self.stats['temporal_trends'] = self._analyze_temporal_trends()
-        self.stats['segmentation'] = self._analyze_segmentation()
-        
-        logger.info("Statistical analysis completed")
+        logger.info(f"Statistical analysis completed in {self.stats['section_timings']['wall_time_s']:.2f}s ({workers} workers)")
         return self.stats
     
+    def _timed_section(self, method):
+        """Run one section method, returning (result, wall seconds)"""
+        start = time.perf_counter()
+        result = getattr(self, method)()
+        return result, round(time.perf_counter() - start, 4)
+    
     def _analyze_overview(self):
         """Overall dataset statistics"""
         logger.info("Analyzing dataset overview...")
@@ -61,91 +159,74 @@ class VNPTStatisticalAnalyzer:
         """Analyze TOTAL_TKC distribution and statistics"""
         logger.info("Analyzing TKC (Tiền Khuyến Cáo) distribution...")
         
-        tkc_col = 'TOTAL_TKC'
-        
-        analysis = {
-            'descriptive_stats': {
-                'mean': float(self.df[tkc_col].mean()),
-                'median': float(self.df[tkc_col].median()),
-                'std': float(self.df[tkc_col].std()),
-                'min': float(self.df[tkc_col].min()),
-                'max': float(self.df[tkc_col].max()),
-                'q25': float(self.df[tkc_col].quantile(0.25)),
-                'q75': float(self.df[tkc_col].quantile(0.75))
-            },
-            'segment_distribution': self.df['TKC_SEGMENT'].value_counts().to_dict(),
-            'total_tkc_value': float(self.df[tkc_col].sum()),
-            'customers_with_zero_tkc': int((self.df[tkc_col] == 0).sum()),
-            'customers_with_max_tkc': int((self.df[tkc_col] == 20000).sum())
-        }
-        
-        return analysis
+        return TKCAccumulator(self.quantile_mode).update(self.df).result()
     
     def _analyze_service_adoption(self):
         """Analyze service adoption patterns"""
         logger.info("Analyzing service adoption...")
         
-        has_service = self.df['HAS_SERVICE']
-        
-        analysis = {
-            'adoption_rate': float(has_service.mean()),
-            'customers_with_service': int(has_service.sum()),
-            'customers_without_service': int((~has_service).sum()),
-            'avg_tkc_with_service': float(self.df[has_service]['TOTAL_TKC'].mean()),
-            'avg_tkc_without_service': float(self.df[~has_service]['TOTAL_TKC'].mean()),
-            'service_codes': self.df[has_service]['SERVICE_CODE'].value_counts().head(10).to_dict()
-        }
-        
-        return analysis
+        return ServiceAccumulator().update(self.df).result()
     
     def _analyze_churn_risk(self):
         """Analyze churn risk distribution"""
         logger.info("Analyzing churn risk...")
         
-        analysis = {
-            'high_risk_count': int((self.df['CHURN_RISK'] == 'High').sum()),
-            'high_risk_percentage': float((self.df['CHURN_RISK'] == 'High').mean()),
-            'avg_days_to_expire': float(self.df['DAYS_TO_EXPIRE'].mean()),
-            'expiring_within_7_days': int((self.df['DAYS_TO_EXPIRE'] < 7).sum()),
-            'expiring_within_30_days': int((self.df['DAYS_TO_EXPIRE'] < 30).sum()),
-            'already_expired': int((self.df['DAYS_TO_EXPIRE'] < 0).sum())
-        }
-        
-        return analysis
+        return ChurnAccumulator().update(self.df).result()
     
     def _analyze_geographic(self):
         """Analyze geographic distribution"""
         logger.info("Analyzing geographic distribution...")
         
+        provinces = self.cube.rollup('PROVINCE_NAME')
         analysis = {
-            'provinces': self.df['PROVINCE_NAME'].value_counts().to_dict(),
-            'top_bts_stations': self.df['BTS_NAME'].value_counts().head(10).to_dict(),
-            'customers_per_province': self.df.groupby('PROVINCE_NAME').agg({
-                'Phone number': 'count',
-                'TOTAL_TKC': 'mean'
-            }).to_dict()
+            'provinces': sort_by_count(self.cube.rollup('PROVINCE_NAME', dense=True)['count']).to_dict(),
+            'customers_per_province': {
+                'Phone number': provinces['count'].to_dict(),
+                'TOTAL_TKC': provinces['TOTAL_TKC_mean'].to_dict()
+            }
         }
         
+        if self.count_mode == 'sketch':
+            bts = self._sketch_column('BTS_NAME')
+            analysis['top_bts_stations'] = bts.top(10)['count'].astype('int64').to_dict()
+            analysis['distinct_bts_stations'] = bts.count()
+            analysis['approximation'] = bts.error_bounds()
+        else:
+            bts_counts = self.df['BTS_NAME'].value_counts(sort=False)
+            analysis['top_bts_stations'] = top_k(bts_counts, 10).to_dict()
+            analysis['distinct_bts_stations'] = int((bts_counts > 0).sum())
+        
         return analysis
     
     def _analyze_staff_performance(self):
         """Analyze staff performance metrics"""
         logger.info("Analyzing staff performance...")
         
-        staff_stats = self.df.groupby('STAFF_CODE').agg({
-            'Phone number': 'count',
-            'TOTAL_TKC': ['mean', 'sum'],
-            'HAS_SERVICE': 'mean'
-        }).round(2)
+        if self.count_mode == 'sketch':
+            staff = self._sketch_column('STAFF_CODE', staff_value_columns)
+            return {
+                'total_staff': staff.count(),
+                'avg_customers_per_staff': safe_mean(staff.keyed_rows(), staff.count()),
+                'top_performers': top_k(staff_table(staff.top(10)), 10, 'customer_count').to_dict(),
+                'unassigned_customers': int((self.df['STAFF_CODE'] == 'UNASSIGNED').sum()),
+                'approximation': staff.error_bounds()
+            }
         
-        staff_stats.columns = ['customer_count', 'avg_tkc', 'total_tkc', 'service_rate']
-        staff_stats = staff_stats.sort_values('customer_count', ascending=False)
+        staff = self.staff_cube.rollup('STAFF_CODE')
+        with_service = self.staff_cube.rollup('STAFF_CODE', HAS_SERVICE=True)['count'].reindex(staff.index, fill_value=0)
+        staff_stats = pd.DataFrame({
+            'customer_count': staff['count'],
+            'avg_tkc': staff['TOTAL_TKC_mean'],
+            'total_tkc': staff['TOTAL_TKC_sum'],
+            'service_rate': with_service / staff['count']
+        }).round(2)
         
         analysis = {
             'total_staff': len(staff_stats),
             'avg_customers_per_staff': float(staff_stats['customer_count'].mean()),
-            'top_performers': staff_stats.head(10).to_dict(),
-            'unassigned_customers': int((self.df['STAFF_CODE'] == 'UNASSIGNED').sum())
+            'top_performers': top_k(staff_stats, 10, 'customer_count').to_dict(),
+            'rankings': staff_rankings(staff_stats),
+            'unassigned_customers': self.staff_cube.count(STAFF_CODE='UNASSIGNED')
         }
         
         return analysis
@@ -154,22 +235,17 @@ class VNPTStatisticalAnalyzer:
         """Analyze temporal trends"""
         logger.info("Analyzing temporal trends...")
         
-        # Activation trends by month
-        self.df['activation_month'] = pd.to_datetime(self.df['DATE_ENTER_ACTIVE']).dt.to_period('M')
-        monthly_activations = self.df.groupby('activation_month').size()
-        
-        # Account age distribution
-        age_bins = [0, 365, 730, 1095, 1460, 10000]
-        age_labels = ['<1 year', '1-2 years', '2-3 years', '3-4 years', '4+ years']
-        self.df['age_category'] = pd.cut(self.df['ACCOUNT_AGE'], bins=age_bins, labels=age_labels)
+        # Groupings come from the cube or temporary arrays; self.df is not modified
+        monthly_activations = self.cube.rollup(ACTIVATION_MONTH)['count']
+        age_distribution = bin_counts(self.df['ACCOUNT_AGE'], ACCOUNT_AGE_BINS, ACCOUNT_AGE_LABELS)
         
         # Convert Period index to string for JSON serialization
         monthly_activations_dict = {str(k): int(v) for k, v in monthly_activations.tail(12).items()}
         
         analysis = {
             'monthly_activations': monthly_activations_dict,
-            'avg_account_age_days': float(self.df['ACCOUNT_AGE'].mean()),
-            'account_age_distribution': self.df['age_category'].value_counts().to_dict(),
+            'avg_account_age_days': self.cube.mean('ACCOUNT_AGE'),
+            'account_age_distribution': sort_by_count(age_distribution).to_dict(),
             'activation_trend': {
                 'last_6_months': int(monthly_activations.tail(6).sum()),
                 'last_12_months': int(monthly_activations.tail(12).sum())
@@ -178,19 +254,39 @@ class VNPTStatisticalAnalyzer:
         
         return analysis
     
+    def _analyze_cohort_retention(self):
+        """Retention matrix: activation-month cohorts x months since activation"""
+        logger.info("Analyzing cohort retention...")
+        
+        lifetimes = cohort_lifetimes(self.df['DATE_ENTER_ACTIVE'], self.df['ACCT_EXPIRE_DATE'])
+        return cohort_retention(lifetimes)
+    
+    def _analyze_survival(self):
+        """Kaplan-Meier account survival curves, overall and per province, TKC segment and service"""
+        logger.info("Analyzing account survival...")
+        
+        as_of = survival_as_of()
+        lifetime, event = survival_lifetimes(self.df['DATE_ENTER_ACTIVE'], self.df['ACCT_EXPIRE_DATE'], as_of)
+        strata = {
+            col: survival_counts(lifetime, event, self.df[col])
+            for col in SURVIVAL_STRATA if col in self.df.columns
+        }
+        return survival_section(survival_counts(lifetime, event), strata, as_of)
+    
     def _analyze_segmentation(self):
         """Analyze customer segmentation"""
         logger.info("Analyzing customer segmentation...")
         
         # Segment by TKC and Service
-        segments = self.df.groupby(['TKC_SEGMENT', 'HAS_SERVICE']).agg({
-            'Phone number': 'count',
-            'TOTAL_TKC': 'mean',
-            'CHURN_RISK': lambda x: (x == 'High').mean()
+        by = ['TKC_SEGMENT', 'HAS_SERVICE']
+        cells = self.cube.rollup(by, dense=True)
+        high_risk = self.cube.rollup(by, dense=True, CHURN_RISK='High')['count']
+        segments = pd.DataFrame({
+            'customer_count': cells['count'],
+            'avg_tkc': cells['TOTAL_TKC_mean'],
+            'churn_risk_rate': high_risk / cells['count']
         }).round(2)
         
-        segments.columns = ['customer_count', 'avg_tkc', 'churn_risk_rate']
-        
         # Convert to JSON-serializable format
         segment_matrix = {}
         for (tkc_seg, has_service), row in segments.iterrows():
@@ -203,14 +299,8 @@ class VNPTStatisticalAnalyzer:
         
         analysis = {
             'segment_matrix': segment_matrix,
-            'high_value_customers': int((
-                (self.df['TKC_SEGMENT'] == 'High') & 
-                (self.df['HAS_SERVICE'] == True)
-            ).sum()),
-            'at_risk_high_value': int((
-                (self.df['TKC_SEGMENT'] == 'High') & 
-                (self.df['CHURN_RISK'] == 'High')
-            ).sum())
+            'high_value_customers': self.cube.count(TKC_SEGMENT='High', HAS_SERVICE=True),
+            'at_risk_high_value': self.cube.count(TKC_SEGMENT='High', CHURN_RISK='High')
         }
         
         return analysis
@@ -264,18 +354,23 @@ class VNPTStatisticalAnalyzer:
         
         return insights
     
-    def save_results(self, output_path):
-        """Save analysis results to JSON"""
+    def save_results(self, output_path, binary=True):
+        """Save analysis results to JSON, plus a sectioned msgpack copy next to it
+        
+        The msgpack file (same name, .msgpack suffix) is what load_stats prefers; it
+        is skipped with a warning when msgpack is not installed.
+        """
         logger.info(f"Saving analysis results to: {output_path}")
         
         # Add insights to stats
         self.stats['insights'] = self.generate_insights()
         
-        # Convert any remaining non-serializable objects
-        stats_json = json.loads(json.dumps(self.stats, default=str))
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(stats_json, f, ensure_ascii=False, indent=2)
+        save_stats(self.stats, output_path)
+        if binary:
+            try:
+                save_stats(self.stats, binary_path(output_path))
+            except ImportError:
+                logger.warning("msgpack is not installed, binary statistics file skipped")
         
         logger.info("Analysis results saved successfully")
 
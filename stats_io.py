@@ -0,0 +1,182 @@
+"""
+Statistics Serialization Module for VNPT Telecom Dataset
+One-pass conversion of analysis results (NumPy/pandas scalars, Periods, Timestamps)
+to plain Python, written as pretty JSON or as a sectioned msgpack file whose
+sections are loaded on first access
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BINARY_SUFFIX = '.msgpack'
+MAGIC = b'VNPTSTAT'
+FORMAT_VERSION = 1
+# magic, format version, header length
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def to_serializable(obj):
+    """Plain-Python copy of a stats structure, converted in a single pass
+
+    Produces what json.dumps(obj, default=str) would encode: NumPy scalars become
+    int/float/bool, arrays and Series lists/dicts, dict keys strings spelled the way
+    JSON writes them, and any other object (Timestamp, Period, NaT...) its str().
+    """
+    if isinstance(obj, dict):
+        return {_serializable_key(k): to_serializable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_serializable(v) for v in obj]
+    if obj is None or type(obj) in (str, bool, int, float):
+        return obj
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        return float(obj)
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, np.ndarray):
+        return [to_serializable(v) for v in obj.tolist()]
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        return to_serializable(obj.to_dict())
+    return str(obj)
+
+
+def _serializable_key(key):
+    """Dict key as the string JSON would write for it"""
+    if isinstance(key, str):
+        return key
+    if key is None:
+        return 'null'
+    if isinstance(key, (bool, np.bool_)):
+        return 'true' if key else 'false'
+    if isinstance(key, (int, np.integer)):
+        return str(int(key))
+    if isinstance(key, (float, np.floating)):
+        return json.dumps(float(key))
+    return str(key)
+
+
+def _msgpack():
+    """The msgpack module (optional dependency)"""
+    import msgpack
+    return msgpack
+
+
+def save_stats(stats, path):
+    """Write stats as pretty JSON, or sectioned msgpack when path ends in .msgpack
+
+    Raises ImportError for a .msgpack path when msgpack is not installed.
+    """
+    path = Path(path)
+    data = to_serializable(stats)
+
+    if path.suffix == BINARY_SUFFIX:
+        msgpack = _msgpack()
+        blobs = {name: msgpack.packb(section, use_bin_type=True) for name, section in data.items()}
+        index, offset = {}, 0
+        for name, blob in blobs.items():
+            index[name] = [offset, len(blob)]
+            offset += len(blob)
+        header = msgpack.packb({'sections': index}, use_bin_type=True)
+        with open(path, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for blob in blobs.values():
+                f.write(blob)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, indent=2))
+
+    logger.info(f"Saved statistics ({len(data)} sections): {path}")
+    return path
+
+
+def binary_path(path):
+    """msgpack sibling of a JSON stats file"""
+    return Path(path).with_suffix(BINARY_SUFFIX)
+
+
+def load_stats(path, prefer_binary=True):
+    """Open a stats file saved by save_stats; sections are read on first access
+
+    For a JSON path, an up-to-date msgpack sibling is used instead when msgpack is
+    installed and prefer_binary is set.
+    """
+    path = Path(path)
+    if prefer_binary and path.suffix != BINARY_SUFFIX:
+        sibling = binary_path(path)
+        if sibling.exists() and (not path.exists() or sibling.stat().st_mtime >= path.stat().st_mtime):
+            try:
+                _msgpack()
+                path = sibling
+            except ImportError:
+                pass
+    return StatsFile(path)
+
+
+class StatsFile(Mapping):
+    """Read-only mapping of section name -> stats, loaded lazily from disk
+
+    msgpack files keep a section index in the header, so only the sections that
+    are accessed get decoded. JSON files are parsed as a whole on first access.
+    """
+
+    def __init__(self, path):
+        """Open path and read the section index (msgpack only)"""
+        self.path = Path(path)
+        self._sections = {}
+        self._index = None
+        self._data_start = 0
+
+        if self.path.suffix == BINARY_SUFFIX:
+            msgpack = _msgpack()
+            with open(self.path, 'rb') as f:
+                magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    raise ValueError(f"Not a VNPT stats file (or unsupported version): {self.path}")
+                self._index = msgpack.unpackb(f.read(header_length), raw=False)['sections']
+            self._data_start = _PREAMBLE.size + header_length
+
+    def _load_json(self):
+        """Parse the whole JSON file once"""
+        if self._index is None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._sections = json.load(f)
+            self._index = dict.fromkeys(self._sections)
+
+    def __getitem__(self, name):
+        """Section by name, decoded on first access"""
+        if self.path.suffix != BINARY_SUFFIX:
+            self._load_json()
+            return self._sections[name]
+
+        if name not in self._sections:
+            offset, length = self._index[name]
+            with open(self.path, 'rb') as f:
+                f.seek(self._data_start + offset)
+                self._sections[name] = _msgpack().unpackb(f.read(length), raw=False)
+        return self._sections[name]
+
+    def __iter__(self):
+        if self.path.suffix != BINARY_SUFFIX:
+            self._load_json()
+        return iter(self._index)
+
+    def __len__(self):
+        if self.path.suffix != BINARY_SUFFIX:
+            self._load_json()
+        return len(self._index)
+
+    def to_dict(self):
+        """All sections as a plain dict"""
+        return {name: self[name] for name in self}
@@ -0,0 +1,593 @@
+"""
+Streaming Statistics Module for VNPT Telecom Dataset
+Mergeable accumulators (Welford moments, exact and KLL quantiles, exact counters,
+HyperLogLog and Space-Saving sketches) behind VNPTStatisticalAnalyzer sections
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+from ranking import sort_by_count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TKC_MAX_VALUE = 20000
+QUANTILE_MODES = ('exact', 'kll')
+COUNT_MODES = ('exact', 'sketch')
+# Rows hashed/grouped at a time when feeding sketches, bounding temporary tables
+SKETCH_CHUNK_ROWS = 100000
+
+
+def count_values(series):
+    """value_counts with a plain object index so counts from different categories merge"""
+    counts = series.value_counts()
+    counts.index = counts.index.astype(object)
+    return counts
+
+
+def month_counts(dates):
+    """Rows per calendar month of a date column, indexed by monthly Period (NaT dropped)
+
+    Months are taken as datetime64[M] codes on a temporary array, so the frame the
+    column belongs to is left untouched.
+    """
+    months = pd.to_datetime(dates).to_numpy().astype('datetime64[M]')
+    months = months[~np.isnat(months)]
+    ordinals, counts = np.unique(months.view('int64'), return_counts=True)
+    return pd.Series(counts.astype('int64'), index=pd.PeriodIndex.from_ordinals(ordinals, freq='M'))
+
+
+def bin_counts(values, bins, labels):
+    """Counts per right-closed bin (bins[i-1], bins[i]] like pd.cut, zero bins kept
+
+    Values outside the bin edges and missing values are not counted.
+    """
+    values = pd.Series(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = np.digitize(values, bins, right=True) - 1
+    inside = (values > bins[0]) & (values <= bins[-1])
+    counts = np.bincount(codes[inside], minlength=len(labels))
+    return pd.Series(counts.astype('int64'), index=pd.Index(labels, dtype=object))
+
+
+def add_partials(left, right):
+    """Merge two additive partials (Series or DataFrame), missing keys counting as zero"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left.add(right, fill_value=0)
+
+
+def safe_mean(total, count):
+    """total / count, NaN when count is zero"""
+    return float(total) / count if count else float('nan')
+
+
+def _lerp(a, b, t):
+    """Linear interpolation computed the way numpy.quantile does"""
+    diff = b - a
+    return b - diff * (1 - t) if t >= 0.5 else a + diff * t
+
+
+class WelfordAccumulator:
+    """Count, mean and variance updatable per batch and mergeable (Welford / Chan et al.)"""
+
+    def __init__(self):
+        """Initialize empty moments"""
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        """Add a batch of values (NaN ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            batch = WelfordAccumulator()
+            batch.n = len(values)
+            batch.mean = float(values.mean())
+            batch.m2 = float(((values - batch.mean) ** 2).sum())
+            self.merge(batch)
+        return self
+
+    def merge(self, other):
+        """Combine with another accumulator"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.n / n
+        self.m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        return self
+
+    def variance(self, ddof=1):
+        """Sample variance (ddof=1 like pandas)"""
+        return self.m2 / (self.n - ddof) if self.n > ddof else float('nan')
+
+    def std(self, ddof=1):
+        """Sample standard deviation"""
+        return float(np.sqrt(self.variance(ddof)))
+
+
+class ExactQuantiles:
+    """Exact quantiles from merged distinct-value counts (memory grows with distinct values)"""
+
+    def __init__(self):
+        """Initialize empty counts"""
+        self.counts = None
+
+    def update(self, values):
+        """Add a batch of values (NaN ignored)"""
+        self.counts = add_partials(self.counts, pd.Series(values).value_counts())
+        return self
+
+    def merge(self, other):
+        """Combine with another ExactQuantiles"""
+        self.counts = add_partials(self.counts, other.counts)
+        return self
+
+    def _sorted(self):
+        counts = self.counts[self.counts > 0].sort_index()
+        return counts.index.to_numpy(dtype=np.float64), np.cumsum(counts.to_numpy(dtype=np.int64))
+
+    def _value_at(self, values, cumulative, rank):
+        return values[np.searchsorted(cumulative, rank, side='right')]
+
+    def quantile(self, q):
+        """Linear-interpolation quantile, identical to Series.quantile"""
+        if self.counts is None or self.counts.sum() == 0:
+            return float('nan')
+        values, cumulative = self._sorted()
+        n = int(cumulative[-1])
+        position = q * (n - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, n - 1)
+        return float(_lerp(
+            self._value_at(values, cumulative, lower),
+            self._value_at(values, cumulative, upper),
+            position - lower
+        ))
+
+    def median(self):
+        """Median, identical to Series.median"""
+        if self.counts is None or self.counts.sum() == 0:
+            return float('nan')
+        values, cumulative = self._sorted()
+        n = int(cumulative[-1])
+        middle = self._value_at(values, cumulative, n // 2)
+        if n % 2:
+            return float(middle)
+        return float((self._value_at(values, cumulative, n // 2 - 1) + middle) / 2)
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang, Liberty) with bounded memory
+
+    Level h holds items of weight 2**h; a full level is sorted and every other
+    item (random offset) is promoted to the next level. Normalized rank error is
+    about 2.3 / k**0.97 with 99% confidence (1.3% at the default k=200); memory is
+    O(k) regardless of stream length.
+    """
+
+    def __init__(self, k=200, seed=0):
+        """Initialize with accuracy parameter k"""
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd leftover item stays on this level
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(keep)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """Add a batch of values (NaN ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Combine with another sketch"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile"""
+        if self.n == 0:
+            return float('nan')
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(values[order][min(index, len(values) - 1)])
+
+    def median(self):
+        """Approximate median"""
+        return self.quantile(0.5)
+
+
+def make_quantile_sketch(mode='exact'):
+    """Quantile accumulator for a mode: 'exact' (value counts) or 'kll' (bounded memory)"""
+    if mode == 'exact':
+        return ExactQuantiles()
+    if mode == 'kll':
+        return KLLSketch()
+    raise ValueError(f"Unknown quantile mode '{mode}', expected one of {QUANTILE_MODES}")
+
+
+def hash_values(values):
+    """64-bit hashes of the non-missing values; equal values hash equally for object,
+    string and categorical dtypes"""
+    series = pd.Series(values)
+    series = series[series.notna()]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.cat.remove_unused_categories()
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter (Flajolet et al.) over 64-bit value hashes
+
+    Memory is 2**precision one-byte registers (16 KB at the default 14); the
+    relative standard error of count() is 1.04 / sqrt(2**precision), about 0.8%.
+    """
+
+    def __init__(self, precision=14):
+        """Initialize empty registers"""
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """Relative standard error of the estimate"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values):
+        """Add a batch of values (missing values ignored)"""
+        hashes = hash_values(values)
+        width = 64 - self.precision
+        buckets = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining bits (width + 1 if none);
+        # rest < 2**53 so the float exponent is its exact bit length
+        ranks = width + 1 - np.frexp(rest.astype(np.float64))[1]
+        np.maximum.at(self.registers, buckets, ranks.astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        """Combine with another counter of the same precision"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Estimated number of distinct values"""
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary (Metwally et al.), batched and mergeable
+
+    Keeps at most `capacity` items, each with an upper-bound count and the most it
+    may be overestimated by. Every item occurring more than n / capacity times is
+    kept and no count is overestimated by more than n / capacity. Batches are
+    counted exactly, cut to the top `capacity` items and merged; optional additive
+    value columns are summed per item over the rows seen while it was kept.
+    """
+
+    def __init__(self, capacity=1000):
+        """Initialize an empty summary"""
+        self.capacity = capacity
+        self.n = 0
+        # Upper bound on the count of any item that is not kept
+        self.floor = 0.0
+        self.table = None
+
+    def update(self, keys, values=None):
+        """Add a batch of keys with an optional frame of additive value columns"""
+        frame = pd.DataFrame({'key': np.asarray(keys, dtype=object), 'count': 1.0})
+        if values is not None:
+            for col in values.columns:
+                frame[col] = values[col].to_numpy(dtype=np.float64)
+        frame = frame[frame['key'].notna().to_numpy()]
+
+        batch = SpaceSaving(self.capacity)
+        batch.n = len(frame)
+        batch.table = frame.groupby('key', sort=False).sum()
+        batch.table.insert(1, 'error', 0.0)
+        batch._truncate()
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Combine with another summary; items missing on one side count at its floor"""
+        self.n += other.n
+        if other.table is None:
+            return self
+        if self.table is None:
+            self.table = other.table.copy()
+            self.floor = other.floor
+            return self
+
+        index = self.table.index.union(other.table.index, sort=False)
+        sides = []
+        for summary in (self, other):
+            side = summary.table.reindex(index)
+            side[['count', 'error']] = side[['count', 'error']].fillna(summary.floor)
+            sides.append(side.fillna(0.0))
+        self.table = sides[0] + sides[1]
+        self.floor += other.floor
+        self._truncate()
+        return self
+
+    def _truncate(self):
+        """Keep the `capacity` largest counts, raising the floor to the largest dropped one"""
+        if len(self.table) > self.capacity:
+            table = sort_by_count(self.table, 'count')
+            self.floor = max(self.floor, float(table['count'].iloc[self.capacity]))
+            self.table = table.iloc[:self.capacity]
+
+    def top(self, n=10):
+        """The n most frequent kept items (count, error and value columns)"""
+        if self.table is None:
+            return pd.DataFrame(columns=['count', 'error'])
+        return sort_by_count(self.table, 'count').head(n)
+
+    @property
+    def error_bound(self):
+        """Guaranteed maximum overestimate of any count (n / capacity)"""
+        return self.n / self.capacity
+
+
+class HeavyHitterSketch:
+    """Bounded-memory distinct count (HyperLogLog) and top-k (Space-Saving) of a key column"""
+
+    def __init__(self, capacity=1000, precision=14):
+        """Initialize empty sketches"""
+        self.distinct = HyperLogLog(precision)
+        self.heavy_hitters = SpaceSaving(capacity)
+
+    def update(self, keys, values=None):
+        """Add a batch of keys with an optional frame of additive value columns
+
+        Each batch is counted exactly before it is summarized, so feed large columns
+        in chunks (see SKETCH_CHUNK_ROWS) to keep that temporary table small.
+        """
+        self.distinct.update(keys)
+        self.heavy_hitters.update(keys, values)
+        return self
+
+    def merge(self, other):
+        """Combine with another sketch"""
+        self.distinct.merge(other.distinct)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        return self
+
+    def count(self):
+        """Estimated number of distinct keys"""
+        return self.distinct.count()
+
+    def keyed_rows(self):
+        """Number of rows with a non-missing key"""
+        return self.heavy_hitters.n
+
+    def top(self, n=10):
+        """The n most frequent keys with upper-bound counts"""
+        return self.heavy_hitters.top(n)
+
+    def error_bounds(self):
+        """Stated error of the estimates, reported next to sketch results"""
+        top = self.heavy_hitters.table
+        return {
+            'distinct_relative_error': round(float(self.distinct.relative_error), 4),
+            'top_count_error_bound': round(self.heavy_hitters.error_bound, 2),
+            'top_count_max_overestimate': float(top['error'].max()) if top is not None and len(top) else 0.0
+        }
+
+
+def staff_value_columns(df):
+    """Per-row additive values behind the staff table (count/sum pairs)"""
+    tkc = df['TOTAL_TKC']
+    return pd.DataFrame({
+        'phone_count': df['Phone number'].notna(),
+        'tkc_sum': tkc.fillna(0),
+        'tkc_count': tkc.notna(),
+        'service_sum': df['HAS_SERVICE'].fillna(False),
+        'service_count': df['HAS_SERVICE'].notna()
+    }, index=df.index).astype(np.float64)
+
+
+def staff_table(sums, count_column='phone_count'):
+    """Staff metrics (customer_count, avg_tkc, total_tkc, service_rate) from summed values"""
+    return pd.DataFrame({
+        'customer_count': sums[count_column].astype('int64'),
+        'avg_tkc': sums['tkc_sum'] / sums['tkc_count'],
+        'total_tkc': sums['tkc_sum'],
+        'service_rate': sums['service_sum'] / sums['service_count']
+    }).round(2)
+
+
+class TKCAccumulator:
+    """Mergeable state behind the tkc_analysis section"""
+
+    def __init__(self, quantile_mode='exact', max_value=TKC_MAX_VALUE):
+        """Initialize empty state"""
+        self.max_value = max_value
+        self.moments = WelfordAccumulator()
+        self.quantiles = make_quantile_sketch(quantile_mode)
+        self.minimum = np.nan
+        self.maximum = np.nan
+        self.total = 0.0
+        self.zero_count = 0
+        self.max_count = 0
+        self.segments = None
+
+    def update(self, df):
+        """Add a batch of cleaned rows"""
+        tkc = df['TOTAL_TKC']
+        values = tkc.dropna().to_numpy(dtype=np.float64)
+        self.moments.update(values)
+        self.quantiles.update(values)
+        if len(values):
+            self.minimum = np.fmin(self.minimum, values.min())
+            self.maximum = np.fmax(self.maximum, values.max())
+        self.total += float(values.sum())
+        self.zero_count += int((values == 0).sum())
+        self.max_count += int((values == self.max_value).sum())
+        self.segments = add_partials(self.segments, count_values(df['TKC_SEGMENT']))
+        return self
+
+    def merge(self, other):
+        """Combine with another accumulator"""
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        self.total += other.total
+        self.zero_count += other.zero_count
+        self.max_count += other.max_count
+        self.segments = add_partials(self.segments, other.segments)
+        return self
+
+    def result(self):
+        """tkc_analysis section"""
+        segments = self.segments.astype('int64') if self.segments is not None else pd.Series(dtype='int64')
+        return {
+            'descriptive_stats': {
+                'mean': float(self.moments.mean) if self.moments.n else float('nan'),
+                'median': self.quantiles.median(),
+                'std': self.moments.std(),
+                'min': float(self.minimum),
+                'max': float(self.maximum),
+                'q25': self.quantiles.quantile(0.25),
+                'q75': self.quantiles.quantile(0.75)
+            },
+            'segment_distribution': sort_by_count(segments).to_dict(),
+            'total_tkc_value': float(self.total),
+            'customers_with_zero_tkc': self.zero_count,
+            'customers_with_max_tkc': self.max_count
+        }
+
+
+class ServiceAccumulator:
+    """Mergeable state behind the service_analysis section"""
+
+    def __init__(self):
+        """Initialize empty state"""
+        self.rows = 0
+        self.with_service = 0
+        self.tkc_with_service = WelfordAccumulator()
+        self.tkc_without_service = WelfordAccumulator()
+        self.service_codes = None
+
+    def update(self, df):
+        """Add a batch of cleaned rows"""
+        has_service = df['HAS_SERVICE'].to_numpy(dtype=bool)
+        tkc = df['TOTAL_TKC'].to_numpy(dtype=np.float64)
+        self.rows += len(df)
+        self.with_service += int(has_service.sum())
+        self.tkc_with_service.update(tkc[has_service])
+        self.tkc_without_service.update(tkc[~has_service])
+        self.service_codes = add_partials(self.service_codes, count_values(df.loc[has_service, 'SERVICE_CODE']))
+        return self
+
+    def merge(self, other):
+        """Combine with another accumulator"""
+        self.rows += other.rows
+        self.with_service += other.with_service
+        self.tkc_with_service.merge(other.tkc_with_service)
+        self.tkc_without_service.merge(other.tkc_without_service)
+        self.service_codes = add_partials(self.service_codes, other.service_codes)
+        return self
+
+    def result(self):
+        """service_analysis section"""
+        codes = self.service_codes.astype('int64') if self.service_codes is not None else pd.Series(dtype='int64')
+        return {
+            'adoption_rate': safe_mean(self.with_service, self.rows),
+            'customers_with_service': self.with_service,
+            'customers_without_service': self.rows - self.with_service,
+            'avg_tkc_with_service': float(self.tkc_with_service.mean) if self.tkc_with_service.n else float('nan'),
+            'avg_tkc_without_service': float(self.tkc_without_service.mean) if self.tkc_without_service.n else float('nan'),
+            'service_codes': sort_by_count(codes).head(10).to_dict()
+        }
+
+
+class ChurnAccumulator:
+    """Mergeable state behind the churn_analysis section"""
+
+    def __init__(self):
+        """Initialize empty state"""
+        self.rows = 0
+        self.high_risk = 0
+        self.days_to_expire = WelfordAccumulator()
+        self.within_7_days = 0
+        self.within_30_days = 0
+        self.expired = 0
+
+    def update(self, df):
+        """Add a batch of cleaned rows"""
+        days = df['DAYS_TO_EXPIRE'].to_numpy(dtype=np.float64)
+        self.rows += len(df)
+        self.high_risk += int((df['CHURN_RISK'] == 'High').sum())
+        self.days_to_expire.update(days)
+        self.within_7_days += int((days < 7).sum())
+        self.within_30_days += int((days < 30).sum())
+        self.expired += int((days < 0).sum())
+        return self
+
+    def merge(self, other):
+        """Combine with another accumulator"""
+        self.rows += other.rows
+        self.high_risk += other.high_risk
+        self.days_to_expire.merge(other.days_to_expire)
+        self.within_7_days += other.within_7_days
+        self.within_30_days += other.within_30_days
+        self.expired += other.expired
+        return self
+
+    def result(self):
+        """churn_analysis section"""
+        return {
+            'high_risk_count': self.high_risk,
+            'high_risk_percentage': safe_mean(self.high_risk, self.rows),
+            'avg_days_to_expire': float(self.days_to_expire.mean) if self.days_to_expire.n else float('nan'),
+            'expiring_within_7_days': self.within_7_days,
+            'expiring_within_30_days': self.within_30_days,
+            'already_expired': self.expired
+        }
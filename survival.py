@@ -0,0 +1,105 @@
+"""
+Survival Module for VNPT Telecom Dataset
+Kaplan-Meier account survival curves, overall and per stratum, from additive
+event/removal counts per month of account life
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Account lifetimes longer than this (in months) are censored by the survival curves
+SURVIVAL_HORIZON_MONTHS = 120
+SURVIVAL_STRATA = ('PROVINCE_NAME', 'TKC_SEGMENT', 'HAS_SERVICE')
+
+
+def survival_as_of():
+    """Date account lifetimes are observed at (today); later expiry dates are censored"""
+    return pd.Timestamp.today().normalize()
+
+
+def survival_lifetimes(activation, expiry, as_of=None, horizon=SURVIVAL_HORIZON_MONTHS):
+    """Account lifetime in calendar months and whether it ended in expiry, per row
+
+    Accounts expiring after as_of (or without an expiry date) are censored at
+    as_of, lifetimes beyond horizon are censored at horizon. Rows without an
+    activation date get lifetime -1. Computed once and shared by every stratification.
+    """
+    as_of = (survival_as_of() if as_of is None else pd.Timestamp(as_of)).to_datetime64()
+    activation = pd.to_datetime(activation).to_numpy().astype('datetime64[M]')
+    expiry = pd.to_datetime(expiry).to_numpy()
+
+    event = expiry <= as_of
+    end = np.where(event, expiry, as_of).astype('datetime64[M]')
+    lifetime = np.clip(end.view('int64') - activation.view('int64'), 0, None)
+    event &= lifetime <= horizon
+    lifetime = np.minimum(lifetime, horizon)
+    lifetime[np.isnat(activation)] = -1
+    return lifetime, event
+
+
+def survival_counts(lifetime, event, strata=None, horizon=SURVIVAL_HORIZON_MONTHS):
+    """Expiry events and removals per stratum and month of account life (additive partial)
+
+    Rows are stratum labels ('ALL' when strata is None), columns ('events', t)
+    and ('removed', t) for t = 0..horizon. Every stratum is counted in the same
+    bincount; rows missing the activation date or the stratum label are skipped.
+    """
+    if strata is None:
+        codes, labels = np.zeros(len(lifetime), dtype=np.int64), ['ALL']
+    else:
+        codes, labels = pd.factorize(strata, sort=True)
+
+    valid = (lifetime >= 0) & (codes >= 0)
+    width = horizon + 1
+    cells = codes[valid] * width + lifetime[valid]
+    size = len(labels) * width
+    events = np.bincount(cells[event[valid]], minlength=size).reshape(len(labels), width)
+    removed = np.bincount(cells, minlength=size).reshape(len(labels), width)
+
+    columns = pd.MultiIndex.from_product([['events', 'removed'], range(width)])
+    return pd.DataFrame(np.hstack([events, removed]), index=pd.Index(np.asarray(labels, dtype=object)),
+                        columns=columns)
+
+
+def kaplan_meier(counts):
+    """Kaplan-Meier survival curves for every row of survival_counts at once
+
+    At-risk counts are reversed cumulative sums of removals and the curves a
+    cumulative product of (1 - events / at risk) along the lifetime axis.
+    Returns {label: {customers, events, median_months, survival}}; survival is
+    None where nobody is left at risk.
+    """
+    events = counts['events'].to_numpy(dtype=np.float64)
+    removed = counts['removed'].to_numpy(dtype=np.float64)
+    at_risk = removed[:, ::-1].cumsum(axis=1)[:, ::-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+    survival = np.round(np.cumprod(1.0 - hazard, axis=1), 4)
+
+    below_half = survival <= 0.5
+    median = np.where(below_half.any(axis=1), below_half.argmax(axis=1), -1)
+
+    curves = {}
+    for i, label in enumerate(counts.index):
+        curves[label] = {
+            'customers': int(removed[i].sum()),
+            'events': int(events[i].sum()),
+            'median_months': int(median[i]) if median[i] >= 0 else None,
+            'survival': [float(s) if n > 0 else None for s, n in zip(survival[i], at_risk[i])]
+        }
+    return curves
+
+
+def survival_section(overall, strata, as_of, horizon=SURVIVAL_HORIZON_MONTHS):
+    """survival_analysis section from survival_counts partials (overall and {column: counts})"""
+    return {
+        'as_of': str(as_of.date()),
+        'time_unit': 'months',
+        'timeline': list(range(horizon + 1)),
+        'overall': kaplan_meier(overall)['ALL'] if overall is not None else None,
+        'strata': {column: kaplan_meier(counts) for column, counts in strata.items()}
+    }
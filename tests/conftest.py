@@ -0,0 +1,77 @@
+"""
+Shared fixtures: a small synthetic raw workbook frame with the columns and value
+shapes of Raw_Data.xlsx, and its cleaned version
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from data_cleaner import VNPTDataCleaner  # noqa: E402
+
+CONFIG_PATH = ROOT / 'config.yaml'
+
+
+def make_raw_frame(n=2000, seed=0):
+    """Raw frame shaped like Raw_Data.xlsx (object text columns, some missing values)"""
+    rng = np.random.default_rng(seed)
+    provinces = np.array(['Lào Cai', 'Yên Bái', 'Hà Giang'])
+    province_codes = np.array(['LCI', 'YBI', 'HGG'])
+    province = rng.integers(0, len(provinces), n)
+
+    activation = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, n), unit='D')
+    expiry = pd.Timestamp.today().normalize() + pd.to_timedelta(rng.integers(-400, 900, n), unit='D')
+    has_service = rng.random(n) < 0.3
+    tkc = np.round(rng.gamma(1.2, 8000, n), 2)
+    tkc[rng.random(n) < 0.2] = 0.0
+
+    df = pd.DataFrame({
+        'Donvi': rng.choice(['LAOCAI', 'BAOTHANG', 'MKHUONG', 'BACHA'], n).astype(object),
+        'STAFF_CODE': np.array([f' staff{i:03d}.lci ' for i in rng.integers(0, 150, n)], dtype=object),
+        'Phone number': 84 * 10**9 + rng.choice([81, 82, 91, 96, 70], n) * 10**7 + rng.integers(0, 10**7, n),
+        'PROVINCE_CODE_INIT': province_codes[province].astype(object),
+        'PROVINCE_NAME': provinces[province].astype(object),
+        'BTS_NAME': np.array([f'4G-BTS{i:03d}M-LCI' for i in rng.integers(0, 300, n)], dtype=object),
+        'TOTAL_TKC': tkc,
+        'DATE_ENTER_ACTIVE': activation,
+        'ACCT_EXPIRE_DATE': expiry,
+        'SERVICE_CODE': np.where(has_service, rng.choice(['mi_d219', 'mi_d90'], n), None).astype(object),
+        'TIME_START': activation.where(has_service),
+        'TIME_END': expiry.where(has_service),
+        'LIFE_CYCLE_STAT_CD': rng.choice(['ACTIVE', 'K1C', 'K2C', '-1'], n, p=[0.7, 0.1, 0.1, 0.1]).astype(object),
+        'Mục tiêu dùng TKC': rng.choice(['<=5K', '>5k & <=20k', '>20k'], n).astype(object),
+        'Mục ?? ưu tiên': rng.choice(['UT1', 'UT2'], n).astype(object)
+    })
+    df.loc[rng.random(n) < 0.05, 'STAFF_CODE'] = None
+    df.loc[rng.random(n) < 0.05, 'Donvi'] = None
+    df.loc[rng.random(n) < 0.05, 'BTS_NAME'] = None
+    return df
+
+
+@pytest.fixture
+def cleaner():
+    """Cleaner with the repository config"""
+    return VNPTDataCleaner(CONFIG_PATH)
+
+
+@pytest.fixture(scope='session')
+def _cleaned_frame():
+    return VNPTDataCleaner(CONFIG_PATH).clean_data(make_raw_frame())
+
+
+@pytest.fixture
+def raw_df():
+    """Fresh synthetic raw frame"""
+    return make_raw_frame()
+
+
+@pytest.fixture
+def cleaned_df(_cleaned_frame):
+    """Fresh copy of the cleaned synthetic frame"""
+    return _cleaned_frame.copy()
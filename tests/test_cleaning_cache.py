@@ -0,0 +1,36 @@
+"""Cleaning cache: same data, config and snapshot date hit; any change misses"""
+
+from datetime import timedelta
+
+import pandas as pd
+
+from cleaning_cache import VNPTCleaningCache
+
+
+def test_cleaning_cache_hit_and_miss(cleaner, raw_df, tmp_path):
+    cache = VNPTCleaningCache(tmp_path)
+    df_cleaned, report, hit = cleaner.clean_with_report(raw_df, cache=cache)
+    assert not hit
+    assert len(list(tmp_path.glob('*.parquet'))) == 1
+
+    # Same inputs: the stored frame comes back with the cleaned dtypes
+    cached_df, cached_report, hit = cleaner.clean_with_report(raw_df.copy(), cache=cache)
+    assert hit
+    pd.testing.assert_frame_equal(cached_df, df_cleaned)
+    assert cached_report['cleaned_records'] == report['cleaned_records']
+
+    # Changed data
+    changed = raw_df.copy()
+    changed.loc[0, 'TOTAL_TKC'] += 1
+    assert not cleaner.clean_with_report(changed, cache=cache)[2]
+
+    # Changed config
+    cleaner.config['churn_risk_days'] += 1
+    assert not cleaner.clean_with_report(raw_df, cache=cache)[2]
+    cleaner.config['churn_risk_days'] -= 1
+    assert cleaner.clean_with_report(raw_df, cache=cache)[2]
+
+    # Next snapshot date
+    cleaner.today += timedelta(days=1)
+    assert not cleaner.clean_with_report(raw_df, cache=cache)[2]
+    assert len(list(tmp_path.glob('*.parquet'))) == 4
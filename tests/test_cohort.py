@@ -0,0 +1,46 @@
+"""Cohort retention matrix against hand-computed values"""
+
+import pandas as pd
+
+from cohort import cohort_lifetimes, cohort_retention
+
+
+def test_cohort_retention_matches_hand_computed_matrix():
+    activation = pd.to_datetime(pd.Series([
+        '2024-01-05', '2024-01-10', '2024-01-31', '2024-01-01', '2024-03-15', '2024-03-02', None
+    ]))
+    expiry = pd.to_datetime(pd.Series([
+        '2024-01-20', '2024-03-01', None, '2025-01-01', '2024-04-15', '2023-12-01', '2024-01-01'
+    ]))
+
+    lifetimes = cohort_lifetimes(activation, expiry, max_age=3)
+
+    # Months to expiry, capped at 4 (= still active after 3 months); expiry before
+    # activation counts as 0; the row without an activation date is skipped
+    jan, mar = pd.Period('2024-01', 'M').ordinal, pd.Period('2024-03', 'M').ordinal
+    assert lifetimes.index.tolist() == [jan, mar]
+    assert lifetimes.loc[jan].tolist() == [1, 0, 1, 0, 2]
+    assert lifetimes.loc[mar].tolist() == [1, 1, 0, 0, 0]
+
+    retention = cohort_retention(lifetimes)
+    assert retention['cohorts'] == ['2024-01', '2024-03']
+    assert retention['months_since_activation'] == [0, 1, 2, 3]
+    assert retention['cohort_sizes'] == [4, 2]
+    # Share with expiry more than k months after activation; unobservable cells are None
+    assert retention['retention'] == [
+        [0.75, 0.75, 0.5, None],
+        [0.5, None, None, None]
+    ]
+
+    latest = cohort_retention(lifetimes, max_cohorts=1)
+    assert latest['cohorts'] == ['2024-03']
+    assert latest['retention'] == [[0.5, None, None, None]]
+
+
+def test_cohort_lifetimes_are_additive():
+    activation = pd.to_datetime(pd.Series(['2024-01-05', '2024-02-10', '2024-01-31', '2024-02-01']))
+    expiry = pd.to_datetime(pd.Series(['2024-03-20', None, '2024-01-31', '2024-05-01']))
+
+    whole = cohort_lifetimes(activation, expiry)
+    parts = cohort_lifetimes(activation[:2], expiry[:2]).add(cohort_lifetimes(activation[2:], expiry[2:]), fill_value=0)
+    pd.testing.assert_frame_equal(parts.astype(whole.dtypes.iloc[0]), whole)
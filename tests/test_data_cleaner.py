@@ -0,0 +1,63 @@
+"""Tests for VNPTDataCleaner"""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from conftest import make_raw_frame
+
+
+def test_memory_tracing_is_opt_in(cleaner, raw_df):
+    cleaner.clean_data(raw_df)
+    assert not tracemalloc.is_tracing()
+    assert all(step['peak_memory_mb'] is None for step in cleaner.last_step_profile)
+
+    cleaner.clean_data(raw_df, profile_memory=True)
+    assert not tracemalloc.is_tracing()
+    assert all(step['peak_memory_mb'] is not None for step in cleaner.last_step_profile)
+
+
+def _traced_peak(func):
+    """tracemalloc peak (bytes above the starting level) while func runs"""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        func()
+        return tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+
+def test_zero_copy_cleaning_shares_untouched_columns(cleaner):
+    raw = make_raw_frame(20000)
+    expected_raw = raw.copy(deep=True)
+
+    cleaned = {}
+    zero_copy_peak = _traced_peak(lambda: cleaned.update(df=cleaner.clean_data(raw, copy=False)))
+    copy_peak = _traced_peak(lambda: cleaner.clean_data(raw, copy=True))
+
+    pd.testing.assert_frame_equal(raw, expected_raw)
+    for col in ['Phone number', 'TOTAL_TKC', 'DATE_ENTER_ACTIVE', 'ACCT_EXPIRE_DATE']:
+        assert np.shares_memory(cleaned['df'][col].to_numpy(), raw[col].to_numpy()), col
+    assert zero_copy_peak < copy_peak
+
+
+def test_stream_cleaning_keeps_dtypes_across_chunks(cleaner, tmp_path):
+    raw = make_raw_frame(600)
+    # First chunk: numeric-only status codes and no service; last chunk: many new staff codes
+    raw['LIFE_CYCLE_STAT_CD'] = raw['LIFE_CYCLE_STAT_CD'].astype(object)
+    raw.loc[:199, 'LIFE_CYCLE_STAT_CD'] = -1
+    raw.loc[:199, ['SERVICE_CODE', 'TIME_START', 'TIME_END']] = None
+    raw.loc[400:, 'STAFF_CODE'] = [f'NEW{i:03d}' for i in range(200)]
+    input_path = tmp_path / 'raw.xlsx'
+    raw.to_excel(input_path, index=False)
+
+    result = cleaner.clean_stream(input_path, tmp_path / 'cleaned.parquet', chunksize=200)
+
+    cleaned = pd.read_parquet(result['output_path'])
+    assert result['chunks'] == 3
+    assert len(cleaned) == len(raw)
+    assert (cleaned['LIFE_CYCLE_STAT_CD'].iloc[:200] == '-1').all()
+    assert cleaned['SERVICE_CODE'].notna().any()
+    assert pd.api.types.is_datetime64_any_dtype(cleaned['TIME_START'])
@@ -0,0 +1,74 @@
+"""Server-side histogram bins against NumPy"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from histograms import (histogram_bins, grouped_histogram_bins, histogram_figure, histogram2d_bins,
+                        stratified_sample)
+
+
+@pytest.fixture
+def values_and_groups():
+    rng = np.random.default_rng(5)
+    values = pd.Series(rng.gamma(1.2, 8000, 20000)).astype('float32')
+    values[rng.random(len(values)) < 0.05] = np.nan
+    groups = pd.Series(rng.choice(['High', 'Low', 'Medium', None], len(values)), dtype='category')
+    return values, groups
+
+
+def test_histogram_bins_match_numpy(values_and_groups):
+    values, _ = values_and_groups
+    counts, edges = histogram_bins(values, bins=40)
+    expected_counts, expected_edges = np.histogram(values.dropna().to_numpy(dtype=np.float64), bins=40)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(edges, expected_edges)
+
+
+def test_grouped_histogram_bins_match_numpy_per_group(values_and_groups):
+    values, groups = values_and_groups
+    grouped, edges = grouped_histogram_bins(values, groups, bins=40)
+
+    keep = values.notna() & groups.notna()
+    _, expected_edges = np.histogram(values[keep].to_numpy(dtype=np.float64), bins=40)
+    np.testing.assert_array_equal(edges, expected_edges)
+    assert list(grouped) == ['High', 'Low', 'Medium']
+    for label, counts in grouped.items():
+        rows = values[keep & (groups == label)].to_numpy(dtype=np.float64)
+        np.testing.assert_array_equal(counts, np.histogram(rows, bins=edges)[0])
+    assert sum(counts.sum() for counts in grouped.values()) == keep.sum()
+
+
+def test_histogram_figure_holds_only_bins(values_and_groups):
+    values, groups = values_and_groups
+    fig = histogram_figure(values, bins=30, groups=groups)
+    assert len(fig.data) == 3
+    assert all(len(trace.y) == 30 for trace in fig.data)
+    assert sum(int(np.sum(trace.y)) for trace in fig.data) == (values.notna() & groups.notna()).sum()
+
+
+def test_histogram2d_bins_match_numpy():
+    rng = np.random.default_rng(6)
+    x, y = rng.normal(size=50000), rng.normal(size=50000) * 3
+    x[::101] = np.nan
+    counts, x_edges, y_edges = histogram2d_bins(x, y, bins=60)
+
+    keep = np.isfinite(x)
+    expected, expected_x, expected_y = np.histogram2d(x[keep], y[keep], bins=60)
+    np.testing.assert_allclose(x_edges, expected_x)
+    np.testing.assert_allclose(y_edges, expected_y)
+    # Arithmetic binning may move a value lying exactly on an inner edge by one bin
+    assert counts.sum() == keep.sum()
+    assert np.abs(counts - expected).sum() <= 2
+
+
+def test_stratified_sample_keeps_small_groups():
+    groups = np.array(['big'] * 100000 + ['medium'] * 2000 + ['small'] * 150)
+    positions = stratified_sample(groups, budget=5000, min_per_group=200)
+
+    assert np.all(np.diff(positions) > 0)
+    sampled = pd.Series(groups[positions]).value_counts()
+    # Groups below min_per_group are kept whole, others get at least about min_per_group
+    assert sampled['small'] == 150
+    assert 150 <= sampled['medium'] <= 250
+    assert abs(len(positions) - 5000) < 500
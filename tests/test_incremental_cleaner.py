@@ -0,0 +1,43 @@
+"""Incremental cleaning must give the same frame as a full clean of the new snapshot"""
+
+import pandas as pd
+import pytest
+
+from conftest import make_raw_frame
+from incremental_cleaner import VNPTIncrementalCleaner
+
+
+def _assert_matches_full_clean(incremental, cleaner, raw):
+    df_cleaned, summary = incremental.clean(raw)
+    assert summary['mode'] == 'incremental'
+    pd.testing.assert_frame_equal(df_cleaned, cleaner.clean_data(raw))
+    return summary
+
+
+# Merging reused and re-cleaned rows must not rely on pandas' deprecated all-NA concat handling
+@pytest.mark.filterwarnings('error:.*all-NA:FutureWarning')
+def test_incremental_matches_full_clean(cleaner, tmp_path):
+    raw = make_raw_frame(3000)
+    incremental = VNPTIncrementalCleaner(cleaner, state_dir=tmp_path)
+    _, summary = incremental.clean(raw)
+    assert summary['mode'] == 'full'
+
+    # Row before a missing Donvi, so the forward-filled value of an unchanged row moves
+    missing = raw.index[raw['Donvi'].isna() & raw['Donvi'].shift().notna()][0]
+    source = missing - 1
+
+    changed = raw.copy()
+    changed.loc[source, 'Donvi'] = 'CHANGED'
+    changed.loc[10, 'TOTAL_TKC'] = 123.0
+    summary = _assert_matches_full_clean(incremental, cleaner, changed)
+    assert summary['changed'] >= 3 and summary['inserted'] == 0
+
+    deleted = changed.drop(index=source).reset_index(drop=True)
+    summary = _assert_matches_full_clean(incremental, cleaner, deleted)
+    assert summary['deleted'] == 1
+
+    inserted = pd.concat([deleted, make_raw_frame(50, seed=1)], ignore_index=True)
+    inserted = inserted.drop_duplicates('Phone number').reset_index(drop=True)
+    summary = _assert_matches_full_clean(incremental, cleaner, inserted)
+    assert summary['inserted'] > 0
+    assert summary['unchanged'] > 0
@@ -0,0 +1,33 @@
+"""Tests for the OLAP cube roll-ups against pandas groupby"""
+
+import numpy as np
+import pytest
+
+from olap_cube import OLAPCube, ACTIVATION_MONTH, STAFF_CUBE_DIMENSIONS
+
+
+@pytest.mark.parametrize('chunk_rows', [1000000, 333])
+def test_rollup_matches_groupby(cleaned_df, chunk_rows):
+    cube = OLAPCube.from_frame(cleaned_df, chunk_rows=chunk_rows)
+
+    by = ['PROVINCE_NAME', 'TKC_SEGMENT']
+    rollup = cube.rollup(by)
+    expected = cleaned_df.groupby(by, observed=True)['TOTAL_TKC'].agg(['size', 'sum', 'mean', 'std', 'min', 'max'])
+    assert rollup['count'].tolist() == expected['size'].tolist()
+    for stat in ['sum', 'mean', 'std', 'min', 'max']:
+        np.testing.assert_allclose(rollup[f'TOTAL_TKC_{stat}'], expected[stat], rtol=1e-9)
+
+    months = cleaned_df['DATE_ENTER_ACTIVE'].dt.to_period('M').value_counts().sort_index()
+    assert cube.rollup(ACTIVATION_MONTH)['count'].to_dict() == months.to_dict()
+    assert cube.count(CHURN_RISK='High', HAS_SERVICE=True) == int(
+        ((cleaned_df['CHURN_RISK'] == 'High') & cleaned_df['HAS_SERVICE']).sum()
+    )
+
+
+def test_staff_rollup_matches_value_counts(cleaned_df):
+    cube = OLAPCube.from_frame(cleaned_df, STAFF_CUBE_DIMENSIONS, chunk_rows=500)
+
+    staff = cube.rollup('STAFF_CODE')['count']
+    expected = cleaned_df['STAFF_CODE'].value_counts()
+    assert staff.to_dict() == expected[expected > 0].to_dict()
+    assert cube.codes.shape[1] <= 2 * len(expected)
@@ -0,0 +1,42 @@
+"""Out-of-core (partitioned) analysis against the in-memory analyzer"""
+
+import math
+
+from conftest import make_raw_frame, CONFIG_PATH
+from data_cleaner import VNPTDataCleaner
+from out_of_core import VNPTOutOfCoreRunner
+from statistical_analyzer import VNPTStatisticalAnalyzer
+from stats_io import to_serializable
+
+
+def assert_stats_close(actual, expected, path='stats'):
+    """Recursive equality with a relative tolerance for floats"""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and set(actual) == set(expected), path
+        for key in expected:
+            assert_stats_close(actual[key], expected[key], f'{path}/{key}')
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_stats_close(a, e, f'{path}[{i}]')
+    elif isinstance(expected, float) and isinstance(actual, float):
+        assert math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9) or (
+            math.isnan(actual) and math.isnan(expected)), path
+    else:
+        assert actual == expected, path
+
+
+def test_partitioned_analysis_matches_in_memory(tmp_path):
+    raw = make_raw_frame()
+    input_path = tmp_path / 'raw.parquet'
+    raw.to_parquet(input_path, index=False)
+
+    runner = VNPTOutOfCoreRunner(VNPTDataCleaner(CONFIG_PATH), work_dir=tmp_path / 'partitions', chunksize=500)
+    report, partitioned = runner.run(input_path)
+    in_memory = VNPTStatisticalAnalyzer(VNPTDataCleaner(CONFIG_PATH).clean_data(raw)).analyze_all()
+
+    assert len(runner.partition_paths()) == 4
+    assert report['cleaned_records'] == len(raw)
+    partitioned.pop('section_timings', None)
+    in_memory.pop('section_timings', None)
+    assert_stats_close(to_serializable(partitioned), to_serializable(in_memory))
@@ -0,0 +1,42 @@
+"""Phone validation by integer range and network prefix decoding"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from phone_numbers import DEFAULT_PHONE_PATTERN, OTHER_GROUP
+
+PHONES = [
+    84_912_345_678, 84_000_000_000, 84_999_999_999, 83_999_999_999, 85_000_000_000,
+    8_491_234_567, 849_123_456_789, 84_871_234_567, 84_501_234_567, 84_321_234_567,
+    84_701_234_567, 0, -84_912_345_678
+]
+
+
+def _expected(phones, config):
+    text = phones.astype(str)
+    valid = text.str.match(DEFAULT_PHONE_PATTERN).to_numpy(dtype=bool)
+    group_of = {int(prefix): group for group, prefixes in config['phone_prefix_groups'].items() for prefix in prefixes}
+    groups = [
+        group_of.get(int(value) // 10**7 % 100, OTHER_GROUP) if ok else np.nan
+        for value, ok in zip(pd.to_numeric(phones, errors='coerce').fillna(0), valid)
+    ]
+    return valid, groups
+
+
+@pytest.mark.parametrize('phones', [
+    pd.Series(PHONES, dtype='int64'),
+    pd.Series(PHONES + [None], dtype='Int64'),
+    pd.Series([str(p) for p in PHONES] + ['84912345678x', None], dtype=object)
+], ids=['int64', 'Int64', 'text'])
+def test_phone_valid_and_prefix_group_match_regex_and_config(cleaner, phones):
+    expected_valid, expected_groups = _expected(phones, cleaner.config)
+
+    df = cleaner._validate_phone_numbers(pd.DataFrame({'Phone number': phones}))
+
+    np.testing.assert_array_equal(df['PHONE_VALID'].to_numpy(), expected_valid)
+    assert df['PHONE_PREFIX_GROUP'].tolist() == expected_groups
+    assert list(df['PHONE_PREFIX_GROUP'].cat.categories) == list(cleaner.config['phone_prefix_groups']) + [OTHER_GROUP]
+    # Fixture covers every outcome: a known carrier, an unknown prefix and invalid numbers
+    assert {'VinaPhone', 'Itelecom', OTHER_GROUP} <= set(df['PHONE_PREFIX_GROUP'].dropna())
+    assert (~expected_valid).sum() >= 6
@@ -0,0 +1,46 @@
+"""Partial-selection rankings against full sorts and groupby"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import top_k, group_metrics, rank_groups, sort_by_count
+
+
+@pytest.mark.parametrize('k', [1, 10, 999, 1000, 5000])
+def test_top_k_matches_nlargest(k):
+    rng = np.random.default_rng(4)
+    unique = pd.Series(rng.permutation(1000).astype(float), index=[f'S{i:04d}' for i in range(1000)])
+    pd.testing.assert_series_equal(top_k(unique, k), unique.nlargest(k))
+
+    # With ties and missing values: same values as nlargest, ties ordered by label, NaN last
+    tied = pd.Series(rng.integers(0, 50, 1000).astype(float), index=unique.index)
+    tied.iloc[::97] = np.nan
+    result = top_k(tied, k)
+    expected = sort_by_count(tied).head(k)
+    pd.testing.assert_series_equal(result, expected)
+    assert result.dropna().tolist() == tied.nlargest(min(k, tied.count())).tolist()
+
+
+def test_top_k_of_frame_column():
+    frame = pd.DataFrame({'customer_count': [5, 9, 1, 9, 3], 'total_tkc': [1.0, 2.0, 3.0, 4.0, 5.0]},
+                         index=list('edcba'))
+    assert top_k(frame, 3, 'customer_count').index.tolist() == ['b', 'd', 'e']
+    assert top_k(frame, 2, 'total_tkc').index.tolist() == frame.nlargest(2, 'total_tkc').index.tolist()
+    assert top_k(frame, 0, 'total_tkc').empty
+
+
+def test_group_metrics_match_groupby(cleaned_df):
+    metrics = group_metrics(cleaned_df['STAFF_CODE'], cleaned_df['TOTAL_TKC'], cleaned_df['HAS_SERVICE'])
+    grouped = cleaned_df.groupby('STAFF_CODE', observed=True)
+    expected = pd.DataFrame({
+        'customer_count': grouped.size(),
+        'avg_tkc': grouped['TOTAL_TKC'].mean(),
+        'total_tkc': grouped['TOTAL_TKC'].sum(),
+        'service_rate': grouped['HAS_SERVICE'].mean()
+    })
+    expected.index = expected.index.astype(object)
+    pd.testing.assert_frame_equal(metrics, expected, check_dtype=False, check_names=False)
+
+    top = rank_groups(cleaned_df, 'STAFF_CODE', k=5, metric='total_tkc', exclude=['UNASSIGNED'])
+    assert top.index.tolist() == sort_by_count(expected.drop('UNASSIGNED'), 'total_tkc').head(5).index.tolist()
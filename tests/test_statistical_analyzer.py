@@ -0,0 +1,29 @@
+"""Tests for VNPTStatisticalAnalyzer"""
+
+import pytest
+
+from statistical_analyzer import VNPTStatisticalAnalyzer, SECTIONS
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_analyze_all_leaves_input_frame_unchanged(cleaned_df, max_workers):
+    columns = list(cleaned_df.columns)
+    memory = cleaned_df.memory_usage(deep=True).sum()
+
+    stats = VNPTStatisticalAnalyzer(cleaned_df).analyze_all(max_workers=max_workers)
+
+    assert list(cleaned_df.columns) == columns
+    assert cleaned_df.memory_usage(deep=True).sum() == memory
+    assert all(name in stats for name, _ in SECTIONS)
+
+
+def test_sketch_count_mode_within_stated_error(cleaned_df):
+    exact = VNPTStatisticalAnalyzer(cleaned_df).analyze_all(max_workers=1)
+    sketch = VNPTStatisticalAnalyzer(cleaned_df, count_mode='sketch').analyze_all(max_workers=1)
+
+    geo, approx = exact['geographic_analysis'], sketch['geographic_analysis']
+    error = 4 * approx['approximation']['distinct_relative_error']
+    assert abs(approx['distinct_bts_stations'] - geo['distinct_bts_stations']) <= error * geo['distinct_bts_stations']
+    staff, approx_staff = exact['staff_performance'], sketch['staff_performance']
+    assert approx_staff['unassigned_customers'] == staff['unassigned_customers']
+    assert abs(approx_staff['total_staff'] - staff['total_staff']) <= error * staff['total_staff']
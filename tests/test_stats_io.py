@@ -0,0 +1,33 @@
+"""Stats files: JSON and sectioned msgpack round trips, lazy section loading"""
+
+import json
+
+import pytest
+
+from statistical_analyzer import VNPTStatisticalAnalyzer
+from stats_io import load_stats, binary_path, StatsFile
+
+pytest.importorskip('msgpack')
+
+
+def test_save_and_load_stats(cleaned_df, tmp_path):
+    analyzer = VNPTStatisticalAnalyzer(cleaned_df)
+    analyzer.analyze_all(max_workers=1)
+    json_path = tmp_path / 'statistical_analysis.json'
+    analyzer.save_results(json_path)
+    assert binary_path(json_path).exists()
+
+    # Both files hold what the previous json.dumps(default=str) writer produced
+    expected = json.loads(json.dumps(analyzer.stats, default=str))
+    from_json = load_stats(json_path, prefer_binary=False)
+    from_binary = load_stats(json_path)
+    assert from_json.path == json_path
+    assert from_binary.path == binary_path(json_path)
+    assert from_json.to_dict() == expected
+    assert from_binary.to_dict() == expected
+
+    # A msgpack section is decoded on its own, without touching the others
+    stats = StatsFile(binary_path(json_path))
+    assert list(stats) == list(expected)
+    assert stats['overview'] == expected['overview']
+    assert list(stats._sections) == ['overview']
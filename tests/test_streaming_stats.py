@@ -0,0 +1,101 @@
+"""Mergeable accumulators and sketches against brute-force results"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_stats import WelfordAccumulator, ExactQuantiles, KLLSketch, HyperLogLog, SpaceSaving
+
+QUANTILES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+# Documented 99% rank error of KLLSketch at k=200
+KLL_RANK_ERROR = 2.3 / 200 ** 0.97
+
+
+def _batches(values, size):
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+@pytest.fixture
+def tkc_values():
+    rng = np.random.default_rng(1)
+    values = np.round(rng.gamma(1.2, 8000, 50000), 2)
+    values[rng.random(len(values)) < 0.2] = 0.0
+    values[rng.random(len(values)) < 0.01] = np.nan
+    return values
+
+
+def test_welford_merges_to_pandas_moments(tkc_values):
+    merged = WelfordAccumulator()
+    for batch in _batches(tkc_values, 7000):
+        merged.merge(WelfordAccumulator().update(batch))
+
+    series = pd.Series(tkc_values)
+    assert merged.n == series.count()
+    assert merged.mean == pytest.approx(series.mean(), rel=1e-12)
+    assert merged.std() == pytest.approx(series.std(), rel=1e-12)
+
+
+def test_exact_quantiles_match_series_quantile(tkc_values):
+    merged = ExactQuantiles()
+    for batch in _batches(tkc_values, 7000):
+        merged.merge(ExactQuantiles().update(batch))
+
+    series = pd.Series(tkc_values)
+    for q in QUANTILES:
+        assert merged.quantile(q) == pytest.approx(series.quantile(q), rel=1e-12)
+    assert merged.median() == series.median()
+
+
+def test_kll_rank_error_within_bound(tkc_values):
+    sketch = KLLSketch(k=200)
+    for batch in _batches(tkc_values, 7000):
+        sketch.merge(KLLSketch(k=200).update(batch))
+
+    values = np.sort(tkc_values[~np.isnan(tkc_values)])
+    assert sketch.n == len(values)
+    # Retained items stay O(k) however long the stream
+    assert sum(len(items) for items in sketch.levels) < 5 * sketch.k
+    for q in QUANTILES[1:-1]:
+        estimate = sketch.quantile(q)
+        # Rank interval of the estimate (ties included) against the target rank
+        low = np.searchsorted(values, estimate, side='left') / len(values)
+        high = np.searchsorted(values, estimate, side='right') / len(values)
+        assert low - KLL_RANK_ERROR <= q <= high + KLL_RANK_ERROR, q
+
+
+def test_hyperloglog_within_error_and_mergeable():
+    keys = np.array([f'BTS{i:06d}' for i in range(60000)], dtype=object)
+    rng = np.random.default_rng(2)
+    stream = keys[rng.integers(0, len(keys), 200000)]
+    exact = len(pd.unique(stream))
+
+    merged = HyperLogLog()
+    for batch in _batches(stream, 30000):
+        merged.merge(HyperLogLog().update(batch))
+    single = HyperLogLog().update(stream)
+
+    assert np.array_equal(merged.registers, single.registers)
+    assert abs(merged.count() - exact) <= 4 * merged.relative_error * exact
+    # Small cardinalities fall back to linear counting (standard error about 0.5% here)
+    assert abs(HyperLogLog().update(keys[:500]).count() - 500) <= 0.02 * 500
+
+
+def test_space_saving_counts_within_error_bound():
+    rng = np.random.default_rng(3)
+    stream = pd.Series(rng.zipf(1.3, 100000) % 5000).map('STAFF{:04d}'.format).to_numpy(dtype=object)
+    exact = pd.Series(stream).value_counts()
+
+    summary = SpaceSaving(capacity=100)
+    for batch in _batches(stream, 9000):
+        summary.merge(SpaceSaving(capacity=100).update(batch))
+
+    assert summary.n == len(stream)
+    table = summary.table
+    true_counts = exact.reindex(table.index).to_numpy()
+    # Upper-bound counts that overestimate by at most the recorded error and n / capacity
+    assert (table['count'].to_numpy() >= true_counts).all()
+    assert (table['count'].to_numpy() - table['error'].to_numpy() <= true_counts).all()
+    assert (table['count'].to_numpy() - true_counts <= summary.error_bound).all()
+    # Every item more frequent than n / capacity is kept, and the top 5 are exact in order
+    assert set(exact[exact > summary.error_bound].index) <= set(table.index)
+    assert summary.top(5).index.tolist() == exact.index[:5].tolist()
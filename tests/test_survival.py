@@ -0,0 +1,47 @@
+"""Kaplan-Meier curves against hand-computed values"""
+
+import numpy as np
+import pandas as pd
+
+from survival import survival_lifetimes, survival_counts, kaplan_meier
+
+
+def test_kaplan_meier_matches_hand_computed_curve():
+    # Six accounts: expired at months 1, 2, 3; still active (censored) at months 1, 3, 4
+    lifetime = np.array([1, 1, 2, 3, 3, 4])
+    event = np.array([True, False, True, True, False, False])
+
+    curve = kaplan_meier(survival_counts(lifetime, event, horizon=5))['ALL']
+
+    # S(1) = 5/6, S(2) = 5/6 * 3/4, S(3) = 5/8 * 2/3; nobody left at risk after month 4
+    assert curve['survival'] == [1.0, 0.8333, 0.625, 0.4167, 0.4167, None]
+    assert curve['customers'] == 6
+    assert curve['events'] == 3
+    assert curve['median_months'] == 3
+
+
+def test_kaplan_meier_per_stratum():
+    lifetime = np.array([0, 2, 2, 1, 5, -1])
+    event = np.array([True, True, False, False, False, True])
+    strata = pd.Series(['A', 'A', 'A', 'B', 'B', 'B'])
+
+    curves = kaplan_meier(survival_counts(lifetime, event, strata, horizon=5))
+
+    assert curves['A']['survival'] == [0.6667, 0.6667, 0.3333, None, None, None]
+    assert curves['A']['median_months'] == 2
+    # B never expires; the row without an activation date (-1) is skipped
+    assert curves['B']['customers'] == 2
+    assert curves['B']['survival'] == [1.0, 1.0, 1.0, 1.0, 1.0, 1.0]
+    assert curves['B']['median_months'] is None
+
+
+def test_survival_lifetimes_censoring():
+    activation = pd.to_datetime(pd.Series(['2020-01-15', '2020-01-15', None, '2000-01-01']))
+    expiry = pd.to_datetime(pd.Series(['2020-04-10', '2022-06-01', '2020-05-01', None]))
+
+    lifetime, event = survival_lifetimes(activation, expiry, as_of='2021-01-01', horizon=120)
+
+    # Expired after 3 calendar months; censored at as_of (12 months); no activation; capped at the horizon
+    assert lifetime.tolist() == [3, 12, -1, 120]
+    assert event.tolist()[:2] == [True, False]
+    assert not event[3]
@@ -0,0 +1,53 @@
+"""Chart rendering: manifest cache reuse and process-pool output identical to serial"""
+
+import hashlib
+from pathlib import Path
+
+from visualization import VNPTVisualizer, CHARTS, MANIFEST_NAME
+
+
+def _render(df, output_dir, **kwargs):
+    visualizer = VNPTVisualizer(df, {}, output_dir=output_dir, profile='draft')
+    charts = visualizer.create_all_charts(**kwargs)
+    return charts, visualizer.chart_timings
+
+
+def test_manifest_cache_hit_and_miss(cleaned_df, tmp_path):
+    charts, timings = _render(cleaned_df, tmp_path)
+    assert timings['cached'] == 0
+    assert (tmp_path / MANIFEST_NAME).exists()
+    mtimes = {name: Path(path).stat().st_mtime_ns for name, path in charts.items()}
+
+    # Same data: every chart comes from disk untouched
+    charts, timings = _render(cleaned_df, tmp_path)
+    assert timings['cached'] == len(CHARTS)
+    assert {name: Path(path).stat().st_mtime_ns for name, path in charts.items()} == mtimes
+
+    # A deleted file is re-rendered even though its manifest entry matches
+    Path(charts['churn_risk']).unlink()
+    _, timings = _render(cleaned_df, tmp_path)
+    assert [name for name, timing in timings['charts'].items() if not timing['cached']] == ['churn_risk']
+
+    # Changed TKC values invalidate the charts built from them, and only those
+    changed = cleaned_df.copy()
+    changed['TOTAL_TKC'] = changed['TOTAL_TKC'] * 2
+    _, timings = _render(changed, tmp_path)
+    rendered = {name for name, timing in timings['charts'].items() if not timing['cached']}
+    assert 'tkc_distribution' in rendered
+    assert 'service_adoption' not in rendered
+
+    # use_cache=False renders everything
+    _, timings = _render(changed, tmp_path, use_cache=False)
+    assert timings['cached'] == 0
+
+
+def _file_hashes(charts):
+    return {name: hashlib.sha256(Path(path).read_bytes()).hexdigest() for name, path in charts.items()}
+
+
+def test_process_rendering_matches_serial(cleaned_df, tmp_path):
+    serial, _ = _render(cleaned_df, tmp_path / 'serial', use_cache=False)
+    parallel, timings = _render(cleaned_df, tmp_path / 'process', mode='process', max_workers=2, use_cache=False)
+
+    assert timings['cached'] == 0
+    assert _file_hashes(parallel) == _file_hashes(serial)
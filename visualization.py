@@ -4,13 +4,23 @@ Creates professional charts with VNPT branding (#0066B2)
 """
 
 import pandas as pd
+import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
 import json
 import logging
+import os
+import time
+from stats_io import load_stats
+from streaming_stats import month_counts
+from ranking import top_k, rank_groups
+from histograms import histogram_bins
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,235 +35,477 @@ plt.rcParams['figure.figsize'] = (12, 6)
 plt.rcParams['font.size'] = 10
 
 
+CHART_MODES = ('serial', 'process')
+MANIFEST_NAME = 'chart_manifest.json'
+# Bump when a renderer changes so cached charts are re-rendered
+CHART_CACHE_VERSION = 1
+
+# Output format and resolution of the saved charts
+RENDER_PROFILES = {
+    'draft': {'format': 'png', 'dpi': 80, 'bbox_inches': None},
+    'publication': {'format': 'png', 'dpi': 300, 'bbox_inches': 'tight'},
+    # Fixed hash salt and no dates so unchanged SVG/PDF charts are byte-identical
+    'svg': {'format': 'svg', 'bbox_inches': 'tight', 'metadata': {'Date': None}, 'rc': {'svg.hashsalt': 'vnpt'}},
+    'pdf': {'format': 'pdf', 'bbox_inches': 'tight', 'metadata': {'CreationDate': None}},
+    'webp': {'format': 'webp', 'dpi': 150, 'bbox_inches': 'tight', 'pil_kwargs': {'quality': 90}}
+}
+DEFAULT_RENDER_PROFILE = 'publication'
+
+
+def resolve_render_profile(name=DEFAULT_RENDER_PROFILE):
+    """Render profile settings by name (WebP falls back to PNG when Pillow lacks WebP)"""
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{name}', expected one of {list(RENDER_PROFILES)}")
+    profile = dict(RENDER_PROFILES[name], name=name)
+
+    if profile['format'] == 'webp':
+        try:
+            from PIL import features
+            if not features.check('webp'):
+                raise ImportError('webp')
+        except ImportError:
+            logger.warning("Pillow has no WebP support, webp profile saves PNG instead")
+            profile['format'] = 'png'
+            profile.pop('pil_kwargs')
+    return profile
+
+
+def _save_figure(output_path, profile):
+    """Save the current figure with the render profile's format and resolution and close it"""
+    options = {key: value for key, value in profile.items() if key in ('dpi', 'bbox_inches', 'metadata', 'pil_kwargs')}
+    plt.tight_layout()
+    with plt.rc_context(profile.get('rc', {})):
+        plt.savefig(output_path, format=profile['format'], **options)
+    plt.close()
+    logger.info(f"Saved: {output_path}")
+
+
+def _plot_histogram(ax, counts, edges, **kwargs):
+    """Draw a pre-binned histogram (one weighted sample at each left edge)"""
+    return ax.hist(edges[:-1], bins=edges, weights=counts, **kwargs)
+
+
+def render_tkc_distribution(data, output_path, profile):
+    """TKC distribution histogram and segment pie"""
+    logger.info("Creating TKC distribution chart...")
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    
+    # Histogram
+    _plot_histogram(ax1, data['tkc_counts'], data['tkc_edges'], color=VNPT_BLUE, edgecolor='white')
+    ax1.grid(True)
+    ax1.set_title('TKC Distribution', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Total TKC (VNĐ)')
+    ax1.set_ylabel('Number of Customers')
+    ax1.axvline(data['tkc_mean'], color='red', linestyle='--', label=f"Mean: {data['tkc_mean']:.0f}")
+    ax1.legend()
+    
+    # Segment pie chart
+    segment_counts = data['segment_counts']
+    ax2.pie(segment_counts.values, labels=segment_counts.index, autopct='%1.1f%%',
+            colors=VNPT_COLORS, startangle=90)
+    ax2.set_title('TKC Segments', fontsize=14, fontweight='bold')
+    
+    _save_figure(output_path, profile)
+
+
+def render_service_adoption(data, output_path, profile):
+    """Service adoption chart"""
+    logger.info("Creating service adoption chart...")
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    # Service adoption bar chart
+    service_data = data['service_counts']
+    colors = [VNPT_BLUE if x else '#CCCCCC' for x in service_data.index]
+    bars = ax.bar(['With Service', 'No Service'], service_data.values, color=colors, edgecolor='white', linewidth=2)
+    
+    # Add percentages
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:,.0f}\n({height/data["total"]*100:.1f}%)',
+                ha='center', va='bottom', fontsize=12, fontweight='bold')
+    
+    ax.set_title('Service Adoption Rate', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Number of Customers', fontsize=12)
+    ax.set_ylim(0, max(service_data.values) * 1.15)
+    
+    _save_figure(output_path, profile)
+
+
+def render_churn_risk(data, output_path, profile):
+    """Churn risk distribution and days-to-expire histogram"""
+    logger.info("Creating churn risk chart...")
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+    
+    # Churn risk distribution
+    churn_data = data['churn_counts']
+    colors = ['#FF4444' if x == 'High' else '#44FF44' for x in churn_data.index]
+    ax1.bar(churn_data.index, churn_data.values, color=colors, edgecolor='white', linewidth=2)
+    ax1.set_title('Churn Risk Distribution', fontsize=14, fontweight='bold')
+    ax1.set_ylabel('Number of Customers')
+    
+    for i, (idx, val) in enumerate(churn_data.items()):
+        ax1.text(i, val, f'{val:,.0f}\n({val/data["total"]*100:.1f}%)',
+                ha='center', va='bottom', fontsize=11, fontweight='bold')
+    
+    # Days to expire histogram
+    _plot_histogram(ax2, data['expire_counts'], data['expire_edges'], color=VNPT_BLUE, edgecolor='white')
+    ax2.axvline(30, color='red', linestyle='--', linewidth=2, label='30-day threshold')
+    ax2.set_title('Days to Expiration (<100 days)', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Days to Expire')
+    ax2.set_ylabel('Number of Customers')
+    ax2.legend()
+    
+    _save_figure(output_path, profile)
+
+
+def render_geographic_distribution(data, output_path, profile):
+    """Top provinces by customer count"""
+    logger.info("Creating geographic distribution chart...")
+    
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    # Top provinces
+    province_counts = data['province_counts']
+    bars = ax.barh(range(len(province_counts)), province_counts.values, color=VNPT_BLUE, edgecolor='white')
+    ax.set_yticks(range(len(province_counts)))
+    ax.set_yticklabels(province_counts.index)
+    ax.set_xlabel('Number of Customers', fontsize=12)
+    ax.set_title('Top 10 Provinces by Customer Count', fontsize=14, fontweight='bold')
+    ax.invert_yaxis()
+    
+    # Add values
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        ax.text(width, bar.get_y() + bar.get_height()/2.,
+                f'{width:,.0f}',
+                ha='left', va='center', fontsize=10, fontweight='bold')
+    
+    _save_figure(output_path, profile)
+
+
+def render_staff_performance(data, output_path, profile):
+    """Top staff by customer count"""
+    logger.info("Creating staff performance chart...")
+    
+    staff_counts = data['staff_counts']
+    
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    x = range(len(staff_counts))
+    bars = ax.bar(x, staff_counts.values, color=VNPT_BLUE, edgecolor='white', linewidth=2)
+    ax.set_xticks(x)
+    ax.set_xticklabels(staff_counts.index, rotation=45, ha='right')
+    ax.set_ylabel('Number of Customers', fontsize=12)
+    ax.set_title('Top 10 Staff by Customer Count', fontsize=14, fontweight='bold')
+    
+    # Add values
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.0f}',
+                ha='center', va='bottom', fontsize=9, fontweight='bold')
+    
+    _save_figure(output_path, profile)
+
+
+def render_temporal_trends(data, output_path, profile):
+    """Monthly activation trend"""
+    logger.info("Creating temporal trends chart...")
+    
+    fig, ax = plt.subplots(figsize=(14, 6))
+    
+    data['monthly_counts'].plot(kind='line', ax=ax, color=VNPT_BLUE, linewidth=2, marker='o')
+    ax.set_title('Customer Activation Trend (Last 24 Months)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Month', fontsize=12)
+    ax.set_ylabel('New Activations', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    
+    _save_figure(output_path, profile)
+
+
+def render_segmentation_matrix(data, output_path, profile):
+    """Customer segmentation heatmap"""
+    logger.info("Creating segmentation matrix...")
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    # Heatmap
+    sns.heatmap(data['segment_matrix'], annot=True, fmt='d', cmap='Blues',
+                cbar_kws={'label': 'Customer Count'}, ax=ax)
+    ax.set_title('Customer Segmentation Matrix', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Has Service', fontsize=12)
+    ax.set_ylabel('TKC Segment', fontsize=12)
+    
+    _save_figure(output_path, profile)
+
+
+# Chart key -> (output file name without extension, renderer); renderers only
+# receive pre-aggregated data
+CHARTS = {
+    'tkc_distribution': ('tkc_distribution', render_tkc_distribution),
+    'service_adoption': ('service_adoption', render_service_adoption),
+    'churn_risk': ('churn_risk', render_churn_risk),
+    'geographic': ('geographic_distribution', render_geographic_distribution),
+    'staff_performance': ('staff_performance', render_staff_performance),
+    'temporal_trends': ('temporal_trends', render_temporal_trends),
+    'segmentation': ('segmentation_matrix', render_segmentation_matrix)
+}
+
+
+def chart_file_name(name, profile):
+    """Output file of a chart under a render profile"""
+    return f"{CHARTS[name][0]}.{profile['format']}"
+
+
+def _style_key(profile):
+    """Everything besides the data that changes how a chart looks"""
+    return repr((
+        CHART_CACHE_VERSION, sorted(profile.items(), key=str), VNPT_BLUE, VNPT_COLORS,
+        plt.rcParams['figure.figsize'], plt.rcParams['font.size'],
+        matplotlib.__version__, sns.__version__
+    ))
+
+
+def _update_hash(hasher, value):
+    """Feed a chart input (arrays, pandas objects, scalars, dicts) into a hash"""
+    if isinstance(value, dict):
+        for key in sorted(value):
+            hasher.update(f"<{key}>".encode('utf-8'))
+            _update_hash(hasher, value[key])
+    elif isinstance(value, (pd.Series, pd.DataFrame)):
+        hasher.update(repr((type(value).__name__, value.shape, value.dtypes if isinstance(value, pd.DataFrame)
+                            else value.dtype, list(value.index), getattr(value, 'columns', None))).encode('utf-8'))
+        hasher.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        hasher.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    else:
+        hasher.update(repr(value).encode('utf-8'))
+
+
+def chart_hash(name, data, profile):
+    """Content hash of a chart: its key, output file, input aggregates, style and render profile"""
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(f"{name}|{chart_file_name(name, profile)}|{_style_key(profile)}|".encode('utf-8'))
+    _update_hash(hasher, data)
+    return hasher.hexdigest()
+
+
+def _render_timed(name, data, output_path, profile):
+    """Render one chart (in this process or a pool worker); returns (path, seconds)"""
+    start = time.perf_counter()
+    CHARTS[name][1](data, output_path, profile)
+    return str(output_path), time.perf_counter() - start
+
+
 class VNPTVisualizer:
-    """Create visualizations for VNPT data analysis"""
+    """Create visualizations for VNPT data analysis
+    
+    Each chart is split into a data step (small pre-aggregated Series/arrays taken
+    from the frame) and a matplotlib render step, so renders can run in worker
+    processes without shipping the frame.
+    """
     
-    def __init__(self, df, stats, output_dir='outputs/charts'):
-        """Initialize visualizer"""
+    def __init__(self, df, stats, output_dir='outputs/charts', profile=DEFAULT_RENDER_PROFILE):
+        """Initialize visualizer (profile: one of RENDER_PROFILES)"""
         self.df = df
         self.stats = stats
+        self.profile = resolve_render_profile(profile)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-    def create_all_charts(self):
-        """Generate all charts"""
-        logger.info("Creating all visualizations...")
+        self.chart_timings = None
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        
+    def create_all_charts(self, mode='serial', max_workers=None, use_cache=True):
+        """Generate all charts
+        
+        mode='process' renders the charts in a process pool of max_workers
+        (default: one per chart, at most one per CPU); the files are identical to
+        serial rendering. With use_cache, a chart whose input aggregates, style
+        and render profile hash to the value recorded in the chart manifest is
+        reused from disk instead of re-rendered. Per-chart timings and file sizes
+        are kept in self.chart_timings.
+        """
+        if mode not in CHART_MODES:
+            raise ValueError(f"Unknown chart mode '{mode}', expected one of {CHART_MODES}")
+        logger.info(f"Creating all visualizations ({mode}, {self.profile['name']} profile)...")
+        start = time.perf_counter()
+        
+        manifest = self._load_manifest() if use_cache else {}
+        prepared, hashes, timings, results = {}, {}, {}, {}
+        for name in CHARTS:
+            file_name = chart_file_name(name, self.profile)
+            prepare_start = time.perf_counter()
+            data = getattr(self, f'_{name}_data')()
+            hashes[name] = chart_hash(name, data, self.profile)
+            timings[name] = {'prepare_s': time.perf_counter() - prepare_start}
+            
+            output_path = self.output_dir / file_name
+            entry = manifest.get(name, {})
+            if entry.get('hash') == hashes[name] and entry.get('file') == file_name and output_path.exists():
+                results[name] = (str(output_path), 0.0)
+                timings[name]['cached'] = True
+            else:
+                prepared[name] = data
+        
+        # Entries of charts about to be overwritten are dropped first, so a failed
+        # render never leaves a manifest vouching for a half-updated directory
+        if use_cache and prepared:
+            self._save_manifest({name: entry for name, entry in manifest.items() if name not in prepared})
+        
+        workers = 1
+        if not prepared:
+            workers = 0
+        elif mode == 'process':
+            workers = max_workers or min(len(prepared), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    name: pool.submit(_render_timed, name, data, self._chart_path(name), self.profile)
+                    for name, data in prepared.items()
+                }
+                for name, future in futures.items():
+                    results[name] = future.result()
+        else:
+            for name, data in prepared.items():
+                results[name] = _render_timed(name, data, self._chart_path(name), self.profile)
         
         charts = {}
-        charts['tkc_distribution'] = self.plot_tkc_distribution()
-        charts['service_adoption'] = self.plot_service_adoption()
-        charts['churn_risk'] = self.plot_churn_risk()
-        charts['geographic'] = self.plot_geographic_distribution()
-        charts['staff_performance'] = self.plot_staff_performance()
-        charts['temporal_trends'] = self.plot_temporal_trends()
-        charts['segmentation'] = self.plot_segmentation_matrix()
-        
-        logger.info(f"Created {len(charts)} charts in {self.output_dir}")
+        for name in CHARTS:
+            path, render_time = results[name]
+            charts[name] = path
+            timings[name].update(
+                prepare_s=round(timings[name]['prepare_s'], 4),
+                render_s=round(render_time, 4),
+                cached=timings[name].get('cached', False),
+                bytes=Path(path).stat().st_size
+            )
+        if prepared or not use_cache:
+            self._save_manifest({
+                name: {'file': chart_file_name(name, self.profile), 'hash': hashes[name]} for name in CHARTS
+            })
+        
+        self.chart_timings = {
+            'profile': self.profile['name'],
+            'format': self.profile['format'],
+            'mode': mode,
+            'max_workers': workers,
+            'cached': sum(timing['cached'] for timing in timings.values()),
+            'wall_time_s': round(time.perf_counter() - start, 4),
+            'total_bytes': sum(timing['bytes'] for timing in timings.values()),
+            'charts': timings
+        }
+        for name, timing in timings.items():
+            status = 'cached' if timing['cached'] else f"render {timing['render_s']:.3f}s"
+            logger.info(f"  {name}: prepare {timing['prepare_s']:.3f}s, {status}, {timing['bytes'] / 1024:.0f} KB")
+        logger.info(f"Created {len(charts)} charts in {self.output_dir} "
+                    f"({len(prepared)} rendered, {self.chart_timings['cached']} cached, "
+                    f"{self.chart_timings['wall_time_s']:.2f}s, {self.chart_timings['total_bytes'] / 1024:.0f} KB)")
         return charts
     
+    def _chart_path(self, name):
+        """Output path of a chart under this visualizer's render profile"""
+        return self.output_dir / chart_file_name(name, self.profile)
+    
+    def _load_manifest(self):
+        """Chart key -> {file, hash} of the charts currently in output_dir"""
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('charts', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read chart manifest {self.manifest_path}: {e}, re-rendering all charts")
+            return {}
+    
+    def _save_manifest(self, charts):
+        """Write the chart manifest atomically"""
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CHART_CACHE_VERSION, 'charts': charts}, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+    
+    def _render(self, name):
+        """Prepare and render a single chart in this process, keeping the manifest in step"""
+        data = getattr(self, f'_{name}_data')()
+        manifest = self._load_manifest()
+        manifest.pop(name, None)
+        self._save_manifest(manifest)
+        path, _ = _render_timed(name, data, self._chart_path(name), self.profile)
+        manifest[name] = {'file': chart_file_name(name, self.profile), 'hash': chart_hash(name, data, self.profile)}
+        self._save_manifest(manifest)
+        return path
+    
     def plot_tkc_distribution(self):
         """TKC distribution histogram"""
-        logger.info("Creating TKC distribution chart...")
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-        
-        # Histogram
-        self.df['TOTAL_TKC'].hist(bins=50, color=VNPT_BLUE, edgecolor='white', ax=ax1)
-        ax1.set_title('TKC Distribution', fontsize=14, fontweight='bold')
-        ax1.set_xlabel('Total TKC (VNĐ)')
-        ax1.set_ylabel('Number of Customers')
-        ax1.axvline(self.df['TOTAL_TKC'].mean(), color='red', linestyle='--', label=f'Mean: {self.df["TOTAL_TKC"].mean():.0f}')
-        ax1.legend()
-        
-        # Segment pie chart
-        segment_counts = self.df['TKC_SEGMENT'].value_counts()
-        ax2.pie(segment_counts.values, labels=segment_counts.index, autopct='%1.1f%%',
-                colors=VNPT_COLORS, startangle=90)
-        ax2.set_title('TKC Segments', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'tkc_distribution.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return self._render('tkc_distribution')
     
     def plot_service_adoption(self):
         """Service adoption chart"""
-        logger.info("Creating service adoption chart...")
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Service adoption bar chart
-        service_data = self.df['HAS_SERVICE'].value_counts()
-        colors = [VNPT_BLUE if x else '#CCCCCC' for x in service_data.index]
-        bars = ax.bar(['With Service', 'No Service'], service_data.values, color=colors, edgecolor='white', linewidth=2)
-        
-        # Add percentages
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:,.0f}\n({height/len(self.df)*100:.1f}%)',
-                    ha='center', va='bottom', fontsize=12, fontweight='bold')
-        
-        ax.set_title('Service Adoption Rate', fontsize=16, fontweight='bold')
-        ax.set_ylabel('Number of Customers', fontsize=12)
-        ax.set_ylim(0, max(service_data.values) * 1.15)
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'service_adoption.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return self._render('service_adoption')
     
     def plot_churn_risk(self):
         """Churn risk visualization"""
-        logger.info("Creating churn risk chart...")
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-        
-        # Churn risk distribution
-        churn_data = self.df['CHURN_RISK'].value_counts()
-        colors = ['#FF4444' if x == 'High' else '#44FF44' for x in churn_data.index]
-        ax1.bar(churn_data.index, churn_data.values, color=colors, edgecolor='white', linewidth=2)
-        ax1.set_title('Churn Risk Distribution', fontsize=14, fontweight='bold')
-        ax1.set_ylabel('Number of Customers')
-        
-        for i, (idx, val) in enumerate(churn_data.items()):
-            ax1.text(i, val, f'{val:,.0f}\n({val/len(self.df)*100:.1f}%)',
-                    ha='center', va='bottom', fontsize=11, fontweight='bold')
-        
-        # Days to expire histogram
-        days_to_expire = self.df['DAYS_TO_EXPIRE']
-        ax2.hist(days_to_expire[days_to_expire < 100], bins=30, color=VNPT_BLUE, edgecolor='white')
-        ax2.axvline(30, color='red', linestyle='--', linewidth=2, label='30-day threshold')
-        ax2.set_title('Days to Expiration (<100 days)', fontsize=14, fontweight='bold')
-        ax2.set_xlabel('Days to Expire')
-        ax2.set_ylabel('Number of Customers')
-        ax2.legend()
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'churn_risk.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return self._render('churn_risk')
     
     def plot_geographic_distribution(self):
         """Geographic distribution"""
-        logger.info("Creating geographic distribution chart...")
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Top provinces
-        province_counts = self.df['PROVINCE_NAME'].value_counts().head(10)
-        bars = ax.barh(range(len(province_counts)), province_counts.values, color=VNPT_BLUE, edgecolor='white')
-        ax.set_yticks(range(len(province_counts)))
-        ax.set_yticklabels(province_counts.index)
-        ax.set_xlabel('Number of Customers', fontsize=12)
-        ax.set_title('Top 10 Provinces by Customer Count', fontsize=14, fontweight='bold')
-        ax.invert_yaxis()
-        
-        # Add values
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            ax.text(width, bar.get_y() + bar.get_height()/2.,
-                    f'{width:,.0f}',
-                    ha='left', va='center', fontsize=10, fontweight='bold')
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'geographic_distribution.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return self._render('geographic')
     
     def plot_staff_performance(self):
         """Staff performance chart"""
-        logger.info("Creating staff performance chart...")
-        
-        # Top 10 staff by customer count
-        staff_stats = self.df[self.df['STAFF_CODE'] != 'UNASSIGNED'].groupby('STAFF_CODE').agg({
-            'Phone number': 'count',
-            'TOTAL_TKC': 'mean'
-        }).sort_values('Phone number', ascending=False).head(10)
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        x = range(len(staff_stats))
-        bars = ax.bar(x, staff_stats['Phone number'], color=VNPT_BLUE, edgecolor='white', linewidth=2)
-        ax.set_xticks(x)
-        ax.set_xticklabels(staff_stats.index, rotation=45, ha='right')
-        ax.set_ylabel('Number of Customers', fontsize=12)
-        ax.set_title('Top 10 Staff by Customer Count', fontsize=14, fontweight='bold')
-        
-        # Add values
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.0f}',
-                    ha='center', va='bottom', fontsize=9, fontweight='bold')
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'staff_performance.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return self._render('staff_performance')
     
     def plot_temporal_trends(self):
         """Temporal trends chart"""
-        logger.info("Creating temporal trends chart...")
-        
-        # Monthly activations
-        self.df['activation_month'] = pd.to_datetime(self.df['DATE_ENTER_ACTIVE']).dt.to_period('M')
-        monthly_data = self.df.groupby('activation_month').size()
-        
-        fig, ax = plt.subplots(figsize=(14, 6))
-        
-        monthly_data.tail(24).plot(kind='line', ax=ax, color=VNPT_BLUE, linewidth=2, marker='o')
-        ax.set_title('Customer Activation Trend (Last 24 Months)', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Month', fontsize=12)
-        ax.set_ylabel('New Activations', fontsize=12)
-        ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'temporal_trends.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return self._render('temporal_trends')
     
     def plot_segmentation_matrix(self):
         """Customer segmentation matrix"""
-        logger.info("Creating segmentation matrix...")
-        
+        return self._render('segmentation')
+    
+    def _tkc_distribution_data(self):
+        tkc = self.df['TOTAL_TKC']
+        counts, edges = histogram_bins(tkc, bins=50)
+        return {
+            'tkc_counts': counts,
+            'tkc_edges': edges,
+            'tkc_mean': tkc.mean(),
+            'segment_counts': self.df['TKC_SEGMENT'].value_counts()
+        }
+    
+    def _service_adoption_data(self):
+        return {'service_counts': self.df['HAS_SERVICE'].value_counts(), 'total': len(self.df)}
+    
+    def _churn_risk_data(self):
+        days_to_expire = self.df['DAYS_TO_EXPIRE']
+        counts, edges = histogram_bins(days_to_expire[days_to_expire < 100], bins=30)
+        return {
+            'churn_counts': self.df['CHURN_RISK'].value_counts(),
+            'total': len(self.df),
+            'expire_counts': counts,
+            'expire_edges': edges
+        }
+    
+    def _geographic_data(self):
+        return {'province_counts': top_k(self.df['PROVINCE_NAME'].value_counts(sort=False), 10)}
+    
+    def _staff_performance_data(self):
+        # Top 10 staff by customer count
+        staff_stats = rank_groups(self.df, 'STAFF_CODE', k=10, metric='customer_count', exclude=['UNASSIGNED'])
+        return {'staff_counts': staff_stats['customer_count']}
+    
+    def _temporal_trends_data(self):
+        # Monthly activations
+        return {'monthly_counts': month_counts(self.df['DATE_ENTER_ACTIVE']).tail(24)}
+    
+    def _segmentation_data(self):
         # Create pivot table
         pivot = pd.crosstab(self.df['TKC_SEGMENT'], self.df['HAS_SERVICE'], margins=True)
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Heatmap
-        sns.heatmap(pivot.iloc[:-1, :-1], annot=True, fmt='d', cmap='Blues', 
-                    cbar_kws={'label': 'Customer Count'}, ax=ax)
-        ax.set_title('Customer Segmentation Matrix', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Has Service', fontsize=12)
-        ax.set_ylabel('TKC Segment', fontsize=12)
-        
-        plt.tight_layout()
-        output_path = self.output_dir / 'segmentation_matrix.png'
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        logger.info(f"Saved: {output_path}")
-        return str(output_path)
+        return {'segment_matrix': pivot.iloc[:-1, :-1]}
 
 
 def main():
@@ -266,8 +518,7 @@ def main():
     # Load data
     df = pd.read_excel(r"c:\Users\Admin\.gemini\antigravity\playground\zonal-star\data\cleaned_data.xlsx")
     
-    with open(r"c:\Users\Admin\.gemini\antigravity\playground\zonal-star\data\statistical_analysis.json", 'r', encoding='utf-8') as f:
-        stats = json.load(f)
+    stats = load_stats(r"c:\Users\Admin\.gemini\antigravity\playground\zonal-star\data\statistical_analysis.json")
     
     # Create visualizer
     visualizer = VNPTVisualizer(df, stats)